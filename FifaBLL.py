@@ -1,4 +1,10 @@
 from FifaDataAccess import accessdata  # Import the accessdata class from the FifaDataAccess module to handle database operations
+from FifaFilter import filterspec  # Import the filter spec used to build parameterized queries
+from FifaImport import upsert  # Import the insert-or-replace statement shared with the bulk loader
+from FifaMigrations import checkSummaries, migrate, rebuildSummaries, summaryDimensions  # Import the schema helpers
+import threading  # Import threading to serialize access to the columnar index
+import time  # Import time for the write-behind commit window
+from concurrent.futures import Future  # Import Future to hand queued writes' results back
 
 class players:
     """
@@ -11,9 +17,15 @@ class players:
         Instance of the accessdata class to handle database queries.
     records : list of tuples
         Predefined player records to be inserted into the database.
+    index : columnindex or None
+        In-memory columnar copy of the table when the 'columnar' engine is selected.
+    cache : resultcache or None
+        Recent search, page and count results, reused until the database changes.
 
     Methods
     -------
+    migrateSchema():
+        Applies pending schema migrations.
     createData():
         Inserts all predefined player records into the database.
     deleteData():
@@ -22,16 +34,59 @@ class players:
         Updates the record of a specific player with new values.
     deletesData(playername, overall, post, nation):
         Deletes specific player records based on given conditions.
+    updateRows(playername, overall, post, nation):
+        Same update as updateData, returning the updated rows.
+    deleteRows(playername, overall, post, nation):
+        Same delete as deletesData, returning the deleted rows.
+    updateMany(changes):
+        Applies many updates in one transaction.
+    deleteMany(criteria):
+        Applies many deletes in one transaction.
+    upsertMany(rows):
+        Inserts or replaces many players by id in one transaction.
+    writeMany(operations):
+        Applies a mixed, ordered sequence of updates, deletes and upserts in one transaction.
+    filterFor(playername, overall, post, nation):
+        Builds a filter spec from the form fields.
     searchData(playername, overall, post, nation):
         Searches for players based on various filter criteria.
+    search(spec):
+        Searches for players matching a filter spec.
+    searchPage(spec, after, limit):
+        Fetches one keyset-paginated page of a search.
+    countData(spec):
+        Counts the players matching a filter spec.
+    topPerGroup(spec, dimension, k):
+        Returns the k best matching players of every nation, club or position.
+    close():
+        Releases the pooled database connections.
     """
 
-    def __init__(self):
+    def __init__(self, dataAccess=None, engine="sql", cache=None):
         """
         Initialize the players class with a database access instance
         and a predefined list of player records.
+
+        Parameters
+        ----------
+        dataAccess : accessdata or None
+            Data access object to use; a default one on FIFA24.db is created if None.
+        engine : str
+            'sql' answers every search from SQLite; 'columnar' answers supported
+            searches from an in-memory NumPy copy of the table (requires NumPy).
+        cache : resultcache or None
+            Result cache consulted by search, searchPage and countData; None disables caching.
         """
-        self.dataAccess = accessdata()  # Create a database access object for performing queries
+        self.dataAccess = dataAccess or accessdata()  # Create a database access object for performing queries
+        self.migrateSchema()  # Bring indexes and the schema version up to date
+        self.index = None
+        self.cache = cache
+        self._indexLock = threading.Lock()  # Searches and write patches may come from different threads
+        if engine == "columnar":
+            from FifaColumnar import columnindex  # Imported lazily: NumPy is optional
+            self.index = columnindex(self.dataAccess)
+        elif engine != "sql":
+            raise ValueError(f"unknown engine: {engine}")
         self.records = [
             # Tuple format: (ID, firstName, lastName, nation, club, position, overall)
             (1, "Leon", "Goretzka", "Germany", "Bayern Munich", "CM", 87),
@@ -66,19 +121,140 @@ class players:
             (30, "Jiloyd", "Samuel", "England", "Esteghlal", "RB", 75)
         ]
 
+    def migrateSchema(self):
+        """
+        Apply pending schema migrations in a single transaction.
+
+        Returns
+        -------
+        int
+            The schema version after migrating, or None if migrating failed.
+        """
+        try:
+            with self.dataAccess.transaction() as connection:
+                return migrate(connection)
+        except Exception as err:
+            print(err)  # Print any error, the application still works without the indexes
+
     def createData(self):
         """
         Insert all predefined player records into the 'tblPlayers' database table.
         """
         query = "INSERT INTO tblPlayers VALUES(?,?,?,?,?,?,?)"  # SQL query with placeholders for data
-        self.dataAccess.insertQuery(query, self.records)  # Execute insert query with all records
+        before = self._stamp()
+        result = self.dataAccess.insertQuery(query, self.records)  # Execute insert query with all records
+        self._patchIndex(result, lambda index: index.applyInsert(self.records, before))
 
     def deleteData(self):
         """
         Delete all player records from the 'tblPlayers' database table.
         """
         query = "DELETE FROM tblPlayers"  # SQL query to delete all rows
-        self.dataAccess.deleteQuery(query)  # Execute the delete query
+        before = self._stamp()
+        result = self.dataAccess.deleteQuery(query)  # Execute the delete query
+        self._patchIndex(result, lambda index: index.applyClear(before))
+
+    def _stamp(self):
+        """
+        Return the database stamp before a write, or None when no index needs patching.
+        """
+        return self.dataAccess.stamp() if self.index is not None else None
+
+    def _patchIndex(self, result, apply):
+        """
+        Replay a successful write on the columnar index.
+
+        Parameters
+        ----------
+        result : int or None
+            Return value of the accessdata write; None means it failed and the
+            index is left to reload on its next read.
+        apply : callable
+            Receives the index and patches it.
+        """
+        if self.index is not None and result is not None:
+            with self._indexLock:
+                apply(self.index)
+
+    def _indexFor(self, spec):
+        """
+        Return the up-to-date columnar index if it can answer a spec, else None.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec about to be searched.
+
+        Returns
+        -------
+        columnindex or None
+            The index, reloaded first if the database changed behind its back.
+        """
+        if self.index is None or not self.index.supports(spec):
+            return None
+        self.index.refresh()
+        return self.index
+
+    def _cached(self, key, read):
+        """
+        Answer a read from the result cache, or run it and cache its result.
+
+        Parameters
+        ----------
+        key : tuple
+            Kind of read and normalized spec (plus its page bounds).
+        read : callable
+            Runs the read; a None result (failed or cancelled) is not cached.
+
+        Returns
+        -------
+        Any
+            The result; a list is copied so callers cannot change the cached one.
+        """
+        if self.cache is None:
+            return read()
+        stamp = self.dataAccess.stamp()  # Taken before the read, so a concurrent write leaves its result stale
+        result = self.cache.get(key, stamp)
+        if result is None:
+            result = read()
+            self.cache.put(key, stamp, result)
+        return list(result) if isinstance(result, list) else result
+
+    def filterFor(self, playername="", overall=None, post="", nation="Any", fuzzy=False):
+        """
+        Translate the form's search fields into a filter spec.
+
+        Empty strings (and 'Any' for the nation) leave that field unfiltered.
+        The name goes through the full-text index: every word must start a
+        first or last name, case-insensitively ("cris ron" finds Cristiano
+        Ronaldo), or with `fuzzy` the closest names by trigram similarity rank first.
+
+        Parameters
+        ----------
+        playername : str
+            Player name words (empty string for any).
+        overall : int or None
+            Minimum overall rating, or None for no lower bound.
+        post : str
+            Player position (empty string for any).
+        nation : str
+            Player nationality ('Any' for no filter).
+        fuzzy : bool
+            Tolerate typos in the name.
+
+        Returns
+        -------
+        filterspec
+            Spec matching the given fields.
+        """
+        spec = filterspec().overallRange(low=overall)
+        if playername != "":
+            spec.nameMatch(playername, fuzzy=fuzzy)
+        if post != "":
+            spec.position(post)
+        if nation != "Any":
+            spec.nation(nation)
+        return spec
 
     def updateData(self, playername, overall, post, nation):
         """
@@ -94,10 +270,20 @@ class players:
             New position of the player.
         nation : str
             New nationality of the player.
+
+        Returns
+        -------
+        int
+            Number of updated rows, or None if the update failed.
         """
-        # SQL update query to modify player attributes
-        query = f"UPDATE tblPlayers SET overall={overall}, nation='{nation}', position='{post}' WHERE firstName='{playername}'"
-        self.dataAccess.updateQuery(query)  # Execute the update query
+        # Parameterized update built from the same spec as the searches
+        spec = filterspec().firstName(playername)
+        assignments = {"overall": overall, "nation": nation, "position": post}
+        query, params = spec.updateQuery(assignments)
+        before = self._stamp()
+        result = self.dataAccess.updateQuery(query, params)  # Execute the update query
+        self._patchIndex(result, lambda index: index.applyUpdate(spec, assignments, before))
+        return result
 
     def deletesData(self, playername, overall, post, nation):
         """
@@ -113,10 +299,222 @@ class players:
             Player position.
         nation : str
             Player nationality.
+
+        Returns
+        -------
+        int
+            Number of deleted rows, or None if the delete failed.
+        """
+        # Parameterized delete with multiple conditions
+        spec = filterspec().firstName(playername).position(post).nation(nation).overallRange(low=overall)
+        query, params = spec.deleteQuery()
+        before = self._stamp()
+        result = self.dataAccess.deleteQuery(query, params)  # Execute the delete query
+        self._patchIndex(result, lambda index: index.applyDelete(spec, before))
+        return result
+
+    def updateRows(self, playername, overall, post, nation):
+        """
+        Apply the updateData change and report which players it touched.
+
+        Parameters
+        ----------
+        playername : str
+            First name of the players to update.
+        overall : int
+            New overall rating.
+        post : str
+            New position.
+        nation : str
+            New nationality.
+
+        Returns
+        -------
+        list of tuples
+            The updated player rows with their new values, or None if the update failed.
+        """
+        spec = filterspec().firstName(playername)
+        assignments = {"overall": overall, "nation": nation, "position": post}
+        query, params = spec.updateQuery(assignments, returning=True)
+        before = self._stamp()
+        rows = self.dataAccess.returningQuery(query, params)
+        self._patchIndex(rows, lambda index: index.applyUpdate(spec, assignments, before))
+        return rows
+
+    def deleteRows(self, playername, overall, post, nation):
+        """
+        Apply the deletesData criteria and report which players were removed.
+
+        Parameters
+        ----------
+        playername : str
+            First name of the player.
+        overall : int
+            Minimum overall rating.
+        post : str
+            Player position.
+        nation : str
+            Player nationality.
+
+        Returns
+        -------
+        list of tuples
+            The deleted player rows, or None if the delete failed.
+        """
+        spec = filterspec().firstName(playername).position(post).nation(nation).overallRange(low=overall)
+        query, params = spec.deleteQuery(returning=True)
+        before = self._stamp()
+        rows = self.dataAccess.returningQuery(query, params)
+        self._patchIndex(rows, lambda index: index.applyDelete(spec, before))
+        return rows
+
+    def _statementFor(self, operation, item):
+        """
+        Translate one batch item into its spec, assignments and SQL.
+
+        Parameters
+        ----------
+        operation : str
+            'update', 'delete' or 'upsert'.
+        item : dict, tuple or int
+            For updates, a dict holding 'id' or 'firstName' to select the players
+            plus the columns to set, or an updateData-style tuple
+            (playername, overall, post, nation). For deletes, an id, a dict with
+            'id', a dict with firstName, overall, position and nation (the
+            deletesData criteria), or a deletesData-style tuple. For upserts, a
+            whole player as a dict keyed by the table's columns (team may be
+            missing) or as an (id, firstName, lastName, nation, team, position,
+            overall) tuple.
+
+        Returns
+        -------
+        tuple
+            (spec, assignments, query, params); assignments is None for a delete
+            and the complete row tuple for an upsert.
+        """
+        if operation == "update":
+            if isinstance(item, dict):
+                assignments = dict(item)
+                key = "id" if "id" in assignments else "firstName"
+                if key not in assignments:
+                    raise ValueError("an update needs an 'id' or a 'firstName'")
+                spec = filterspec().equals(key, assignments.pop(key))
+            else:
+                playername, overall, post, nation = item
+                spec = filterspec().firstName(playername)
+                assignments = {"overall": overall, "nation": nation, "position": post}
+            if not assignments:
+                raise ValueError("an update needs at least one column to set")
+            return (spec, assignments) + spec.updateQuery(assignments)
+        if operation == "delete":
+            if isinstance(item, int):
+                spec = filterspec().equals("id", item)
+            elif isinstance(item, dict) and "id" in item:
+                spec = filterspec().equals("id", item["id"])
+            else:
+                if isinstance(item, dict):
+                    item = (item["firstName"], item["overall"], item["position"], item["nation"])
+                playername, overall, post, nation = item
+                spec = filterspec().firstName(playername).position(post).nation(nation).overallRange(low=overall)
+            return (spec, None) + spec.deleteQuery()
+        if operation == "upsert":
+            if isinstance(item, dict):
+                missing = [column for column in filterspec.columns if column not in item and column != "team"]
+                if missing:
+                    raise ValueError(f"an upsert needs: {', '.join(missing)}")
+                item = tuple(item.get(column) for column in filterspec.columns)
+            if len(item) != len(filterspec.columns):
+                raise ValueError(f"an upsert needs {len(filterspec.columns)} columns")
+            row = (int(item[0]),) + tuple(item[1:6]) + (int(item[6]),)
+            return filterspec().equals("id", row[0]), row, upsert, row
+        raise ValueError(f"unknown operation: {operation}")
+
+    def writeMany(self, operations):
+        """
+        Apply an ordered sequence of updates, deletes and upserts in a single transaction.
+
+        The whole batch costs one commit and is all-or-nothing. Small batches
+        are replayed on the columnar index; after a large one the index simply
+        reloads on its next search.
+
+        Parameters
+        ----------
+        operations : iterable of tuple
+            (operation, item) pairs, see _statementFor for the item forms.
+
+        Returns
+        -------
+        list of int
+            Rows affected by each item, or None if the batch failed and was rolled back.
+        """
+        statements = [(operation,) + self._statementFor(operation, item) for operation, item in operations]
+        before = self._stamp()
+        counts = self.dataAccess.batchQuery([(query, params) for _, _, _, query, params in statements])
+        if len(statements) <= 64:  # Replaying is a scan per item; beyond that a reload is cheaper
+
+            def replay(index):
+                for operation, spec, assignments, _, _ in statements:
+                    if operation == "delete":
+                        index.applyDelete(spec, before)
+                    elif operation == "upsert":
+                        index.applyDelete(spec, before)  # Drop the old version, if any, then append the new one
+                        index.applyInsert([assignments], before)
+                    else:
+                        index.applyUpdate(spec, assignments, before)
+
+            self._patchIndex(counts, replay)
+        return counts
+
+    def updateMany(self, changes):
         """
-        # SQL delete query with multiple conditions
-        query = f"DELETE FROM tblPlayers WHERE overall>={overall} AND nation='{nation}' AND position='{post}' AND firstName='{playername}'"
-        self.dataAccess.deleteQuery(query)  # Execute the delete query
+        Apply many updates in one transaction.
+
+        Parameters
+        ----------
+        changes : iterable
+            Dicts keyed by 'id' (or 'firstName') with the columns to set, e.g.
+            {"id": 7, "overall": 91, "position": "CB"}, or updateData-style
+            (playername, overall, post, nation) tuples.
+
+        Returns
+        -------
+        list of int
+            Rows updated by each change, or None if the batch failed.
+        """
+        return self.writeMany(("update", change) for change in changes)
+
+    def deleteMany(self, criteria):
+        """
+        Apply many deletes in one transaction.
+
+        Parameters
+        ----------
+        criteria : iterable
+            Player ids, dicts with an 'id', dicts with firstName, overall,
+            position and nation, or deletesData-style tuples.
+
+        Returns
+        -------
+        list of int
+            Rows deleted by each item, or None if the batch failed.
+        """
+        return self.writeMany(("delete", item) for item in criteria)
+
+    def upsertMany(self, rows):
+        """
+        Insert or replace many players by id in one transaction.
+
+        Parameters
+        ----------
+        rows : iterable
+            Whole players as dicts keyed by column or as table-ordered tuples.
+
+        Returns
+        -------
+        list of int
+            1 per row written, or None if the batch failed.
+        """
+        return self.writeMany(("upsert", row) for row in rows)
 
     def searchData(self, playername, overall, post, nation):
         """
@@ -138,23 +536,460 @@ class players:
         list
             List of tuples containing player records that match the search criteria.
         """
-        # Build the SQL query based on multiple filtering conditions
-        if post == "" and nation == "Any" and playername == "":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} ORDER BY overall DESC"
-        elif post == "" and nation != "Any" and playername != "":
-            query = f"SELECT * FROM tblPlayers WHERE overall >= {overall} AND nation='{nation}' AND firstName='{playername}' ORDER BY overall DESC"
-        elif nation == "Any" and post != "" and playername != "":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND position='{post}' AND firstName='{playername}' ORDER BY overall DESC"
-        elif playername == "" and nation != "Any" and post != "":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND position='{post}' AND nation='{nation}' ORDER BY overall DESC"
-        elif post == "" and nation == "Any" and playername != "":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND firstName='{playername}' ORDER BY overall DESC"
-        elif post == "" and playername == "" and nation != "Any":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND nation='{nation}' ORDER BY overall DESC"
-        elif playername == "" and nation == "Any" and post != "":
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND position='{post}' ORDER BY overall DESC"
-        else:
-            query = f"SELECT * FROM tblPlayers WHERE overall>={overall} AND nation='{nation}' AND position='{post}' AND firstName='{playername}' ORDER BY overall DESC"
-
-        rows = self.dataAccess.searchData(query)  # Execute the search query and get results
+        return self.search(self.filterFor(playername, overall, post, nation))
+
+    def search(self, spec, cancel=None):
+        """
+        Search for player records matching an arbitrary filter spec.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates to apply.
+        cancel : threading.Event or None
+            Interrupts the query when set.
+
+        Returns
+        -------
+        list
+            Matching player tuples, best overall first.
+        """
+        return self._cached(("search", spec.key()), lambda: self._search(spec, cancel))
+
+    def _search(self, spec, cancel):
+        """
+        Run a search without the result cache.
+        """
+        with self._indexLock:
+            index = self._indexFor(spec)
+            if index is not None:
+                return index.search(spec)  # Vectorized masks instead of a SQL round trip
+        query, params = spec.selectQuery()  # Same SQL text for every spec of the same shape
+        rows = self.dataAccess.searchData(query, params, cancel)  # Execute the search query and get results
         return rows  # Return the search results
+
+    def searchPage(self, spec, after=None, limit=200, cancel=None, cached=True):
+        """
+        Fetch one keyset page of players matching a filter spec.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates and sort order to apply.
+        after : tuple or None
+            Last row of the previous page, or None for the first page.
+        limit : int
+            Page size.
+        cancel : threading.Event or None
+            Interrupts the query when set.
+        cached : bool
+            Go through the result cache; a bulk scan passes False so its pages
+            do not evict the interactive results.
+
+        Returns
+        -------
+        list or None
+            Up to `limit` player tuples following `after` in sort order, or None
+            if the query failed or was cancelled; only a real result is short.
+        """
+        if spec.ranked():
+            # Relevance order has no seekable key: the first page carries every ranked row (up to rankLimit)
+            return self.search(spec, cancel) if after is None else []
+        key = spec.keyOf(after) if after is not None else None  # Seek past the previous page's last row
+        if not cached:
+            return self._searchPage(spec, key, limit, cancel)
+        return self._cached(("page", spec.key(), key, limit), lambda: self._searchPage(spec, key, limit, cancel))
+
+    def _searchPage(self, spec, key, limit, cancel):
+        """
+        Fetch one page without the result cache.
+        """
+        with self._indexLock:
+            index = self._indexFor(spec)
+            if index is not None:
+                return index.search(spec, after=key, limit=limit)
+        query, params = spec.selectQuery(after=key, limit=limit)
+        return self.dataAccess.searchData(query, params, cancel)
+
+    def countData(self, spec, cancel=None):
+        """
+        Count the players matching a filter spec without fetching them.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates to apply.
+        cancel : threading.Event or None
+            Interrupts the query when set.
+
+        Returns
+        -------
+        int or None
+            Number of matching players, or None if the query failed or was cancelled.
+        """
+        return self._cached(("count", spec.key()), lambda: self._countData(spec, cancel))
+
+    def _countData(self, spec, cancel):
+        """
+        Count without the result cache; None if the query failed.
+        """
+        with self._indexLock:
+            index = self._indexFor(spec)
+            if index is not None:
+                return index.count(spec)
+        query, params = spec.countQuery()
+        rows = self.dataAccess.searchData(query, params, cancel)
+        if rows is None:
+            return None
+        count = rows[0][0] if rows else 0
+        return min(count, spec.rankLimit) if spec.ranked() else count  # Ranked searches are capped
+
+    def topPerGroup(self, spec, dimension, k):
+        """
+        Return the k best players of every nation, club or position that match a spec.
+
+        One statement seeks each group's best rows through its index (see
+        filterspec.topQuery); the groups come from the analytics summary table.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates to apply; its sort order is ignored, players rank by overall then id.
+        dimension : str
+            'nation', 'club' or 'position'.
+        k : int
+            Players per group.
+
+        Returns
+        -------
+        dict
+            Group value (None for players without a club) -> up to k player tuples,
+            best first; None if the query failed.
+        """
+        if dimension not in analytics.dimensions:
+            raise ValueError(f"unknown dimension: {dimension}")
+        column = summaryDimensions[dimension]
+        groups = f"SELECT DISTINCT value FROM tblPlayersSummary WHERE dimension='{dimension}'"
+        query, params = spec.topQuery(column, k, groups)
+        rows = self._cached(("top", spec.key(), dimension, k), lambda: self.dataAccess.searchData(query, params))
+        if rows is None:
+            return None
+        position = filterspec.columns.index(column)
+        best = {}
+        for row in rows:
+            best.setdefault(row[position], []).append(row)
+        return best
+
+    def close(self):
+        """
+        Close the database connections held by the data access layer.
+        """
+        self.dataAccess.close()  # Release the writer and the pooled readers
+
+class analytics:
+    """
+    Aggregate statistics of the players, read from the trigger-maintained summary table.
+
+    Every answer comes from tblPlayersSummary (see FifaMigrations), which holds the
+    number of players per overall rating in total and per nation, club and
+    position, so a query reads at most a hundred rows per group instead of
+    grouping 'tblPlayers'. Players without an overall are not counted; players
+    without a club are counted under the club ''.
+
+    Attributes
+    ----------
+    dataAccess : accessdata
+        Data access object of the database to summarize.
+    dimensions : tuple of str
+        Groupings groups() accepts.
+
+    Methods
+    -------
+    groups(dimension):
+        Returns the player count, average and best overall of every nation, club or position.
+    histogram():
+        Returns the number of players per overall rating.
+    countAtLeast(overall):
+        Returns the number of players rated at least `overall`.
+    check(repair):
+        Compares the summary table with a recount and optionally rebuilds it.
+    rebuild():
+        Recomputes the summary table from scratch.
+    """
+
+    dimensions = tuple(dimension for dimension in summaryDimensions if dimension != "all")
+
+    def __init__(self, dataAccess):
+        """
+        Initialize the analytics over a database.
+
+        Parameters
+        ----------
+        dataAccess : accessdata
+            Data access object, e.g. players.dataAccess; its schema must be migrated.
+        """
+        self.dataAccess = dataAccess
+
+    def groups(self, dimension):
+        """
+        Return per-group statistics.
+
+        Parameters
+        ----------
+        dimension : str
+            'nation', 'club' or 'position'.
+
+        Returns
+        -------
+        list of tuples
+            (value, players, average overall, max overall), largest group first,
+            or None if the query failed.
+        """
+        if dimension not in self.dimensions:
+            raise ValueError(f"unknown dimension: {dimension}")
+        query = ("SELECT value, SUM(players), SUM(players * overall) * 1.0 / SUM(players), MAX(overall) "
+                 "FROM tblPlayersSummary WHERE dimension=? GROUP BY value ORDER BY 2 DESC, value")
+        return self.dataAccess.searchData(query, (dimension,))
+
+    def histogram(self):
+        """
+        Return the overall-rating histogram.
+
+        Returns
+        -------
+        list of tuples
+            (overall, players) for every rating held by at least one player, lowest
+            first, or None if the query failed.
+        """
+        query = "SELECT overall, players FROM tblPlayersSummary WHERE dimension='all' AND value='' ORDER BY overall"
+        return self.dataAccess.searchData(query)
+
+    def countAtLeast(self, overall):
+        """
+        Return the number of players rated `overall` or better.
+
+        Parameters
+        ----------
+        overall : int
+            Minimum overall rating.
+
+        Returns
+        -------
+        int
+            Number of players, or None if the query failed.
+        """
+        query = "SELECT IFNULL(SUM(players), 0) FROM tblPlayersSummary WHERE dimension='all' AND value='' AND overall>=?"
+        rows = self.dataAccess.searchData(query, (overall,))
+        return rows[0][0] if rows is not None else None
+
+    def check(self, repair=True):
+        """
+        Compare the summary table with a recount from 'tblPlayers'.
+
+        Runs inside a write transaction, so no write lands between the recount
+        and the comparison (or the repair).
+
+        Parameters
+        ----------
+        repair : bool
+            Rebuild the summary table when it is inconsistent.
+
+        Returns
+        -------
+        list of tuples
+            (problem, dimension, value, overall, players) rows found before any
+            repair, empty when consistent; None if the check failed.
+        """
+        try:
+            with self.dataAccess.transaction() as connection:
+                problems = checkSummaries(connection)
+                if problems and repair:
+                    rebuildSummaries(connection)
+                return problems
+        except Exception as err:
+            print(err)  # Print any error that occurs
+
+    def rebuild(self):
+        """
+        Recompute the summary table from scratch.
+
+        Returns
+        -------
+        bool
+            True on success, None if the rebuild failed.
+        """
+        try:
+            with self.dataAccess.transaction() as connection:
+                rebuildSummaries(connection)
+            return True
+        except Exception as err:
+            print(err)  # Print any error that occurs
+
+class writequeue:
+    """
+    Write-behind queue that groups individual writes into timed group commits.
+
+    Writes submitted within `delay` seconds of the first pending one are
+    applied together by players.writeMany on a background thread, in
+    submission order and with a single commit. Each submission returns a
+    Future resolved with its affected-row count once the group has committed
+    (None if the group failed). Until then, searches do not see the write.
+
+    Attributes
+    ----------
+    players : players
+        Business object the writes are applied through.
+    delay : float
+        Seconds a group stays open after its first write.
+    maxItems : int
+        Writes per group; a full group commits without waiting.
+
+    Methods
+    -------
+    update(change):
+        Queues an update, see players.updateMany.
+    delete(criteria):
+        Queues a delete, see players.deleteMany.
+    upsert(row):
+        Queues an insert-or-replace, see players.upsertMany.
+    submit(operation, item):
+        Queues an 'update', 'delete' or 'upsert'.
+    submitMany(operations):
+        Queues several writes at once, or none if any is malformed.
+    flush():
+        Commits everything queued so far and waits for it.
+    close():
+        Flushes and stops the background thread.
+    """
+
+    def __init__(self, players, delay=0.05, maxItems=1000):
+        """
+        Start the queue's commit thread.
+
+        Parameters
+        ----------
+        players : players
+            Business object to write through.
+        delay : float
+            Group commit window in seconds.
+        maxItems : int
+            Maximum writes per group.
+        """
+        self.players = players
+        self.delay = delay
+        self.maxItems = maxItems
+        self._items = []  # Pending (operation, item, future) triples
+        self._condition = threading.Condition()
+        self._urgent = False  # Set by flush() to commit without waiting for the window
+        self._busy = False  # A group is being written
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, item):
+        """
+        Queue one write.
+
+        Parameters
+        ----------
+        operation : str
+            'update', 'delete' or 'upsert'.
+        item : dict, tuple or int
+            The change, criteria or row, see players.writeMany.
+
+        Returns
+        -------
+        Future
+            Resolves to the affected-row count after the group commit.
+        """
+        return self.submitMany([(operation, item)])[0]
+
+    def submitMany(self, operations):
+        """
+        Queue several writes back to back, in order.
+
+        Every item is checked before any is queued, so a malformed one rejects
+        the whole list.
+
+        Parameters
+        ----------
+        operations : iterable of tuple
+            (operation, item) pairs, see submit.
+
+        Returns
+        -------
+        list of Future
+            One per write, in order.
+        """
+        operations = list(operations)
+        for operation, item in operations:
+            self.players._statementFor(operation, item)  # Reject a malformed item now, not with the whole group
+        futures = [Future() for _ in operations]
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("write queue is closed")
+            self._items.extend((operation, item, future) for (operation, item), future in zip(operations, futures))
+            self._condition.notify_all()
+        return futures
+
+    def update(self, change):
+        """Queue an update; returns a Future of the updated-row count."""
+        return self.submit("update", change)
+
+    def delete(self, criteria):
+        """Queue a delete; returns a Future of the deleted-row count."""
+        return self.submit("delete", criteria)
+
+    def upsert(self, row):
+        """Queue an insert-or-replace; returns a Future of the written-row count."""
+        return self.submit("upsert", row)
+
+    def _run(self):
+        """
+        Collect writes for up to `delay` seconds, then commit them as one group.
+        """
+        while True:
+            with self._condition:
+                while not self._items and not self._closed:
+                    self._condition.wait()
+                if not self._items:
+                    return  # Closed and drained
+                deadline = time.monotonic() + self.delay
+                while len(self._items) < self.maxItems and not (self._closed or self._urgent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                group, self._items = self._items[:self.maxItems], self._items[self.maxItems:]
+                self._urgent = bool(self._items) and self._urgent  # Keep flushing until drained
+                self._busy = True
+            try:
+                counts = self.players.writeMany((operation, item) for operation, item, _ in group)
+            except Exception as err:
+                print(err)  # Print any error, the group's futures resolve to None
+                counts = None
+            for position, (_, _, future) in enumerate(group):
+                future.set_result(counts[position] if counts is not None else None)
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    def flush(self):
+        """
+        Commit every queued write now and wait until it is durable.
+        """
+        with self._condition:
+            self._urgent = True
+            self._condition.notify_all()
+            while self._items or self._busy:
+                self._condition.wait()
+            self._urgent = False
+
+    def close(self):
+        """
+        Commit the remaining writes and stop the background thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
@@ -0,0 +1,182 @@
+import sys  # Import sys to estimate the size of cached results
+import threading  # Import threading to share the cache between search threads
+from collections import OrderedDict  # Import OrderedDict for least-recently-used ordering
+
+class resultcache:
+    """
+    Least-recently-used cache of search results for players.
+
+    Entries are keyed by the kind of read (search, page, count) and the
+    normalized filter spec (filterspec.key()), so specs built in a different
+    order share an entry. Every entry carries the accessdata.stamp() taken
+    before its query ran: the stamp's generation moves on every write through
+    the same accessdata and its PRAGMA data_version on every commit by another
+    connection or process. A lookup under a different stamp drops the whole
+    cache, since any write may change any result.
+
+    The cache is bounded both by its number of entries and by the estimated
+    memory of the rows it holds; the least recently used entries are evicted
+    first and a result larger than the memory bound is not cached at all.
+
+    Attributes
+    ----------
+    maxEntries : int
+        Maximum number of cached results.
+    maxBytes : int
+        Maximum estimated size of all cached results.
+    size : int
+        Estimated size of the cached results.
+    stamp : tuple or None
+        Database stamp the cached results correspond to.
+    hits, misses, evictions, invalidations : int
+        Lookups answered, lookups not answered, entries evicted for room and
+        entries dropped because the database changed.
+
+    Methods
+    -------
+    get(key, stamp):
+        Returns a cached result, or None.
+    put(key, stamp, value):
+        Caches a result.
+    clear():
+        Drops every entry.
+    stats():
+        Returns the counters and the current occupancy.
+    """
+
+    def __init__(self, maxEntries=64, maxBytes=32 * 1024 * 1024):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        maxEntries : int
+            Entry bound.
+        maxBytes : int
+            Memory bound in bytes.
+        """
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.size = 0
+        self.stamp = None
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (value, size), least recently used first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sizeOf(value, sample=64):
+        """
+        Estimate the memory held by a result: a list of row tuples or a number.
+
+        The rows' average size is measured on up to `sample` evenly spaced rows.
+
+        Parameters
+        ----------
+        value : list of tuples or int
+            Result to measure.
+        sample : int
+            Rows inspected.
+
+        Returns
+        -------
+        int
+            Estimated size in bytes.
+        """
+        if not isinstance(value, list):
+            return sys.getsizeof(value)
+        if not value:
+            return sys.getsizeof(value)
+        step = max(1, len(value) // sample)
+        rows = value[::step]
+        perRow = sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in rows) / len(rows)
+        return sys.getsizeof(value) + int(perRow * len(value))
+
+    def _invalidate(self, stamp):
+        """
+        Drop every entry if the database moved past the cached stamp.
+        """
+        if stamp != self.stamp:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.size = 0
+            self.stamp = stamp
+
+    def get(self, key, stamp):
+        """
+        Return a cached result.
+
+        Parameters
+        ----------
+        key : hashable
+            Entry key.
+        stamp : tuple
+            Current accessdata.stamp().
+
+        Returns
+        -------
+        Any
+            The cached result, or None on a miss.
+        """
+        with self._lock:
+            self._invalidate(stamp)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, stamp, value):
+        """
+        Cache a result computed at a given stamp.
+
+        Parameters
+        ----------
+        key : hashable
+            Entry key.
+        stamp : tuple
+            accessdata.stamp() taken before the result was read; if the
+            database has moved on since, the result is not cached.
+        value : Any
+            The result; None (a failed or cancelled read) is not cached.
+        """
+        if value is None:
+            return
+        size = self.sizeOf(value)
+        with self._lock:
+            if stamp != self.stamp or size > self.maxBytes:
+                return  # Stale already, or would flush the whole cache for one result
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while len(self._entries) > self.maxEntries or self.size > self.maxBytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.stamp = None
+
+    def stats(self):
+        """
+        Return the counters and the current occupancy.
+
+        Returns
+        -------
+        dict
+            hits, misses, evictions, invalidations, hitRate, entries and bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "hitRate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries), "bytes": self.size}
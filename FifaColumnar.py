@@ -0,0 +1,534 @@
+try:
+    import numpy as np  # Optional: the columnar engine is only available with NumPy installed
+except ImportError:
+    np = None
+
+class columnindex:
+    """
+    An in-memory, column-oriented copy of 'tblPlayers' filtered with NumPy masks.
+
+    overall is stored as int8 and id as int32; every text column is
+    dictionary-encoded into int32 codes, so an equality predicate becomes a
+    single vectorized integer comparison. Deleted rows are tombstoned in the
+    `alive` mask rather than compacted.
+
+    The copy is tied to the database by accessdata.stamp(). Writes made
+    through players are patched in place; any other change is detected by a
+    stamp mismatch and triggers a full reload on the next read. An index
+    loaded from a pack file has no database and is never reloaded.
+
+    Attributes
+    ----------
+    dataAccess : accessdata or None
+        Data access object the index is loaded from, None for a pack.
+    columns : tuple of str
+        Columns of 'tblPlayers' in table order.
+    arrays : dict
+        Column name -> NumPy array (codes for text columns).
+    dictionaries : dict
+        Text column name -> list of distinct strings (code -> string).
+    codes : dict
+        Text column name -> dict (string -> code).
+    alive : numpy.ndarray
+        False for rows deleted since the last load.
+    stamp : tuple or None
+        accessdata.stamp() the contents correspond to.
+
+    Methods
+    -------
+    load():
+        Reads the whole table into column arrays.
+    loadPack(pack):
+        Adopts the columns of a memory-mapped pack file.
+    refresh():
+        Reloads if the database changed behind the index's back.
+    supports(spec):
+        Tells whether a filter spec can be answered from the index.
+    search(spec, after, limit):
+        Returns matching rows in the spec's sort order.
+    count(spec):
+        Counts matching rows.
+    applyInsert(records, before), applyUpdate(spec, assignments, before), applyDelete(spec, before),
+    applyClear(before):
+        Patch the index after a write made through players.
+    """
+
+    columns = ("id", "firstName", "lastName", "nation", "team", "position", "overall")
+    text = ("firstName", "lastName", "nation", "team", "position")
+    dtypes = {"id": "int32", "overall": "int8"}
+
+    def __init__(self, dataAccess=None):
+        """
+        Initialize an empty index; call load(), refresh() or loadPack() before searching.
+
+        Parameters
+        ----------
+        dataAccess : accessdata or None
+            Data access object the index mirrors; None for an index filled by loadPack().
+        """
+        if np is None:
+            raise ImportError("the columnar engine requires NumPy")
+        self.dataAccess = dataAccess
+        self.stamp = None
+        self._reset()
+
+    def _reset(self):
+        """
+        Drop all rows and dictionaries.
+        """
+        self.dictionaries = {column: [] for column in self.text}
+        self.codes = {column: {} for column in self.text}
+        self.arrays = {column: np.empty(0, dtype=self.dtypes.get(column, "int32")) for column in self.columns}
+        self.alive = np.empty(0, dtype=bool)
+        self._rank = {}  # Text column -> code -> alphabetical rank, built on demand for sorting
+
+    def _encode(self, column, value):
+        """
+        Return the code of a text value, adding it to the dictionary if new.
+
+        Parameters
+        ----------
+        column : str
+            Text column.
+        value : str
+            Value to encode.
+
+        Returns
+        -------
+        int
+            The value's code.
+        """
+        codes = self.codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.dictionaries[column].append(value)
+            self._rank.pop(column, None)
+        return code
+
+    def _arrays(self, records):
+        """
+        Convert row tuples into a dict of column arrays.
+
+        Parameters
+        ----------
+        records : list of tuples
+            Full 'tblPlayers' rows.
+
+        Returns
+        -------
+        dict
+            Column name -> NumPy array.
+        """
+        arrays = {}
+        for position, column in enumerate(self.columns):
+            values = (row[position] for row in records)
+            if column in self.text:
+                codes = self.codes[column]
+                values = (codes[value] if value in codes else self._encode(column, value) for value in values)
+            arrays[column] = np.fromiter(values, dtype=self.dtypes.get(column, "int32"), count=len(records))
+        return arrays
+
+    def load(self, batch=100000):
+        """
+        Read the whole table into column arrays.
+
+        Parameters
+        ----------
+        batch : int
+            Rows converted per chunk; bounds the temporary Python tuples held at once.
+        """
+        stamp = self.dataAccess.stamp()  # Taken first so a concurrent write forces another reload
+        self._reset()
+        chunks = []
+        query = "SELECT id, firstName, lastName, nation, team, position, overall FROM tblPlayers ORDER BY id"
+        for rows in self.dataAccess.streamData(query, size=batch):
+            chunks.append(self._arrays(rows))
+        for column in self.columns:
+            parts = [chunk[column] for chunk in chunks]
+            if parts:
+                self.arrays[column] = np.concatenate(parts)
+        self.alive = np.ones(len(self.arrays["id"]), dtype=bool)
+        self.stamp = stamp
+
+    def loadPack(self, pack):
+        """
+        Adopt the columns of a pack file without converting any row.
+
+        id and the text codes are NumPy views over the pack's mapping; only
+        overall is copied, narrowed to int8. The pack must stay open while the
+        index is used.
+
+        Parameters
+        ----------
+        pack : FifaPack.playerpack
+            Mapped pack file.
+        """
+        self._reset()
+        for column, values, words in zip(pack.names, pack.columns, pack.words):
+            array = np.frombuffer(values, dtype=np.int32)
+            self.arrays[column] = array if column not in self.dtypes else array.astype(self.dtypes[column], copy=False)
+            if words is not None:
+                self.dictionaries[column] = list(words)
+                self.codes[column] = {word: code for code, word in enumerate(words)}
+        self.alive = np.ones(pack.rows, dtype=bool)
+        self.stamp = None
+
+    def refresh(self):
+        """
+        Reload the index if the database changed since it was loaded or patched.
+        """
+        if self.dataAccess is not None and self.stamp != self.dataAccess.stamp():
+            self.load()
+
+    def supports(self, spec):
+        """
+        Tell whether every predicate and sort key of a spec is understood by the index.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec to check.
+
+        Returns
+        -------
+        bool
+            True if search(spec) gives the same answer as SQL; full-text
+            predicates always go to SQLite.
+        """
+        return spec.match is None and \
+            all(column in self.columns and operator in ("=", ">=", "<=", "in")
+                for column, operator in spec.predicates) and \
+            all(column in self.columns for column, _ in spec.order)
+
+    def _mask(self, spec):
+        """
+        Evaluate a spec's predicates as a boolean mask over all rows.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates to evaluate.
+
+        Returns
+        -------
+        numpy.ndarray
+            True for live rows that match.
+        """
+        mask = self.alive.copy()
+        for (column, operator), value in spec.predicates.items():
+            array = self.arrays[column]
+            if column in self.text:
+                if operator == "in":
+                    wanted = [self.codes[column][v] for v in value if v in self.codes[column]]
+                    mask &= self._oneOf(array, wanted)
+                    continue
+                if operator == "=":
+                    code = self.codes[column].get(value)
+                    if code is None:
+                        return np.zeros_like(mask)  # Value never seen: nothing matches
+                    mask &= array == code
+                    continue
+                array = self._ranks(column)[array]  # Range over text compares alphabetically
+                value = self._rankOf(column, value)
+            if operator == "=":
+                mask &= array == value
+            elif operator == ">=":
+                mask &= array >= value
+            elif operator == "<=":
+                mask &= array <= value
+            else:
+                mask &= self._oneOf(array, list(value))
+        return mask
+
+    def _oneOf(self, array, values):
+        """
+        Return array IN values as a mask.
+
+        Short lists are OR-ed equality tests, which beat np.isin's sort-based
+        path by an order of magnitude; long lists fall back to np.isin.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            Column values.
+        values : list
+            Accepted values.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask.
+        """
+        if len(values) > 16:
+            return np.isin(array, values)
+        mask = np.zeros(len(array), dtype=bool)
+        for value in values:
+            mask |= array == value
+        return mask
+
+    def _ranks(self, column):
+        """
+        Return, for a text column, the alphabetical rank of every code.
+
+        Parameters
+        ----------
+        column : str
+            Text column.
+
+        Returns
+        -------
+        numpy.ndarray
+            rank[code] is the position of the code's string in sorted order.
+        """
+        if column not in self._rank:
+            words = self.dictionaries[column]
+            order = sorted(range(len(words)), key=lambda code: (words[code] is not None, words[code] or ""))  # NULL first
+            rank = np.empty(len(words), dtype=np.int32)
+            rank[order] = np.arange(len(words), dtype=np.int32)
+            self._rank[column] = rank
+        return self._rank[column]
+
+    def _rankOf(self, column, value):
+        """
+        Return the rank a text value would take among a column's sorted strings.
+
+        Parameters
+        ----------
+        column : str
+            Text column.
+        value : str
+            Value to place.
+
+        Returns
+        -------
+        float
+            Exact rank for a known value, otherwise a half-step between neighbours.
+        """
+        code = self.codes[column].get(value)
+        if code is not None:
+            return self._ranks(column)[code]
+        if value is None:
+            return -0.5  # NULL sorts before every string
+        return sum(1 for word in self.dictionaries[column] if word is None or word < value) - 0.5
+
+    def _sortKey(self, column, descending, rows):
+        """
+        Return one sort-key array for the given rows.
+
+        Parameters
+        ----------
+        column : str
+            Sort column.
+        descending : bool
+            True to negate the key so ascending order sorts it descending.
+        rows : numpy.ndarray
+            Row positions.
+
+        Returns
+        -------
+        numpy.ndarray
+            Integer keys; text columns are replaced by their alphabetical rank.
+        """
+        values = self.arrays[column][rows]
+        if column in self.text:
+            values = self._ranks(column)[values]
+        elif values.dtype == np.int8:
+            values = values.astype(np.int16)  # Room to negate without overflowing
+        return -values if descending else values
+
+    def _sortKeys(self, spec, rows):
+        """
+        Return the sort-key arrays of the given rows, most significant first.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec supplying the sort order.
+        rows : numpy.ndarray
+            Row positions.
+
+        Returns
+        -------
+        list of numpy.ndarray
+            One array per sort key, negated for descending keys.
+        """
+        return [self._sortKey(column, descending, rows) for column, descending in spec.order]
+
+    def _seekMask(self, spec, rows, after):
+        """
+        Keep only rows sorting strictly after a keyset position.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec supplying the sort order.
+        rows : numpy.ndarray
+            Candidate row positions.
+        after : tuple
+            Sort key of the last delivered row (table values, not codes).
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask over `rows`.
+        """
+        keys = self._sortKeys(spec, rows)
+        bounds = []
+        for (column, descending), value in zip(spec.order, after):
+            bound = self._rankOf(column, value) if column in self.text else value
+            bounds.append(-bound if descending else bound)
+        later = np.zeros(len(rows), dtype=bool)
+        equal = np.ones(len(rows), dtype=bool)
+        for key, bound in zip(keys, bounds):
+            later |= equal & (key > bound)
+            equal &= key == bound
+        return later
+
+    def _rows(self, positions):
+        """
+        Decode row positions back into 'tblPlayers' tuples.
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            Row positions in output order.
+
+        Returns
+        -------
+        list of tuples
+            Decoded rows.
+        """
+        columns = []
+        for column in self.columns:
+            values = self.arrays[column][positions].tolist()
+            if column in self.text:
+                words = self.dictionaries[column]
+                values = [words[code] for code in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+    def search(self, spec, after=None, limit=None):
+        """
+        Return the rows matching a spec in its sort order.
+
+        With a limit, only the best `limit` candidates are selected with
+        argpartition before the final sort, so the cost is linear in the number
+        of matches rather than n log n.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates and sort order.
+        after : tuple or None
+            Sort key of the last row of the previous page.
+        limit : int or None
+            Maximum number of rows.
+
+        Returns
+        -------
+        list of tuples
+            Matching rows.
+        """
+        rows = np.flatnonzero(self._mask(spec))
+        if after is not None:
+            rows = rows[self._seekMask(spec, rows, after)]
+        if limit is not None and len(rows) > limit:
+            # Keep every candidate whose first key can still reach the top `limit`; lexsort settles ties
+            first = self._sortKey(*spec.order[0], rows)
+            cut = np.partition(first, limit - 1)[limit - 1]
+            rows = rows[first <= cut]
+        keys = self._sortKeys(spec, rows)
+        order = np.lexsort(keys[::-1])  # lexsort treats its last key as the primary one
+        if limit is not None:
+            order = order[:limit]
+        return self._rows(rows[order])
+
+    def count(self, spec):
+        """
+        Count the rows matching a spec.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Predicates to evaluate.
+
+        Returns
+        -------
+        int
+            Number of matching rows.
+        """
+        return int(np.count_nonzero(self._mask(spec)))
+
+    def _patched(self, before):
+        """
+        Adopt the database's new stamp after a write through players.
+
+        Parameters
+        ----------
+        before : tuple
+            Stamp taken before the write; if the index was already stale it stays stale.
+        """
+        if self.dataAccess is not None and self.stamp == before:
+            self.stamp = self.dataAccess.stamp()
+
+    def applyInsert(self, records, before):
+        """
+        Append rows written by players.createData.
+
+        Parameters
+        ----------
+        records : list of tuples
+            Inserted rows.
+        before : tuple
+            Stamp taken before the write.
+        """
+        arrays = self._arrays(records)
+        for column in self.columns:
+            self.arrays[column] = np.concatenate([self.arrays[column], arrays[column]])
+        self.alive = np.concatenate([self.alive, np.ones(len(records), dtype=bool)])
+        self._patched(before)
+
+    def applyUpdate(self, spec, assignments, before):
+        """
+        Apply an UPDATE made through players to the matching rows.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec selecting the updated rows.
+        assignments : dict
+            Column -> new value.
+        before : tuple
+            Stamp taken before the write.
+        """
+        mask = self._mask(spec)
+        for column, value in assignments.items():
+            self.arrays[column][mask] = self._encode(column, value) if column in self.text else value
+        self._patched(before)
+
+    def applyDelete(self, spec, before):
+        """
+        Tombstone the rows removed by a DELETE made through players.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec selecting the deleted rows.
+        before : tuple
+            Stamp taken before the write.
+        """
+        self.alive &= ~self._mask(spec)
+        self._patched(before)
+
+    def applyClear(self, before):
+        """
+        Empty the index after players.deleteData.
+
+        Parameters
+        ----------
+        before : tuple
+            Stamp taken before the write.
+        """
+        self._reset()
+        self._patched(before)
@@ -1,31 +1,291 @@
+import itertools  # Import itertools to name the in-memory databases
+import os  # Import os to replace the database file atomically
 import sqlite3  # Import the SQLite3 module for database operations
+import threading  # Import threading to guard the shared writer connection
+import time  # Import time to measure statements for the metrics collector
+from contextlib import contextmanager  # Import contextmanager to lend pooled connections
+from queue import Empty, LifoQueue  # Import a LIFO queue to pool read connections
+
+_memoryNames = itertools.count()  # Distinguishes the in-memory copies opened by one process
 
 class accessdata:
     """
     A class to handle basic SQLite database operations: insert, delete, update, and search.
 
+    The class owns one long-lived writer connection and a small pool of read
+    connections. Every connection is opened once with WAL journaling and the
+    configured cache, mmap and synchronous pragmas, and is reused until close().
+
+    With `memory`, the database file is copied at start-up into an in-memory
+    database (SQLite's memdb VFS, which every connection of the pool shares)
+    with the backup API, and every read and write is served from memory.
+    The file is only written by snapshots: the backup API copies the memory
+    database into a temporary file next to it, which is synced and then
+    renamed over the database, so a crash leaves either the previous or the
+    new snapshot, never a mix. Snapshots are taken every `snapshotSeconds`,
+    on snapshot() and on close(), and skipped when nothing changed since the
+    last one. The memory database has no WAL: a write waits for the reads
+    running at that moment, and no other process may write to the file.
+
     Attributes
     ----------
     connectionString : str
         The SQLite database file path.
-    
+    cacheSize : int
+        Page cache size passed to PRAGMA cache_size (negative values are KiB).
+    mmapSize : int
+        Bytes of the database file to memory-map (PRAGMA mmap_size).
+    synchronous : str
+        Synchronous level for every connection (OFF, NORMAL, FULL or EXTRA).
+    readers : int
+        Maximum number of pooled read connections.
+    statementCache : int
+        Prepared statements cached per connection.
+    generation : int
+        Incremented by every write made through this object.
+    metrics : querymetrics or None
+        Receives the timing, row counts and error of every statement; None disables instrumentation.
+    trace : callable or None
+        sqlite3 trace callback installed on every connection.
+    memory : bool
+        Serve the database from an in-memory copy, see above.
+    snapshotSeconds : float
+        Interval of the automatic snapshots in memory mode; 0 disables them.
+
     Methods
     -------
     insertQuery(query, records):
         Inserts multiple records into the database.
-    deleteQuery(query):
+    deleteQuery(query, params):
         Deletes records from the database.
-    updateQuery(query):
+    updateQuery(query, params):
         Updates records in the database.
-    searchData(query):
-        Executes a SELECT query and returns the results.
+    returningQuery(query, params):
+        Runs a write with a RETURNING clause and returns the rows it reports.
+    batchQuery(statements):
+        Runs many writes in one transaction and returns each one's row count.
+    searchData(query, params, cancel):
+        Executes a SELECT query and returns the results; it can be cancelled from another thread.
+    transaction():
+        Lends the writer connection inside an explicit transaction.
+    streamData(query, params, size):
+        Yields the rows of a SELECT query in batches.
+    dataVersion():
+        Returns SQLite's data_version, which moves on every commit by another connection.
+    stamp():
+        Returns a token that changes whenever the table contents may have changed.
+    snapshot():
+        Writes the in-memory copy back to the database file.
+    close():
+        Closes the writer and every pooled read connection, after a last snapshot in memory mode.
     """
 
-    def __init__(self):
+    def __init__(self, connectionString="FIFA24.db", cacheSize=-16000, mmapSize=64 * 1024 * 1024,
+                 synchronous="NORMAL", readers=4, statementCache=256, metrics=None, trace=None, memory=False,
+                 snapshotSeconds=0):
+        """
+        Initialize the accessdata class with the database connection string and pragmas.
+
+        Parameters
+        ----------
+        connectionString : str
+            SQLite database file path.
+        cacheSize : int
+            Page cache size for each connection (negative values are KiB).
+        mmapSize : int
+            Bytes to memory-map for reads, 0 disables mmap.
+        synchronous : str
+            Synchronous level; NORMAL is durable enough under WAL and avoids an fsync per commit.
+        readers : int
+            Maximum number of read connections kept in the pool.
+        statementCache : int
+            Number of prepared statements each connection keeps for reuse.
+        metrics : querymetrics or None
+            Collector called as metrics.record(...) after every statement (see FifaMetrics).
+        trace : callable or None
+            Called by SQLite with the text of every statement it runs, triggers included
+            (e.g. querymetrics.trace); costs a Python call per statement.
+        memory : bool
+            Load the database into memory and write it back through snapshots.
+        snapshotSeconds : float
+            Seconds between automatic snapshots in memory mode; 0 only snapshots on demand and on close().
         """
-        Initialize the accessdata class with the database connection string.
+        self.connectionString = connectionString  # SQLite database file
+        self.cacheSize = cacheSize
+        self.mmapSize = mmapSize
+        self.synchronous = synchronous
+        self.readers = readers
+        self.statementCache = statementCache
+        self._writer = None  # Opened lazily on the first write
+        self._writerLock = threading.Lock()  # Serializes every use of the writer connection
+        self._pool = LifoQueue()  # Idle read connections, most recently used first
+        self._poolLock = threading.Lock()  # Guards the closed flag
+        self._available = threading.Semaphore(readers)  # Caps concurrent readers at the pool size
+        self._closed = False
+        self._watch = None  # Dedicated connection for PRAGMA data_version
+        self._watchLock = threading.Lock()
+        self.generation = 0
+        self.metrics = metrics
+        self.trace = trace
+        self.memory = memory
+        self.snapshotSeconds = snapshotSeconds
+        self._target = connectionString  # What every connection opens
+        self._anchor = None  # Keeps the in-memory database alive and is the snapshots' source
+        self._snapshotLock = threading.Lock()
+        self._saved = None  # stamp() of the contents last written to the file
+        self._stopSnapshots = threading.Event()
+        self._snapshots = None  # Thread taking the timed snapshots
+        if memory:
+            self._target = f"file:/fifa-{os.getpid()}-{next(_memoryNames)}?vfs=memdb"
+            self._load()
+            if snapshotSeconds > 0:
+                self._snapshots = threading.Thread(target=self._snapshotLoop, name="snapshots", daemon=True)
+                self._snapshots.start()
+
+    def _load(self):
+        """
+        Copy the database file into the in-memory database.
+
+        The file is read with serialize() so that the WAL flag in its header
+        can be cleared; the backup API then copies it into the shared memory database.
+        """
+        started = time.perf_counter()
+        source = sqlite3.connect(self.connectionString)
+        try:
+            image = bytearray(source.serialize())
+        finally:
+            source.close()
+        if image:
+            image[18:20] = b"\x01\x01"  # Clear the WAL flag of the header: memdb cannot open a WAL database
+        staging = sqlite3.connect(":memory:")
+        try:
+            staging.deserialize(image)
+            self._anchor = self._connect()
+            staging.backup(self._anchor)
+        finally:
+            staging.close()
+        self._saved = self.stamp()
+        self._record("LOAD", None, started)
+
+    def _connect(self):
         """
-        self.connectionString = "FIFA24.db"  # SQLite database file
+        Open a new connection and apply the configured pragmas.
+
+        Returns
+        -------
+        sqlite3.Connection
+            A connection that may be handed between threads (access is serialized by the pool).
+        """
+        connection = sqlite3.connect(self._target, check_same_thread=False, cached_statements=self.statementCache,
+                                     uri=self.memory)
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers no longer block the writer (memdb keeps its own mode)
+        connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        connection.execute(f"PRAGMA cache_size={int(self.cacheSize)}")
+        connection.execute(f"PRAGMA mmap_size={int(self.mmapSize)}")
+        connection.execute("PRAGMA temp_store=MEMORY")  # Keep sorter spill files off the disk
+        if self.trace is not None:
+            connection.set_trace_callback(self.trace)
+        return connection
+
+    def _record(self, query, params, started, returned=None, affected=None, error=None, connection=None):
+        """
+        Report a finished statement to the metrics collector, if there is one.
+
+        Parameters
+        ----------
+        query : str
+            SQL text.
+        params : tuple or None
+            Bound values (None for executemany).
+        started : float
+            time.perf_counter() when the statement started.
+        returned : int or None
+            Rows fetched.
+        affected : int or None
+            Rows changed.
+        error : Exception or None
+            Error raised by the statement.
+        connection : sqlite3.Connection or None
+            Connection the statement ran on, still held by the caller.
+        """
+        if self.metrics is not None:
+            self.metrics.record(query, params, time.perf_counter() - started, returned, affected, error, connection)
+
+    @contextmanager
+    def _writing(self):
+        """
+        Lend the writer connection to the caller while holding the writer lock.
+
+        Yields
+        ------
+        sqlite3.Connection
+            The shared writer connection.
+        """
+        with self._writerLock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("accessdata is closed")
+            if self._writer is None:
+                self._writer = self._connect()
+            try:
+                yield self._writer
+            finally:
+                self.generation += 1  # Any attempted write invalidates derived data
+
+    @contextmanager
+    def _reading(self):
+        """
+        Lend a pooled read connection to the caller and return it afterwards.
+
+        Yields
+        ------
+        sqlite3.Connection
+            An idle read connection from the pool (opened on demand).
+        """
+        self._available.acquire()  # Wait while every reader is busy
+        try:
+            try:
+                connection = self._pool.get_nowait()
+            except Empty:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("accessdata is closed")
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                with self._poolLock:
+                    closed = self._closed
+                if closed:
+                    connection.close()  # close() ran while this reader was lent out
+                else:
+                    self._pool.put(connection)
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of statements on the writer inside one explicit transaction.
+
+        The transaction commits when the block finishes and rolls back if it raises.
+
+        Yields
+        ------
+        sqlite3.Connection
+            The writer connection with a transaction already open.
+        """
+        with self._writing() as connection:
+            started = time.perf_counter()
+            changes = connection.total_changes
+            connection.execute("BEGIN IMMEDIATE")  # Take the write lock up front
+            try:
+                yield connection
+            except BaseException as err:
+                connection.rollback()
+                self._record("TRANSACTION", None, started, error=err)
+                raise
+            else:
+                connection.commit()
+                self._record("TRANSACTION", None, started, affected=connection.total_changes - changes)
 
     # Insert data into the database
     def insertQuery(self, query, records):
@@ -38,68 +298,332 @@ class accessdata:
             SQL insert query with placeholders.
         records : list of tuples
             Data records to insert.
+
+        Returns
+        -------
+        int
+            Number of inserted rows, or None if the insert failed.
         """
+        started = time.perf_counter()
         try:
-            # Connect to the SQLite database and automatically close the connection using 'with'
-            with sqlite3.connect(self.connectionString) as connection:
-                connection.executemany(query, records)  # Execute the insert query for multiple records
-                connection.commit()  # Commit changes to the database
+            with self._writing() as connection:
+                with connection:  # Commit on success, roll back on error
+                    affected = connection.executemany(query, records).rowcount  # Execute the insert query for multiple records
+                self._record(query, None, started, affected=affected)
+                return affected
         except Exception as err:
+            self._record(query, None, started, error=err)
             print(err)  # Print any error that occurs
 
     # Delete data from the database
-    def deleteQuery(self, query):
+    def deleteQuery(self, query, params=()):
         """
         Delete records from the database.
 
         Parameters
         ----------
         query : str
-            SQL delete query.
+            SQL delete query with placeholders.
+        params : tuple
+            Values bound to the placeholders.
+
+        Returns
+        -------
+        int
+            Number of deleted rows, or None if the delete failed.
         """
+        started = time.perf_counter()
         try:
-            with sqlite3.connect(self.connectionString) as connection:
-                connection.execute(query)  # Execute the delete query
-                connection.commit()  # Commit changes
+            with self._writing() as connection:
+                with connection:
+                    affected = connection.execute(query, params).rowcount  # Execute the delete query
+                self._record(query, params, started, affected=affected, connection=connection)
+                return affected
         except Exception as err:
+            self._record(query, params, started, error=err)
             print(err)  # Print any error
 
     # Update data in the database
-    def updateQuery(self, query):
+    def updateQuery(self, query, params=()):
         """
         Update records in the database.
 
         Parameters
         ----------
         query : str
-            SQL update query.
+            SQL update query with placeholders.
+        params : tuple
+            Values bound to the placeholders.
+
+        Returns
+        -------
+        int
+            Number of updated rows, or None if the update failed.
+        """
+        started = time.perf_counter()
+        try:
+            with self._writing() as connection:
+                with connection:
+                    affected = connection.execute(query, params).rowcount  # Execute the update query
+                self._record(query, params, started, affected=affected, connection=connection)
+                return affected
+        except Exception as err:
+            self._record(query, params, started, error=err)
+            print(err)  # Print any error
+
+    # Run a write that reports the rows it changed
+    def returningQuery(self, query, params=()):
+        """
+        Execute an INSERT, UPDATE or DELETE ending in RETURNING and commit it.
+
+        Parameters
+        ----------
+        query : str
+            SQL write with a RETURNING clause.
+        params : tuple
+            Values bound to the placeholders.
+
+        Returns
+        -------
+        list of tuples
+            The rows reported by RETURNING, or None if the write failed.
         """
+        started = time.perf_counter()
         try:
-            with sqlite3.connect(self.connectionString) as connection:
-                connection.execute(query)  # Execute the update query
-                connection.commit()  # Commit changes
+            with self._writing() as connection:
+                with connection:
+                    rows = connection.execute(query, params).fetchall()  # Every row must be read before the commit
+                self._record(query, params, started, affected=len(rows), connection=connection)
+                return rows
         except Exception as err:
+            self._record(query, params, started, error=err)
+            print(err)  # Print any error
+
+    # Run many writes in one transaction
+    def batchQuery(self, statements):
+        """
+        Execute a sequence of write statements inside a single transaction.
+
+        Every statement reuses its cached prepared statement, so this is as fast
+        as executemany while still reporting the row count of each statement;
+        the whole batch costs one commit and rolls back as a unit on error.
+
+        Parameters
+        ----------
+        statements : iterable of tuple
+            (query, params) pairs, executed in order.
+
+        Returns
+        -------
+        list of int
+            Rows affected by each statement, or None if the batch failed and was rolled back.
+        """
+        started = time.perf_counter()
+        try:
+            with self._writing() as connection:
+                counts = []
+                with connection:  # One transaction, one commit for the whole batch
+                    for query, params in statements:
+                        begun = time.perf_counter()
+                        counts.append(connection.execute(query, params).rowcount)
+                        self._record(query, params, begun, affected=counts[-1], connection=connection)
+                self._record("BATCH", None, started, affected=sum(counts))
+                return counts
+        except Exception as err:
+            self._record("BATCH", None, started, error=err)
             print(err)  # Print any error
 
     # Search data in the database
-    def searchData(self, query):
+    def searchData(self, query, params=(), cancel=None):
         """
         Execute a SELECT query and return the result rows.
 
         Parameters
         ----------
         query : str
-            SQL select query.
-        
+            SQL select query with placeholders.
+        params : tuple
+            Values bound to the placeholders.
+        cancel : threading.Event or None
+            When set from another thread, the running query is interrupted.
+
         Returns
         -------
         list of tuples
-            Query result rows.
+            Query result rows, or None if the query failed or was cancelled.
         """
+        started = time.perf_counter()
         try:
-            with sqlite3.connect(self.connectionString) as connection:
-                results = connection.execute(query)  # Execute the select query
-                rows = results.fetchall()  # Fetch all rows from the query result
+            with self._reading() as connection:
+                if cancel is not None:
+                    # SQLite polls the handler every 1000 VM steps; a non-zero result aborts the statement
+                    connection.set_progress_handler(cancel.is_set, 1000)
+                try:
+                    results = connection.execute(query, params)  # Execute the select query
+                    rows = results.fetchall()  # Fetch all rows from the query result
+                finally:
+                    if cancel is not None:
+                        connection.set_progress_handler(None, 0)  # Do not leak the handler to the next borrower
+                self._record(query, params, started, returned=len(rows), connection=connection)
                 return rows  # Return the results
+        except sqlite3.OperationalError as err:
+            self._record(query, params, started, error=err)
+            if cancel is None or not cancel.is_set():
+                print(err)  # Print any error; a cancelled query is expected to be interrupted
         except Exception as err:
+            self._record(query, params, started, error=err)
             print(err)  # Print any error
+
+    def streamData(self, query, params=(), size=10000):
+        """
+        Execute a SELECT query and yield its rows batch by batch.
+
+        The read connection stays checked out until the generator is exhausted or closed.
+
+        Parameters
+        ----------
+        query : str
+            SQL select query with placeholders.
+        params : tuple
+            Values bound to the placeholders.
+        size : int
+            Rows fetched per batch.
+
+        Yields
+        ------
+        list of tuples
+            Up to `size` rows at a time.
+        """
+        with self._reading() as connection:
+            started = time.perf_counter()
+            returned = 0
+            cursor = connection.execute(query, params)
+            cursor.arraysize = size
+            try:
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    returned += len(rows)
+                    yield rows
+            finally:
+                cursor.close()  # Finish the statement before the connection goes back to the pool
+                self._record(query, params, started, returned=returned)  # Includes the consumer's time between batches
+
+    def dataVersion(self):
+        """
+        Return PRAGMA data_version from a dedicated connection.
+
+        The value changes whenever any other connection, including this object's
+        writer or another process, commits to the database.
+
+        Returns
+        -------
+        int
+            The current data version.
+        """
+        with self._watchLock:
+            if self._watch is None:
+                self._watch = self._connect()
+            return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def stamp(self):
+        """
+        Return a token that changes whenever the database contents may have changed.
+
+        Returns
+        -------
+        tuple
+            (generation, data_version).
+        """
+        return self.generation, self.dataVersion()
+
+    def _snapshotLoop(self):
+        """
+        Take a snapshot every snapshotSeconds until close().
+        """
+        while not self._stopSnapshots.wait(self.snapshotSeconds):
+            self.snapshot()
+
+    def snapshot(self):
+        """
+        Write the in-memory copy back to the database file, atomically.
+
+        The backup runs in one step, holding a read lock on the memory
+        database: reads go on, writes wait until the copy is done. A copy in
+        smaller steps would restart on every write and might never finish.
+
+        Returns
+        -------
+        bool
+            True if a snapshot was written, False if nothing changed since the
+            last one (or not in memory mode), None if it failed.
+        """
+        if self._anchor is None:
+            return False
+        with self._snapshotLock:
+            stamp = self.stamp()  # Taken first: a write racing the copy is saved again next time
+            if stamp == self._saved:
+                return False
+            started = time.perf_counter()
+            temporary = self.connectionString + ".snapshot"
+            try:
+                for leftover in (temporary, temporary + "-journal"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)  # Half-written by a crash
+                target = sqlite3.connect(temporary)
+                try:
+                    target.execute("PRAGMA journal_mode=OFF")  # The rename is what makes the snapshot atomic
+                    target.execute("PRAGMA synchronous=OFF")  # One fsync below instead of one per commit
+                    self._anchor.backup(target)
+                finally:
+                    target.close()
+                with open(temporary, "rb+") as written:
+                    os.fsync(written.fileno())  # On disk before it takes the database's name
+                os.replace(temporary, self.connectionString)
+                if hasattr(os, "O_DIRECTORY"):  # Make the rename itself durable (POSIX only)
+                    directory = os.open(os.path.dirname(os.path.abspath(self.connectionString)), os.O_DIRECTORY)
+                    try:
+                        os.fsync(directory)
+                    finally:
+                        os.close(directory)
+                self._saved = stamp
+                self._record("SNAPSHOT", None, started)
+                return True
+            except Exception as err:
+                self._record("SNAPSHOT", None, started, error=err)
+                print(err)  # Print any error, the previous snapshot is still intact
+
+    def close(self):
+        """
+        Close the writer and all idle read connections.
+
+        In memory mode, a last snapshot is written first. Readers that are
+        still lent out are closed as soon as they are returned. Calling
+        close() more than once is harmless.
+        """
+        if self._snapshots is not None:
+            self._stopSnapshots.set()
+            self._snapshots.join()
+            self._snapshots = None
+        if not self._closed:
+            self.snapshot()
+        with self._poolLock:
+            self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except Empty:
+                break
+        with self._writerLock:
+            if self._writer is not None:
+                self._writer.execute("PRAGMA optimize")  # Refresh planner statistics before exit
+                self._writer.close()
+                self._writer = None
+        with self._watchLock:
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+        if self._anchor is not None:
+            self._anchor.close()  # The in-memory database goes with its last connection
+            self._anchor = None
@@ -1,17 +1,326 @@
 from PyQt6.QtCore import *  # Import Qt core classes
 from PyQt6.QtWidgets import *  # Import Qt widget classes
 from PyQt6.QtGui import *  # Import Qt GUI classes
+from array import array  # Import array for the compact per-column storage
+from operator import itemgetter  # Import itemgetter to split rows into columns
+
+# Roles and flags data() and headerData() compare against, looked up once instead of per cell.
+_display = int(Qt.ItemDataRole.DisplayRole)
+_alignment = int(Qt.ItemDataRole.TextAlignmentRole)
+_horizontal = Qt.Orientation.Horizontal
+_center = Qt.AlignmentFlag.AlignCenter
+
+class columnstore:
+    """
+    List-like storage of 'tblPlayers' rows as one compact array per column.
+
+    Integer columns (id and overall) are kept as array('i'); every other column
+    is dictionary-encoded: each distinct value is stored once in `words` and
+    the rows hold its array('i') code. A row costs 4 bytes per column instead
+    of a tuple and a string object per cell. An integer column that receives
+    anything but an int (e.g. a NULL) is dictionary-encoded from then on.
+
+    Rows are decoded to tuples on access, so the store can stand in for the
+    list of row tuples: len(), indexing, iteration, append/extend/insert/pop,
+    item assignment, reverse() and sort(key, reverse) behave as on a list.
+
+    Attributes
+    ----------
+    columns : list of array
+        Per column, the values (integer columns) or the dictionary codes.
+    words : list of list or None
+        Per column, code -> value for dictionary-encoded columns, None for integer ones.
+    codes : list of dict or None
+        Per column, value -> code for dictionary-encoded columns, None for integer ones.
+    rebuildAfter : int
+        Structural changes after which find() rebuilds its id index.
+
+    Methods
+    -------
+    cell(row, column):
+        Returns one value without decoding the whole row.
+    find(identifier):
+        Returns the row number holding a player id.
+    fromPack(pack):
+        Builds a store from a memory-mapped pack file.
+    """
+
+    integers = (0, 6)  # id and overall
+    rebuildAfter = 256
+
+    def __init__(self, rows=(), width=7):
+        """
+        Initialize the store.
+
+        Parameters
+        ----------
+        rows : iterable of tuples
+            Initial rows.
+        width : int
+            Number of columns.
+        """
+        self.columns = [array("i") for _ in range(width)]
+        self.words = [None if column in self.integers else [] for column in range(width)]
+        self.codes = [None if column in self.integers else {} for column in range(width)]
+        self._index = None  # Player id -> row number as of the last rebuild, built on first find()
+        self._moves = []  # (row number, +1 inserted / -1 removed) since the index was built
+        self._late = {}  # Player id -> (row number, moves already applied) for rows added since
+        self.extend(rows)
+
+    @classmethod
+    def fromPack(cls, pack):
+        """
+        Build a store from a pack file without decoding any row.
+
+        The pack's int32 columns already are this store's layout, so each is
+        copied into its array with a single memcpy; only the dictionaries are
+        rebuilt, one entry per distinct value.
+
+        Parameters
+        ----------
+        pack : FifaPack.playerpack
+            Mapped pack file.
+
+        Returns
+        -------
+        columnstore
+            A store holding every row of the pack, in pack (id) order.
+        """
+        store = cls(width=len(pack.columns))
+        for column, values in zip(store.columns, pack.columns):
+            column.frombytes(values.cast("B"))
+        for position, words in enumerate(pack.words):
+            if words is not None:
+                store.words[position] = list(words)
+                store.codes[position] = {word: code for code, word in enumerate(words)}
+        return store
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[row] for row in range(*position.indices(len(self)))]
+        return tuple(column[position] if words is None else words[column[position]]
+                     for column, words in zip(self.columns, self.words))
+
+    def __iter__(self):
+        return zip(*(column if words is None else map(words.__getitem__, column)
+                     for column, words in zip(self.columns, self.words)))
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(row == tuple(item) for row, item in zip(self, other))
+
+    __hash__ = None  # Mutable, like a list
+
+    def __repr__(self):
+        return f"columnstore({len(self)} rows)"
+
+    def cell(self, row, column):
+        """
+        Return one value.
+
+        Parameters
+        ----------
+        row, column : int
+            Cell coordinates.
+
+        Returns
+        -------
+        Any
+            The decoded value.
+        """
+        words = self.words[column]
+        value = self.columns[column][row]
+        return value if words is None else words[value]
+
+    def _words(self, column, values):
+        """
+        Add the values missing from a column's dictionary.
+        """
+        codes, words = self.codes[column], self.words[column]
+        for value in values:
+            if value not in codes:
+                codes[value] = len(words)
+                words.append(value)
+
+    def _widen(self, column):
+        """
+        Switch an integer column to dictionary encoding, e.g. to hold a NULL.
+        """
+        values = self.columns[column]
+        self.words[column], self.codes[column] = [], {}
+        self._words(column, values)
+        self.columns[column] = array("i", map(self.codes[column].__getitem__, values))
+
+    def _encode(self, column, value):
+        """
+        Return what column `column` stores for a value.
+        """
+        if self.words[column] is None:
+            if type(value) is int and -2 ** 31 <= value < 2 ** 31:
+                return value
+            self._widen(column)
+        self._words(column, (value,))
+        return self.codes[column][value]
+
+    def extend(self, rows):
+        """
+        Append rows, one whole column at a time.
+
+        Parameters
+        ----------
+        rows : iterable of tuples
+            Rows to append.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return
+        first = len(self)
+        for position, column in enumerate(self.columns):
+            values = list(map(itemgetter(position), rows))
+            if self.words[position] is None:
+                try:
+                    column.extend(values)
+                    continue
+                except (TypeError, OverflowError):
+                    del column[first:]  # Undo the values appended before the offending one
+                    self._widen(position)
+                    column = self.columns[position]
+            self._words(position, set(values))
+            column.extend(map(self.codes[position].__getitem__, values))
+        if self._index is not None:
+            identifiers = map(itemgetter(0), rows)
+            if self._moves:
+                self._late.update((identifier, (row, len(self._moves)))
+                                  for row, identifier in enumerate(identifiers, first))
+            else:
+                self._index.update(zip(identifiers, range(first, len(self))))
+
+    def append(self, row):
+        self.extend([row])
+
+    def insert(self, position, row):
+        length = len(self)
+        position = max(0, min(length, position + length if position < 0 else position))
+        for column, value in enumerate(row):
+            self.columns[column].insert(position, self._encode(column, value))
+        if self._index is not None:
+            self._moves.append((position, 1))
+            self._late[row[0]] = (position, len(self._moves))
+
+    def pop(self, position=-1):
+        row = self[position]
+        if position < 0:
+            position += len(self)
+        for column in self.columns:
+            del column[position]
+        if self._index is not None:
+            self._index.pop(row[0], None)
+            self._late.pop(row[0], None)
+            self._moves.append((position, -1))
+        return row
+
+    def __setitem__(self, position, row):
+        if self._index is not None and self.cell(position, 0) != row[0]:
+            self._index = None  # A different player now holds this row
+        for column, value in enumerate(row):
+            self.columns[column][position] = self._encode(column, value)
+
+    def reverse(self):
+        for column in self.columns:
+            column.reverse()
+        self._index = None
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sort the rows in place, stably, like list.sort.
+
+        The rows are decoded once; only the resulting permutation is applied to the columns.
+        """
+        rows = list(self)
+        key = key or (lambda row: row)
+        order = sorted(range(len(rows)), key=lambda row: key(rows[row]), reverse=reverse)
+        self.columns = [array("i", map(column.__getitem__, order)) for column in self.columns]
+        self._index = None
+
+    def find(self, identifier):
+        """
+        Return the row number holding a player id.
+
+        Rows inserted and removed since the id index was built are replayed as
+        a log of shifts, so inserting or removing a row does not renumber the
+        index; it is rebuilt at C speed once the log grows past rebuildAfter.
+
+        Parameters
+        ----------
+        identifier : int
+            Player id.
+
+        Returns
+        -------
+        int or None
+            Row number, or None if the player is not stored.
+        """
+        if self._index is None or len(self._moves) > self.rebuildAfter:
+            ids = self.columns[0] if self.words[0] is None else map(self.words[0].__getitem__, self.columns[0])
+            self._index = dict(zip(ids, range(len(self))))
+            self._moves, self._late = [], {}
+        entry = self._late.get(identifier)
+        if entry is None:
+            row = self._index.get(identifier)
+            if row is None:
+                return None
+            entry = (row, 0)
+        row, applied = entry
+        for where, shift in self._moves[applied:]:
+            if row > where or (row == where and shift > 0):
+                row += shift
+        return row
 
 class Datamodel(QAbstractTableModel):
     """
     A Qt table model to represent tabular data in a QTableView.
 
+    The model either wraps a complete list of rows or, when given a page
+    source, starts empty and pulls fixed-size pages on demand as the view
+    scrolls (canFetchMore/fetchMore), so only the rows actually shown are kept.
+    Clicking a column header sorts through sortPage: a fully loaded result is
+    sorted in memory, a partially loaded one is reloaded from the page source
+    in the new order. After a write, applyChanges patches only the affected
+    rows, so the view keeps its scroll position and selection. The rows are
+    kept in a columnstore, a few bytes per cell.
+
+    Given a taskrunner, the model never queries on the GUI thread: pages load
+    as background page tasks and a reload in a new order runs as a search,
+    so the next search cancels either and a slow sort (full-text or
+    unindexed) does not freeze the view. The rows on screen stay as they are
+    until the result arrives; one that lands after the rows were replaced
+    or patched past its starting row is dropped. Only the in-memory sort of
+    a fully loaded result runs on the GUI thread.
+
     Attributes
     ----------
-    data : list of tuples
-        The main data to display in the table.
-    header : list of str
+    rows : columnstore
+        The rows loaded so far.
+    header : tuple of str
         Column headers for the table view.
+    fetchPage : callable or None
+        fetchPage(lastRow, limit, cancel=None) returning the rows after lastRow (None for the first page).
+    pageSize : int
+        Number of rows requested per page.
+    total : int or None
+        Number of rows the full result has, counted separately by the caller.
+    sortPage : callable or None
+        sortPage(column, descending) returning (spec, fetchPage) for the new
+        order: the filterspec of the re-ordered result and a page source in
+        that order. None disables sorting.
+    ordering : tuple or None
+        (column, descending) the rows are currently sorted by, if known.
+    spec : filterspec or None
+        Filter and order of the rows, used to place changed rows.
+    tasks : taskrunner or None
+        Runner for page loads and reloads; None runs them synchronously.
 
     Methods
     -------
@@ -23,20 +332,57 @@ class Datamodel(QAbstractTableModel):
         Returns the number of rows.
     columnCount(index):
         Returns the number of columns.
+    canFetchMore(index):
+        Tells the view whether another page is available.
+    fetchMore(index):
+        Loads the next page.
+    sort(column, order):
+        Re-orders the rows by a column.
+    position(identifier):
+        Returns the row holding a player id.
+    applyChanges(updated, deleted):
+        Patches the rows changed by a write.
     """
 
-    def __init__(self, data):
+    header = ("Id", "FirstName", "LastName", "Nation", "Club", "Post", "Overall")  # Define column headers
+
+    def __init__(self, data, fetchPage=None, pageSize=200, total=None, sortPage=None, ordering=None, spec=None,
+                 tasks=None):
         """
         Initialize the table model with data and headers.
 
         Parameters
         ----------
-        data : list of tuples
-            The dataset to be displayed in the table.
+        data : list of tuples or columnstore
+            The dataset to be displayed in the table (the rows loaded up front); a columnstore is used as is.
+        fetchPage : callable or None
+            Page source for lazy loading; None means `data` is the whole result.
+        pageSize : int
+            Rows requested per fetchMore call.
+        total : int or None
+            Size of the full result, if known.
+        sortPage : callable or None
+            Sort hook, see the class attributes.
+        ordering : tuple or None
+            (column, descending) order of `data`, or None if it is in no column order.
+        spec : filterspec or None
+            Spec the rows were searched with; without it changed rows are only patched in place.
+        tasks : taskrunner or None
+            Runner for page loads and reloads, see the class attributes.
         """
         super(Datamodel, self).__init__()  # Initialize the base QAbstractTableModel
-        self.data = data  # Store the data
-        self.header = ["Id", "FirstName", "LastName", "Nation", "Club", "Post", "Overall"]  # Define column headers
+        self.rows = data if isinstance(data, columnstore) else columnstore(data, len(self.header))  # Store the data column by column
+        self.fetchPage = fetchPage
+        self.pageSize = pageSize
+        self.total = len(self.rows) if total is None and fetchPage is None else total
+        self.exhausted = fetchPage is None  # True once the source has no more rows
+        self.sortPage = sortPage
+        self.ordering = ordering
+        self.spec = spec
+        self.tasks = tasks
+        self._requested = ordering  # Latest order asked for; differs from ordering while a reload runs
+        self._loading = False  # A page load is in flight
+        self._generation = 0  # Bumped whenever the rows are replaced, so late pages are dropped
 
     def headerData(self, section, orientation, role):
         """
@@ -56,9 +402,9 @@ class Datamodel(QAbstractTableModel):
         str or int
             Column header label for horizontal, row number for vertical.
         """
-        if role == Qt.ItemDataRole.DisplayRole:  # Only provide data for display
-            if orientation == Qt.Orientation.Horizontal:  # Column headers
-                return str(self.header[section])
+        if role == _display:  # Only provide data for display
+            if orientation == _horizontal:  # Column headers
+                return self.header[section]
             return section + 1  # Row numbers starting from 1
 
     def data(self, index, role):
@@ -77,12 +423,15 @@ class Datamodel(QAbstractTableModel):
         Any
             The data to display or the alignment.
         """
-        if role == Qt.ItemDataRole.DisplayRole:  # Display the actual data
-            return self.data[index.row()][index.column()]
-        if role == Qt.ItemDataRole.TextAlignmentRole:  # Center-align all text
-            return Qt.AlignmentFlag.AlignCenter
+        if role == _display:  # Display the actual data
+            column = index.column()
+            words = self.rows.words[column]
+            value = self.rows.columns[column][index.row()]
+            return value if words is None else words[value]
+        if role == _alignment:  # Center-align all text
+            return _center
 
-    def rowCount(self, index):
+    def rowCount(self, index=QModelIndex()):
         """
         Return the number of rows in the table.
 
@@ -94,11 +443,11 @@ class Datamodel(QAbstractTableModel):
         Returns
         -------
         int
-            Number of rows.
+            Number of rows loaded so far.
         """
-        return len(self.data)
+        return 0 if index.isValid() else len(self.rows)
 
-    def columnCount(self, index):
+    def columnCount(self, index=QModelIndex()):
         """
         Return the number of columns in the table.
 
@@ -112,4 +461,251 @@ class Datamodel(QAbstractTableModel):
         int
             Number of columns.
         """
-        return len(self.data[0]) if self.data else 0  # Return 0 if data is empty
+        return 0 if index.isValid() else len(self.header)
+
+    def canFetchMore(self, index):
+        """
+        Tell the view whether more rows can be loaded.
+
+        Parameters
+        ----------
+        index : QModelIndex
+            Parent index; only the invisible root has children.
+
+        Returns
+        -------
+        bool
+            True while the page source has not been exhausted.
+        """
+        return not index.isValid() and not self.exhausted
+
+    def fetchMore(self, index):
+        """
+        Load the next page from the page source and append it to the model.
+
+        Parameters
+        ----------
+        index : QModelIndex
+            Parent index (not used here).
+        """
+        if index.isValid() or self.exhausted or self._loading:
+            return
+        after, fetchPage, generation = self.rows[-1] if self.rows else None, self.fetchPage, self._generation
+        if self.tasks is None:
+            return self._appendPage(after, generation, fetchPage(after, self.pageSize))
+        self._loading = True
+
+        def failed(message):
+            if generation == self._generation:
+                self._loading = False  # The next fetchMore retries
+
+        self.tasks.page(lambda cancel: fetchPage(after, self.pageSize, cancel),
+                        lambda page: self._appendPage(after, generation, page), failed)
+
+    def _appendPage(self, after, generation, page):
+        """
+        Append a page fetched after row `after`, unless the rows changed meanwhile.
+
+        Parameters
+        ----------
+        after : tuple or None
+            Last row when the page was requested.
+        generation : int
+            Value of _generation when the page was requested.
+        page : list of tuples or None
+            The fetched rows; None if the query failed, which leaves the result open for another try.
+        """
+        if generation != self._generation:
+            return  # The rows were replaced by a reload
+        self._loading = False
+        if page is None:
+            return  # Failed, not short: the next fetchMore retries
+        if (self.rows[-1] if self.rows else None) != after:
+            return self.fetchMore(QModelIndex())  # A write patched the last row: continue from the new one
+        if len(page) < self.pageSize:
+            self.exhausted = True  # A short page means the source ran dry
+        if page:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Sort the rows by a column; called by the view when a header is clicked.
+
+        When every row is loaded the list is sorted in place (a mere reversal
+        when only the direction changed, since the order is total) and the
+        view keeps its selection. Otherwise the model restarts from the first
+        page of the page source in the new order, so SQL sorts and pages
+        through an index instead of Python sorting rows it does not have;
+        with a taskrunner the first page is fetched as a cancellable search
+        and later pages are keyset seeks after the last loaded row.
+
+        Parameters
+        ----------
+        column : int
+            Column to sort by.
+        order : Qt.SortOrder
+            Ascending or descending.
+        """
+        descending = order == Qt.SortOrder.DescendingOrder
+        if self.sortPage is None or self._requested == (column, descending):
+            return
+        self._requested = (column, descending)
+        spec, fetchPage = self.sortPage(column, descending)
+        if not self.exhausted:
+            if self.tasks is None:
+                return self._reload(spec, fetchPage, self._requested, fetchPage(None, self.pageSize))
+            requested = self._requested
+            self.tasks.search(lambda cancel: fetchPage(None, self.pageSize, cancel),
+                              lambda page: self._reload(spec, fetchPage, requested, page))
+            return
+        self.spec = spec
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        keys = [self.rows.cell(index.row(), 0) for index in persistent]  # Player ids of the selected/current rows
+        if self.ordering is not None and self.ordering[0] == column:
+            self.rows.reverse()
+        else:
+            spec.sortRows(self.rows)
+        for index, key in zip(persistent, keys):
+            self.changePersistentIndex(index, self.index(self.rows.find(key), index.column()))
+        self.layoutChanged.emit()
+        self.ordering = (column, descending)
+
+    def _reload(self, spec, fetchPage, ordering, page):
+        """
+        Replace the rows with the first page of a re-ordered result.
+
+        Parameters
+        ----------
+        spec : filterspec
+            Spec of the new order.
+        fetchPage : callable
+            Page source in the new order.
+        ordering : tuple
+            (column, descending) of the new order.
+        page : list of tuples or None
+            Its first page; None if the query failed, which keeps the current rows and order.
+        """
+        if page is None:
+            self._requested = self.ordering  # Clicking the header again retries
+            return
+        self.beginResetModel()
+        self.spec, self.fetchPage, self.ordering = spec, fetchPage, ordering
+        self.rows = columnstore(page, len(self.header))
+        self.exhausted = len(self.rows) < self.pageSize
+        self._generation += 1
+        self._loading = False
+        self.endResetModel()
+
+    def position(self, identifier):
+        """
+        Return the row holding a player.
+
+        Parameters
+        ----------
+        identifier : int
+            Player id.
+
+        Returns
+        -------
+        int or None
+            Row number, or None if the player is not loaded.
+        """
+        return self.rows.find(identifier)
+
+    def _ordered(self):
+        """
+        Tell whether the rows are known to follow spec's sort order.
+        """
+        return self.spec is not None and not self.spec.ranked()
+
+    def _insertionPoint(self, row):
+        """
+        Return the row number a row takes in sort order.
+        """
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            if self.spec.precedes(self.rows[middle], row):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _removeAt(self, position):
+        """
+        Remove one row and tell the view.
+        """
+        self.beginRemoveRows(QModelIndex(), position, position)
+        self.rows.pop(position)
+        self.endRemoveRows()
+
+    def _insertAt(self, position, row):
+        """
+        Insert one row and tell the view.
+        """
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.rows.insert(position, row)
+        self.endInsertRows()
+
+    def applyChanges(self, updated=(), deleted=()):
+        """
+        Patch the loaded rows after a write instead of reloading the result.
+
+        Deleted rows are removed. An updated row is replaced in place (dataChanged)
+        while it still matches the spec at the same sort position; otherwise it
+        is removed and, if it still matches, inserted where it now sorts. A row
+        sorting past the last loaded page is left for fetchMore, which reaches
+        it by key. The work is proportional to the number of changed rows.
+
+        filterspec.matches() cannot evaluate a full-text name predicate, so for
+        such a spec only rows already loaded are patched: an updated row that
+        was not in the result is never inserted nor counted.
+
+        Parameters
+        ----------
+        updated : iterable of tuples
+            Rows as they are after the write (e.g. from UPDATE ... RETURNING).
+        deleted : iterable of tuples
+            Rows that were deleted (e.g. from DELETE ... RETURNING).
+
+        Returns
+        -------
+        int
+            Change in the number of matching rows, which total is adjusted by;
+            exact when every row is loaded.
+        """
+        delta = 0
+        for row in deleted:
+            position = self.position(row[0])
+            if position is not None:
+                self._removeAt(position)
+                delta -= 1
+            elif not self.exhausted and self.spec is not None and self.spec.match is None and self.spec.matches(row):
+                delta -= 1  # Matched beyond the loaded pages
+        fullText = self.spec is not None and self.spec.match is not None  # Membership of unloaded rows is unknown
+        for row in updated:
+            position = self.position(row[0])
+            if position is None and fullText:
+                continue  # The next search picks it up if its name matches
+            keep = self.spec is None or self.spec.matches(row)
+            if position is not None:
+                old = self.rows[position]
+                if keep and (not self._ordered() or self.spec.keyOf(old) == self.spec.keyOf(row)):
+                    self.rows[position] = row
+                    self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.header) - 1))
+                    continue
+                self._removeAt(position)
+                delta -= 0 if keep else 1  # A row still matching just moves
+            elif keep and self.exhausted and self._ordered():
+                delta += 1  # Newly matching; for a paged result it may have been beyond the loaded pages
+            if keep and self._ordered():
+                target = self._insertionPoint(row)
+                if target < len(self.rows) or self.exhausted:
+                    self._insertAt(target, row)
+        if self.total is not None:
+            self.total += delta
+        return delta
@@ -0,0 +1,646 @@
+import json  # Import json to bind IN-lists as a single parameter
+import operator  # Import operator for fast sort keys
+import re  # Import re to split search text into words
+
+def matchExpression(text, columns=("firstName", "lastName"), fuzzy=False):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Only word characters survive, so user input can never inject FTS5 syntax.
+    A plain search requires every word as a case-insensitive prefix; a fuzzy
+    search ORs the words' trigrams so misspelt names still match, with the
+    closest names ranked first by bm25.
+
+    Parameters
+    ----------
+    text : str
+        Search text typed by the user.
+    columns : tuple of str
+        Columns the words must appear in.
+    fuzzy : bool
+        Use trigram matching for typo tolerance.
+
+    Returns
+    -------
+    tuple or None
+        (table, expression), or None if the text has no words.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    scope = "{" + " ".join(columns) + "} : "
+    trigrams = sorted({word[i:i + 3] for word in words for i in range(len(word) - 2)})
+    if fuzzy and trigrams:
+        return "tblPlayersTrigram", scope + "(" + " OR ".join(f'"{gram}"' for gram in trigrams) + ")"
+    return "tblPlayersSearch", scope + "(" + " AND ".join(f'"{word}"*' for word in words) + ")"
+
+class filterspec:
+    """
+    A composable set of predicates over 'tblPlayers' that compiles to parameterized SQL.
+
+    Every predicate contributes a fixed SQL fragment with '?' placeholders, and
+    the fragments are emitted in a canonical order. Two specs with the same
+    predicate shapes therefore produce byte-identical SQL text, so SQLite's
+    statement cache reuses the prepared statement no matter which values are bound.
+
+    Attributes
+    ----------
+    columns : tuple of str
+        Columns of 'tblPlayers' in table order.
+    predicates : dict
+        Maps (column, operator) to the bound value.
+    order : list of tuple
+        (column, descending) sort keys; the last key must be unique so keyset
+        pagination never skips or repeats a row.
+    match : tuple or None
+        (table, expression, ranked) full-text predicate over the FTS5 tables.
+    rankLimit : int
+        Maximum number of rows a ranked (relevance ordered) search returns.
+    nullable : tuple of str
+        Columns that may hold NULL, which SQLite sorts before every value.
+
+    Methods
+    -------
+    equals(column, value):
+        Adds an equality predicate.
+    isin(column, values):
+        Adds an IN-list predicate.
+    overallRange(low, high):
+        Restricts overall to an inclusive range.
+    firstName(name), lastName(name), nation(name), position(name), club(name):
+        Shortcuts for equality predicates.
+    nameMatch(text, columns, fuzzy, ranked):
+        Adds a full-text prefix or fuzzy predicate.
+    ranked():
+        Tells whether results are ordered by text relevance.
+    sortBy(column, descending):
+        Orders the results by a column, with index-friendly tie breakers.
+    copy():
+        Returns an independent copy of the spec.
+    where():
+        Returns the WHERE clause and its parameters.
+    selectQuery(after, limit):
+        Returns a SELECT statement and its parameters, optionally one keyset page.
+    topQuery(column, k, groups):
+        Returns a SELECT of the k best players per value of a column.
+    countQuery():
+        Returns a SELECT count(*) statement and its parameters.
+    keyOf(row):
+        Returns the sort key of a result row.
+    sortRows(rows):
+        Sorts resident rows in place in the spec's order.
+    matches(row):
+        Evaluates the predicates against a row in Python.
+    precedes(row, other):
+        Tells whether a row sorts before another one.
+    narrows(other):
+        Tells whether this spec only tightens another one.
+    updateQuery(assignments, returning):
+        Returns an UPDATE statement and its parameters.
+    deleteQuery(returning):
+        Returns a DELETE statement and its parameters.
+    key():
+        Returns a hashable description of the spec.
+    """
+
+    columns = ("id", "firstName", "lastName", "nation", "team", "position", "overall")
+    operators = {"=": "{0}=?", ">=": "{0}>=?", "<=": "{0}<=?", "in": "{0} IN (SELECT value FROM json_each(?))"}
+    rankLimit = 500
+    nullable = ("team",)
+
+    def __init__(self):
+        """
+        Initialize an empty spec that matches every player.
+        """
+        self.predicates = {}  # (column, operator) -> value
+        self.order = [("overall", True), ("id", False)]  # Best first, id breaks ties
+        self.match = None  # Full-text predicate, if any
+
+    def _add(self, column, operator, value):
+        """
+        Record a predicate after validating its column and operator.
+
+        Parameters
+        ----------
+        column : str
+            Column of 'tblPlayers'.
+        operator : str
+            One of '=', '>=', '<=' or 'in'.
+        value : Any
+            Value bound to the placeholder.
+
+        Returns
+        -------
+        filterspec
+            The spec itself, so calls can be chained.
+        """
+        if column not in self.columns:
+            raise ValueError(f"unknown column: {column}")
+        if operator not in self.operators:
+            raise ValueError(f"unknown operator: {operator}")
+        self.predicates[(column, operator)] = value
+        return self
+
+    def equals(self, column, value):
+        """Add a `column = value` predicate."""
+        return self._add(column, "=", value)
+
+    def isin(self, column, values):
+        """Add a `column IN (values)` predicate; the list is bound as one JSON parameter."""
+        return self._add(column, "in", list(values))
+
+    def overallRange(self, low=None, high=None):
+        """Restrict overall to [low, high]; either bound may be None."""
+        if low is not None:
+            self._add("overall", ">=", low)
+        if high is not None:
+            self._add("overall", "<=", high)
+        return self
+
+    def firstName(self, name):
+        """Match the exact first name."""
+        return self.equals("firstName", name)
+
+    def lastName(self, name):
+        """Match the exact last name."""
+        return self.equals("lastName", name)
+
+    def nation(self, name):
+        """Match the exact nation."""
+        return self.equals("nation", name)
+
+    def position(self, name):
+        """Match the exact position."""
+        return self.equals("position", name)
+
+    def club(self, name):
+        """Match the exact club (stored in the 'team' column)."""
+        return self.equals("team", name)
+
+    def nameMatch(self, text, columns=("firstName", "lastName"), fuzzy=False, ranked=None):
+        """
+        Match players whose names (or club) contain the words of `text`.
+
+        Parameters
+        ----------
+        text : str
+            Search text; text without any word characters adds no predicate.
+        columns : tuple of str
+            Any of 'firstName', 'lastName' and 'team'.
+        fuzzy : bool
+            Tolerate typos through the trigram index.
+        ranked : bool or None
+            Order by relevance before the sort keys; defaults to `fuzzy`.
+
+        Returns
+        -------
+        filterspec
+            The spec itself, so calls can be chained.
+        """
+        for column in columns:
+            if column not in ("firstName", "lastName", "team"):
+                raise ValueError(f"column is not full-text indexed: {column}")
+        compiled = matchExpression(text, columns, fuzzy)
+        if compiled is not None:
+            self.match = compiled + (fuzzy if ranked is None else ranked,)
+        return self
+
+    def ranked(self):
+        """
+        Tell whether the spec orders its rows by text relevance.
+
+        Ranked results cannot be paged by key; they are capped at rankLimit rows instead.
+
+        Returns
+        -------
+        bool
+            True for a ranked full-text search.
+        """
+        return self.match is not None and self.match[2]
+
+    def sortBy(self, column, descending=False):
+        """
+        Order the results by one column.
+
+        Ties are broken by overall in the opposite direction and then by id, so
+        the order is total and, walked in either direction, is exactly the
+        order of that column's (column, overall DESC) index: SQLite reads pages
+        straight from the index without a temporary sort.
+
+        Parameters
+        ----------
+        column : str
+            Column of 'tblPlayers'.
+        descending : bool
+            Sort from the highest value down.
+
+        Returns
+        -------
+        filterspec
+            The spec itself, so calls can be chained.
+        """
+        if column not in self.columns:
+            raise ValueError(f"unknown column: {column}")
+        if column == "id":
+            self.order = [("id", descending)]
+        elif column == "overall":
+            self.order = [("overall", descending), ("id", not descending)]  # The default is sortBy("overall", True)
+        else:
+            self.order = [(column, descending), ("overall", not descending), ("id", descending)]
+        return self
+
+    def copy(self):
+        """
+        Return an independent copy of the spec.
+
+        Returns
+        -------
+        filterspec
+            Same predicates, sort order and full-text match.
+        """
+        other = filterspec()
+        other.predicates = dict(self.predicates)
+        other.order = list(self.order)
+        other.match = self.match
+        return other
+
+    def _ordered(self):
+        """
+        Return the predicates in canonical order: table column order, then operator.
+
+        Returns
+        -------
+        list of tuple
+            (column, operator, value) triples.
+        """
+        order = list(self.operators)
+        keys = sorted(self.predicates, key=lambda k: (self.columns.index(k[0]), order.index(k[1])))
+        return [(column, operator, self.predicates[(column, operator)]) for column, operator in keys]
+
+    def where(self, match=True):
+        """
+        Compile the predicates into a WHERE clause.
+
+        Parameters
+        ----------
+        match : bool
+            Include the full-text predicate as an `id IN (...)` subquery.
+
+        Returns
+        -------
+        tuple
+            (clause, params); clause is empty when the spec has no predicates.
+        """
+        fragments, params = [], []
+        if match and self.match is not None:
+            table, expression, _ = self.match
+            fragments.append(f"id IN (SELECT rowid FROM {table} WHERE {table} MATCH ?)")
+            params.append(expression)
+        for column, operator, value in self._ordered():
+            fragments.append(self.operators[operator].format(column))
+            params.append(json.dumps(value) if operator == "in" else value)
+        clause = " WHERE " + " AND ".join(fragments) if fragments else ""
+        return clause, tuple(params)
+
+    def orderBy(self):
+        """
+        Return the ORDER BY expression for the current sort keys.
+
+        Returns
+        -------
+        str
+            Comma separated keys, e.g. 'overall DESC, id'.
+        """
+        return ", ".join(f"{column} DESC" if descending else column for column, descending in self.order)
+
+    def _compare(self, column, operator, value):
+        """
+        Compile `column operator value` the way ORDER BY compares, NULL sorting first.
+
+        Parameters
+        ----------
+        column : str
+            Sort column.
+        operator : str
+            One of '=', '<', '>', '<=' or '>='.
+        value : Any
+            Key value of the previous page's last row.
+
+        Returns
+        -------
+        tuple or None
+            (fragment, params); None when the comparison holds for every row.
+        """
+        if column not in self.nullable:
+            return f"{column}{operator}?", (value,)
+        if value is None:  # Nothing sorts before NULL, every value sorts after it
+            fragments = {"=": f"{column} IS NULL", ">": f"{column} IS NOT NULL", ">=": None, "<": "0",
+                         "<=": f"{column} IS NULL"}
+            fragment = fragments[operator]
+            return None if fragment is None else (fragment, ())
+        if operator in ("<", "<="):
+            return f"({column}{operator}? OR {column} IS NULL)", (value,)  # NULLs come last when descending
+        return f"{column}{operator}?", (value,)
+
+    def seek(self, after):
+        """
+        Compile the keyset predicate selecting rows strictly after a sort key.
+
+        For keys (k1, k2) this is `k1 <= ? AND (k1 < ? OR (k1 = ? AND k2 > ?))`
+        (operators flip with the direction); the leading range on k1 lets SQLite
+        start the index walk at the previous page's last row instead of skipping
+        rows one by one the way OFFSET does. Nullable keys compare with
+        SQLite's NULLs-first ordering.
+
+        Parameters
+        ----------
+        after : tuple
+            Sort key of the last row already delivered.
+
+        Returns
+        -------
+        tuple
+            (fragment, params).
+        """
+        alternatives, params = [], []
+        for depth, (column, descending) in enumerate(self.order):
+            terms = [self._compare(c, "=", value) for (c, _), value in zip(self.order[:depth], after)]
+            terms.append(self._compare(column, "<" if descending else ">", after[depth]))
+            if ("0", ()) in terms:
+                continue  # This alternative can never hold
+            alternatives.append(" AND ".join(term[0] for term in terms) if depth == 0
+                                else "(" + " AND ".join(term[0] for term in terms) + ")")
+            for term in terms:
+                params.extend(term[1])
+        first, descending = self.order[0]
+        leading = self._compare(first, "<=" if descending else ">=", after[0])
+        fragment = f"({' OR '.join(alternatives)})" if alternatives else "0"
+        if leading is None:
+            return fragment, tuple(params)
+        return f"{leading[0]} AND {fragment}", leading[1] + tuple(params)
+
+    def selectQuery(self, after=None, limit=None):
+        """
+        Build a SELECT over 'tblPlayers' for this spec.
+
+        Parameters
+        ----------
+        after : tuple or None
+            Sort key of the last row of the previous page (see keyOf), or None for the first page.
+        limit : int or None
+            Maximum number of rows, or None for all of them (rankLimit for ranked searches).
+
+        Returns
+        -------
+        tuple
+            (query, params).
+        """
+        if self.ranked():
+            if after is not None:
+                raise ValueError("ranked searches cannot be paged by key")
+            # Join the FTS hits so bm25 can order them; the other predicates filter in the same query
+            table, expression, _ = self.match
+            clause, params = self.where(match=False)
+            query = (f"WITH hits(hit, score) AS (SELECT rowid, rank FROM {table} WHERE {table} MATCH ?) "
+                     f"SELECT tblPlayers.* FROM hits JOIN tblPlayers ON tblPlayers.id = hits.hit{clause} "
+                     f"ORDER BY hits.score, {self.orderBy()}")
+            params = (expression,) + params
+            limit = self.rankLimit if limit is None else min(limit, self.rankLimit)
+        else:
+            clause, params = self.where()
+            if after is not None:
+                fragment, seekParams = self.seek(after)
+                clause = (clause + " AND " if clause else " WHERE ") + fragment
+                params += seekParams
+            query = f"SELECT * FROM tblPlayers{clause} ORDER BY {self.orderBy()}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return query, params
+
+    def topQuery(self, column, k, groups):
+        """
+        Build a SELECT of the k best players (overall DESC, id) of every value of a column.
+
+        Each group seeks its own k rows through the column's (column, overall DESC)
+        index in a correlated LIMIT subquery, so one statement reads about
+        groups * k index entries instead of ranking every matching row the way a
+        window function would.
+
+        Parameters
+        ----------
+        column : str
+            Grouping column of 'tblPlayers'.
+        k : int
+            Rows per group.
+        groups : str
+            SELECT yielding the distinct group values as its only column, `value`;
+            NULL is written as '' for nullable columns.
+
+        Returns
+        -------
+        tuple
+            (query, params); rows come grouped by the column (NULL first), best first within a group.
+        """
+        if column not in self.columns:
+            raise ValueError(f"unknown column: {column}")
+        clause, params = self.where()
+        filters = " AND " + clause[len(" WHERE "):] if clause else ""
+        group = f"{column} IS NULLIF(g.value, '')" if column in self.nullable else f"{column}=g.value"
+        query = (f"SELECT t.* FROM ({groups}) g JOIN tblPlayers t ON t.id IN "
+                 f"(SELECT id FROM tblPlayers WHERE {group}{filters} ORDER BY overall DESC, id LIMIT ?) "
+                 f"ORDER BY t.{column}, t.overall DESC, t.id")
+        return query, params + (k,)
+
+    def countQuery(self):
+        """
+        Build a SELECT count(*) for this spec; it is answered from the filter indexes.
+
+        Returns
+        -------
+        tuple
+            (query, params).
+        """
+        clause, params = self.where()
+        return f"SELECT count(*) FROM tblPlayers{clause}", params
+
+    def keyOf(self, row):
+        """
+        Return the sort key of a result row.
+
+        Parameters
+        ----------
+        row : tuple
+            A full 'tblPlayers' row.
+
+        Returns
+        -------
+        tuple
+            Values of the sort-key columns.
+        """
+        return tuple(row[self.columns.index(column)] for column, _ in self.order)
+
+    def sortRows(self, rows):
+        """
+        Sort resident result rows in place in the spec's order, as SQL would.
+
+        One stable sort per key, least significant first; each key is computed
+        once per row. NULLs sort first, as in SQLite.
+
+        Parameters
+        ----------
+        rows : list of tuples
+            Full 'tblPlayers' rows.
+        """
+        for column, descending in reversed(self.order):
+            position = self.columns.index(column)
+            if column in self.nullable:
+                rows.sort(key=lambda row: (row[position] is not None, row[position] or ""), reverse=descending)
+            else:
+                rows.sort(key=operator.itemgetter(position), reverse=descending)
+
+    def updateQuery(self, assignments, returning=False):
+        """
+        Build an UPDATE over 'tblPlayers' for this spec.
+
+        Parameters
+        ----------
+        assignments : dict
+            Column -> new value.
+        returning : bool
+            Append RETURNING * so the statement yields the updated rows.
+
+        Returns
+        -------
+        tuple
+            (query, params).
+        """
+        for column in assignments:
+            if column not in self.columns:
+                raise ValueError(f"unknown column: {column}")
+        columns = [column for column in self.columns if column in assignments]  # Canonical order
+        setters = ", ".join(f"{column}=?" for column in columns)
+        clause, params = self.where()
+        suffix = " RETURNING *" if returning else ""
+        return f"UPDATE tblPlayers SET {setters}{clause}{suffix}", tuple(assignments[c] for c in columns) + params
+
+    def deleteQuery(self, returning=False):
+        """
+        Build a DELETE over 'tblPlayers' for this spec.
+
+        Parameters
+        ----------
+        returning : bool
+            Append RETURNING * so the statement yields the deleted rows.
+
+        Returns
+        -------
+        tuple
+            (query, params).
+        """
+        clause, params = self.where()
+        return f"DELETE FROM tblPlayers{clause}{' RETURNING *' if returning else ''}", params
+
+    def matches(self, row):
+        """
+        Evaluate the predicates against a result row in Python.
+
+        The full-text predicate cannot be evaluated here; rows are assumed to
+        come from a search with the same text match (see narrows).
+
+        Parameters
+        ----------
+        row : tuple
+            A full 'tblPlayers' row.
+
+        Returns
+        -------
+        bool
+            True if the row satisfies every predicate.
+        """
+        for (column, operator), value in self.predicates.items():
+            cell = row[self.columns.index(column)]
+            if operator == "=" and cell != value:
+                return False
+            if operator == ">=" and cell < value:
+                return False
+            if operator == "<=" and cell > value:
+                return False
+            if operator == "in" and cell not in value:
+                return False
+        return True
+
+    def precedes(self, row, other):
+        """
+        Tell whether a row sorts strictly before another one in the spec's order.
+
+        Parameters
+        ----------
+        row, other : tuple
+            Full 'tblPlayers' rows.
+
+        Returns
+        -------
+        bool
+            True if `row` comes first; NULLs sort first, as in SQLite.
+        """
+        for column, descending in self.order:
+            position = self.columns.index(column)
+            mine, theirs = row[position], other[position]
+            if mine == theirs:
+                continue
+            less = mine is None or (theirs is not None and mine < theirs)
+            return less != descending
+        return False
+
+    def narrows(self, other):
+        """
+        Tell whether this spec only tightens another one.
+
+        That holds when every predicate of `other` is kept with the same value or
+        a stricter bound (a higher minimum, a lower maximum, a sub-list), any new
+        predicates are added on top, and the sort order is unchanged. The rows
+        of this spec are then a subset of `other`'s, in the same order. The
+        full-text match must be identical and unranked, since ranked results
+        are capped.
+
+        Parameters
+        ----------
+        other : filterspec
+            The spec whose result set is already known.
+
+        Returns
+        -------
+        bool
+            True if filtering `other`'s rows with matches() gives this spec's result.
+        """
+        if self.order != other.order or self.match != other.match or self.ranked():
+            return False
+        for (column, operator), value in other.predicates.items():
+            if (column, operator) in self.predicates:
+                mine = self.predicates[(column, operator)]
+                if operator == "=" and mine != value:
+                    return False
+                if operator == ">=" and mine < value:
+                    return False
+                if operator == "<=" and mine > value:
+                    return False
+                if operator == "in" and not set(mine) <= set(value):
+                    return False
+            elif not (operator == "in" and (column, "=") in self.predicates
+                      and self.predicates[(column, "=")] in value):
+                return False  # A dropped predicate widens the result
+        return True
+
+    def key(self):
+        """
+        Return a hashable, order-independent description of the spec.
+
+        Returns
+        -------
+        tuple
+            Canonically ordered (column, operator, value) triples followed by the
+            sort keys and the full-text match.
+        """
+        predicates = tuple((c, o, tuple(v) if o == "in" else v) for c, o, v in self._ordered())
+        return predicates + (tuple(self.order), self.match)
@@ -0,0 +1,233 @@
+import csv  # Import csv to stream comma separated exports
+import json  # Import json to stream JSON-lines exports
+import os  # Import os to compare the source and database sizes
+import time  # Import time to report the load rate
+from FifaPack import playerpack  # Import the pack reader for binary exports
+from FifaMigrations import restoreDerived, suspendDerived  # Import the index/trigger helpers used around the load
+
+# Accepted source column names for each 'tblPlayers' column, compared case-insensitively.
+# The aliases cover the public FIFA/EA FC player exports as well as our own column names.
+aliases = {
+    "id": ("id", "player_id", "sofifa_id"),
+    "firstName": ("firstname", "first_name"),
+    "lastName": ("lastname", "last_name"),
+    "nation": ("nation", "nationality", "nationality_name"),
+    "team": ("team", "club", "club_name"),
+    "position": ("position", "post", "player_positions", "club_position"),
+    "overall": ("overall", "ovr"),
+}
+fullName = ("long_name", "name", "full_name", "short_name")  # Split into first/last names when those are missing
+
+upsert = ("INSERT INTO tblPlayers(id, firstName, lastName, nation, team, position, overall) VALUES(?,?,?,?,?,?,?) "
+          "ON CONFLICT(id) DO UPDATE SET firstName=excluded.firstName, lastName=excluded.lastName, "
+          "nation=excluded.nation, team=excluded.team, position=excluded.position, overall=excluded.overall")
+
+def _records(path, format):
+    """
+    Yield the source file's records as dicts, one at a time.
+
+    Parameters
+    ----------
+    path : str
+        CSV or JSON-lines file.
+    format : str
+        'csv' or 'jsonl'.
+
+    Yields
+    ------
+    dict
+        One source record.
+    """
+    with open(path, newline="", encoding="utf-8") as source:
+        if format == "csv":
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+def _mapping(fields):
+    """
+    Resolve which source field feeds each 'tblPlayers' column.
+
+    Parameters
+    ----------
+    fields : iterable of str
+        Field names of the first source record.
+
+    Returns
+    -------
+    dict
+        Column -> source field name; firstName/lastName may map to a full-name field instead.
+    """
+    lookup = {field.lower(): field for field in fields}
+    mapping = {}
+    for column, names in aliases.items():
+        for name in names:
+            if name in lookup:
+                mapping[column] = lookup[name]
+                break
+    if "firstName" not in mapping or "lastName" not in mapping:
+        for name in fullName:
+            if name in lookup:
+                mapping.setdefault("fullName", lookup[name])
+                break
+    missing = [column for column in aliases if column not in mapping
+               and not (column in ("firstName", "lastName") and "fullName" in mapping) and column != "team"]
+    if missing:
+        raise ValueError(f"source has no column for: {', '.join(missing)}")
+    return mapping
+
+def readRows(path, format=None):
+    """
+    Stream a CSV, JSON-lines or pack export as 'tblPlayers' row tuples.
+
+    Only one source record is held in memory at a time. Records whose id or
+    overall is not an integer are skipped. For multi-position fields such as
+    "ST, CF", the first position is kept. A pack (see FifaPack) is already in
+    table layout and is read from its mapping without any parsing.
+
+    Parameters
+    ----------
+    path : str
+        Source file.
+    format : str or None
+        'csv', 'jsonl' or 'pack'; guessed from the file extension when None.
+
+    Yields
+    ------
+    tuple
+        (id, firstName, lastName, nation, team, position, overall).
+    """
+    format = format or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else
+                        "pack" if path.lower().endswith(".fpack") else "csv")
+    if format == "pack":
+        with playerpack(path) as pack:
+            yield from pack
+        return
+    mapping = None
+    for record in _records(path, format):
+        if mapping is None:
+            mapping = _mapping(record)
+        try:
+            identifier = int(record[mapping["id"]])
+            overall = int(float(record[mapping["overall"]]))
+        except (TypeError, ValueError):
+            continue  # Header repeats, blank ids and similar junk rows
+        if "firstName" in mapping and "lastName" in mapping:
+            first, last = record[mapping["firstName"]], record[mapping["lastName"]]
+        else:
+            first, _, last = str(record[mapping["fullName"]]).strip().partition(" ")
+        team = record.get(mapping["team"]) if "team" in mapping else None
+        position = str(record[mapping["position"]]).split(",")[0].strip()
+        yield (identifier, first, last or "", record[mapping["nation"]], team or None, position, overall)
+
+def importFile(path, dataAccess, format=None, batchSize=50000, rebuildIndexes=None, report=print):
+    """
+    Upsert every player of a CSV, JSON-lines or pack export into 'tblPlayers'.
+
+    Rows are streamed from the file and written with executemany in
+    batches, one explicit transaction per batch, so memory use is bounded by
+    the batch size whatever the file size. Existing ids are updated in place.
+    With rebuildIndexes the filter indexes and the sync triggers of the
+    derived tables (full-text search) are dropped first and everything is
+    rebuilt once at the end, which is much cheaper than maintaining them row
+    by row for a large load but far more expensive for a small upsert into a
+    big table. The rebuild sorts through temporary files rather than RAM. If
+    the process dies mid-load, the next migrate() (e.g. when players starts)
+    finds them missing and restores them.
+
+    Parameters
+    ----------
+    path : str
+        Source file.
+    dataAccess : accessdata
+        Target database.
+    format : str or None
+        'csv', 'jsonl' or 'pack'; guessed from the extension when None.
+    batchSize : int
+        Rows per executemany call and transaction.
+    rebuildIndexes : bool or None
+        Drop and rebuild the indexes and derived tables around the load; None decides
+        automatically (rebuild when the source is at least a tenth of the database size).
+    report : callable or None
+        Called with a progress line after every batch.
+
+    Returns
+    -------
+    dict
+        rows, seconds and rowsPerSecond of the load.
+    """
+    start = time.perf_counter()
+    rows = 0
+    if rebuildIndexes is None:
+        target = dataAccess.connectionString
+        rebuildIndexes = not os.path.exists(target) or os.path.getsize(path) * 10 >= os.path.getsize(target)
+    if rebuildIndexes:
+        with dataAccess.transaction() as connection:
+            suspendDerived(connection)
+    try:
+        batch = []
+        for row in readRows(path, format):
+            batch.append(row)
+            if len(batch) == batchSize:
+                rows += _write(dataAccess, batch)
+                batch = []
+                if report is not None:
+                    report(f"{rows} rows, {rows / (time.perf_counter() - start):.0f} rows/s")
+        if batch:
+            rows += _write(dataAccess, batch)
+    finally:
+        if rebuildIndexes:
+            with dataAccess.transaction() as connection:
+                connection.execute("PRAGMA temp_store=FILE")  # Let the index sorter spill to disk
+                try:
+                    restoreDerived(connection)  # Always restore the indexes, even after a failed load
+                finally:
+                    connection.execute("PRAGMA temp_store=MEMORY")
+    seconds = time.perf_counter() - start
+    stats = {"rows": rows, "seconds": seconds, "rowsPerSecond": rows / seconds if seconds else 0.0}
+    if report is not None:
+        report(f"imported {rows} rows in {seconds:.2f} s ({stats['rowsPerSecond']:.0f} rows/s)")
+    return stats
+
+def _write(dataAccess, batch):
+    """
+    Upsert one batch inside its own transaction.
+
+    Parameters
+    ----------
+    dataAccess : accessdata
+        Target database.
+    batch : list of tuples
+        Rows to upsert.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    with dataAccess.transaction() as connection:
+        connection.executemany(upsert, batch)
+    return len(batch)
+
+if __name__ == "__main__":
+    import argparse
+    from FifaDataAccess import accessdata
+    from FifaMigrations import migrate
+
+    parser = argparse.ArgumentParser(description="Stream a CSV/JSON-lines/pack player export into tblPlayers.")
+    parser.add_argument("source", help="CSV, JSON-lines or pack (.fpack) file")
+    parser.add_argument("--db", default="FIFA24.db", help="target database")
+    parser.add_argument("--format", choices=("csv", "jsonl", "pack"), default=None)
+    parser.add_argument("--batch", type=int, default=50000, help="rows per transaction")
+    parser.add_argument("--rebuild-indexes", dest="rebuild", action="store_true", default=None,
+                        help="always drop and rebuild the indexes around the load")
+    parser.add_argument("--keep-indexes", dest="rebuild", action="store_false",
+                        help="never drop the indexes (fast for small upserts)")
+    arguments = parser.parse_args()
+    dataAccess = accessdata(arguments.db)
+    with dataAccess.transaction() as connection:
+        migrate(connection)  # The indexes being rebuilt must exist in the schema first
+    importFile(arguments.source, dataAccess, arguments.format, arguments.batch, arguments.rebuild)
+    dataAccess.close()
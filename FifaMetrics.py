@@ -0,0 +1,299 @@
+import bisect  # Import bisect to find a latency's histogram bucket
+import hashlib  # Import hashlib to give every query shape a short stable id
+import json  # Import json for the snapshot file and the slow-query log
+import os  # Import os to replace the metrics file atomically
+import re  # Import re to normalize SQL text into query shapes
+import sqlite3  # Import sqlite3 to recognize interrupted statements
+import threading  # Import threading for the lock and the flush thread
+import time  # Import time for timestamps
+from collections import deque  # Import deque to keep the most recent slow queries
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf.
+buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")  # String and number literals
+_spaces = re.compile(r"\s+")
+
+def queryShape(query):
+    """
+    Reduce a SQL statement to its shape: literals become '?' and whitespace is collapsed.
+
+    The application's own queries are already parameterized, so their shape is
+    their text; literals only vary in hand-written statements.
+
+    Parameters
+    ----------
+    query : str
+        SQL text.
+
+    Returns
+    -------
+    str
+        The normalized statement.
+    """
+    return _spaces.sub(" ", _literals.sub("?", query)).strip()
+
+class querymetrics:
+    """
+    Collects per-query-shape statistics for an accessdata instance.
+
+    accessdata calls record() after every statement it runs. Any object with
+    the same record() method can be passed to accessdata instead, e.g. to
+    forward the measurements to another monitoring system.
+
+    Attributes
+    ----------
+    slowSeconds : float
+        Statements slower than this are added to the slow-query log with their query plan.
+    slowLog : str or None
+        JSON-lines file every slow query is also appended to.
+    slow : deque of dict
+        The most recent slow queries.
+    shapes : dict
+        Shape id -> statistics of that shape.
+    statements : dict
+        Statement verb -> count, filled by the trace callback.
+    started : float
+        Wall-clock time the collector was created.
+
+    Methods
+    -------
+    record(query, params, seconds, returned, affected, error, connection):
+        Adds one executed statement.
+    trace(statement):
+        sqlite3 trace callback counting every statement SQLite runs, triggers included.
+    snapshot():
+        Returns a copy of every metric.
+    prometheus():
+        Renders the metrics in the Prometheus text exposition format.
+    write(path):
+        Writes a JSON snapshot, or Prometheus text for a '.prom' path, atomically.
+    flushTo(path, interval):
+        Rewrites the metrics file every `interval` seconds on a background thread.
+    close():
+        Stops the flush thread after a last write.
+    """
+
+    def __init__(self, slowSeconds=0.1, slowLog=None, slowKeep=100):
+        """
+        Initialize an empty collector.
+
+        Parameters
+        ----------
+        slowSeconds : float
+            Slow-query threshold in seconds.
+        slowLog : str or None
+            Optional JSON-lines file for the slow-query log.
+        slowKeep : int
+            Number of slow queries kept in memory.
+        """
+        self.slowSeconds = slowSeconds
+        self.slowLog = slowLog
+        self.slow = deque(maxlen=slowKeep)
+        self.shapes = {}
+        self.statements = {}
+        self.started = time.time()
+        self._shapeIds = {}  # SQL text -> shape id, so each distinct text is normalized once
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+
+    def _shapeOf(self, query):
+        """
+        Return the shape id and the statistics entry of a query, creating it on first use.
+        """
+        shapeId = self._shapeIds.get(query)
+        if shapeId is None:
+            shape = queryShape(query)
+            shapeId = hashlib.sha1(shape.encode()).hexdigest()[:12]
+            if len(self._shapeIds) < 4096:  # Bound the cache against ever-changing literal SQL
+                self._shapeIds[query] = shapeId
+            if shapeId not in self.shapes:
+                self.shapes[shapeId] = {"sql": shape, "kind": shape.split(" ", 1)[0].upper(), "count": 0,
+                                        "errors": 0, "interrupted": 0, "seconds": 0.0, "maxSeconds": 0.0,
+                                        "buckets": [0] * (len(buckets) + 1), "rowsReturned": 0, "rowsAffected": 0,
+                                        "slow": 0}
+        return self.shapes[shapeId]
+
+    def record(self, query, params, seconds, returned=None, affected=None, error=None, connection=None):
+        """
+        Add one executed statement.
+
+        Parameters
+        ----------
+        query : str
+            SQL text as executed.
+        params : tuple or None
+            Bound values; None when the statement ran with executemany.
+        seconds : float
+            Wall time of the statement, commit included for writes.
+        returned : int or None
+            Rows fetched by a query.
+        affected : int or None
+            Rows changed by a write.
+        error : Exception or None
+            The error the statement raised.
+        connection : sqlite3.Connection or None
+            The connection the statement ran on, still held by the caller; used
+            to explain slow statements.
+        """
+        with self._lock:
+            stats = self._shapeOf(query)
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["maxSeconds"] = max(stats["maxSeconds"], seconds)
+            stats["buckets"][bisect.bisect_left(buckets, seconds)] += 1
+            if error is not None:
+                stats["errors"] += 1
+                if isinstance(error, sqlite3.OperationalError) and "interrupt" in str(error):
+                    stats["interrupted"] += 1  # Cancelled by the caller, not a failure of the query
+            if returned is not None:
+                stats["rowsReturned"] += returned
+            if affected is not None and affected > 0:
+                stats["rowsAffected"] += affected
+            slow = seconds >= self.slowSeconds and error is None
+            if slow:
+                stats["slow"] += 1
+        if slow:
+            self._logSlow(query, params, seconds, returned, affected, connection)
+
+    def _logSlow(self, query, params, seconds, returned, affected, connection):
+        """
+        Add a slow statement and its query plan to the slow-query log.
+        """
+        plan = None
+        if connection is not None and params is not None:
+            try:
+                plan = [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + query, params)]
+            except sqlite3.Error as err:
+                plan = [f"unavailable: {err}"]
+        entry = {"time": time.time(), "seconds": seconds, "sql": queryShape(query),
+                 "params": [repr(value)[:80] for value in params] if params is not None else None,
+                 "rowsReturned": returned, "rowsAffected": affected, "plan": plan}
+        with self._lock:
+            self.slow.append(entry)
+        if self.slowLog is not None:
+            try:
+                with open(self.slowLog, "a", encoding="utf-8") as target:
+                    target.write(json.dumps(entry) + "\n")
+            except OSError as err:
+                print(err)  # Print any error, losing a log line must not fail the query
+
+    def trace(self, statement):
+        """
+        Count a statement reported by sqlite3's trace callback.
+
+        Pass this method as accessdata's `trace` argument. SQLite reports every
+        statement it starts, including BEGIN/COMMIT and the statements run by
+        triggers (prefixed with '--').
+
+        Parameters
+        ----------
+        statement : str
+            The expanded SQL text.
+        """
+        verb = statement.lstrip().split(" ", 1)[0].upper() or "?"
+        if verb == "--":
+            verb = "TRIGGER"
+        with self._lock:
+            self.statements[verb] = self.statements.get(verb, 0) + 1
+
+    def snapshot(self):
+        """
+        Return a copy of every metric.
+
+        Returns
+        -------
+        dict
+            started, uptime, buckets (upper bounds in seconds), shapes (shape id ->
+            statistics), slow (recent slow queries) and statements (trace counts).
+        """
+        with self._lock:
+            return {"started": self.started, "uptime": time.time() - self.started, "buckets": list(buckets),
+                    "shapes": {shapeId: dict(stats, buckets=list(stats["buckets"]))
+                               for shapeId, stats in self.shapes.items()},
+                    "slow": list(self.slow), "statements": dict(self.statements)}
+
+    def prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            fifa_query_seconds histograms plus row, error and slow-query counters,
+            labelled by shape id and statement kind.
+        """
+        snapshot = self.snapshot()
+        lines = ["# HELP fifa_query_seconds Statement latency by query shape.",
+                 "# TYPE fifa_query_seconds histogram"]
+        counters = {"rows_returned": "rowsReturned", "rows_affected": "rowsAffected", "errors": "errors",
+                    "interrupted": "interrupted", "slow": "slow"}
+        for shapeId, stats in snapshot["shapes"].items():
+            labels = f'shape="{shapeId}",kind="{stats["kind"]}"'
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], stats["buckets"]):
+                cumulative += count
+                lines.append(f'fifa_query_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"fifa_query_seconds_sum{{{labels}}} {stats['seconds']}")
+            lines.append(f"fifa_query_seconds_count{{{labels}}} {stats['count']}")
+        for name, key in counters.items():
+            lines.append(f"# TYPE fifa_query_{name}_total counter")
+            for shapeId, stats in snapshot["shapes"].items():
+                lines.append(f'fifa_query_{name}_total{{shape="{shapeId}",kind="{stats["kind"]}"}} {stats[key]}')
+        if snapshot["statements"]:
+            lines.append("# TYPE fifa_sqlite_statements_total counter")
+            for verb, count in snapshot["statements"].items():
+                lines.append(f'fifa_sqlite_statements_total{{verb="{verb}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write the metrics to a file atomically, so a scraper never reads a partial file.
+
+        Parameters
+        ----------
+        path : str
+            Target file; a '.prom' suffix selects the Prometheus text format, anything else JSON.
+        """
+        text = self.prometheus() if path.endswith(".prom") else json.dumps(self.snapshot(), indent=2)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as target:
+            target.write(text)
+        os.replace(temporary, path)
+
+    def flushTo(self, path, interval=15.0):
+        """
+        Rewrite the metrics file every `interval` seconds on a daemon thread.
+
+        Parameters
+        ----------
+        path : str
+            Target file, see write().
+        interval : float
+            Seconds between writes.
+        """
+        self.close()  # At most one flush thread per collector
+
+        def loop():
+            while True:
+                stopped = self._stop.wait(interval)
+                try:
+                    self.write(path)  # Also writes the final state on close
+                except OSError as err:
+                    print(err)  # Print any error and try again at the next interval
+                if stopped:
+                    break
+
+        self._stop.clear()
+        self._flusher = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """
+        Stop the flush thread, if any, after it wrote the metrics one last time.
+        """
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
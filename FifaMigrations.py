@@ -0,0 +1,356 @@
+from FifaFilter import filterspec  # Import the filter spec to reproduce the BLL query shapes
+
+# Indexes matched to the filter shapes players.searchData emits. Every index ends in
+# "overall DESC" (and implicitly the rowid) so ORDER BY overall DESC is read straight
+# from the index instead of going through a temporary sort.
+indexes = {
+    "ixPlayersOverall": "CREATE INDEX IF NOT EXISTS ixPlayersOverall ON tblPlayers(overall DESC)",
+    "ixPlayersNationPositionOverall":
+        "CREATE INDEX IF NOT EXISTS ixPlayersNationPositionOverall ON tblPlayers(nation, position, overall DESC)",
+    "ixPlayersNationOverall": "CREATE INDEX IF NOT EXISTS ixPlayersNationOverall ON tblPlayers(nation, overall DESC)",
+    "ixPlayersPositionOverall":
+        "CREATE INDEX IF NOT EXISTS ixPlayersPositionOverall ON tblPlayers(position, overall DESC)",
+    "ixPlayersFirstNameOverall":
+        "CREATE INDEX IF NOT EXISTS ixPlayersFirstNameOverall ON tblPlayers(firstName, overall DESC)",
+    "ixPlayersLastNameOverall":
+        "CREATE INDEX IF NOT EXISTS ixPlayersLastNameOverall ON tblPlayers(lastName, overall DESC)",
+    "ixPlayersTeamOverall": "CREATE INDEX IF NOT EXISTS ixPlayersTeamOverall ON tblPlayers(team, overall DESC)",
+}
+
+# External-content FTS5 tables over the name and club columns. tblPlayersSearch
+# answers case-insensitive prefix queries; tblPlayersTrigram answers typo-tolerant
+# trigram queries. Both store only their index and read the text from tblPlayers.
+textTables = {
+    "tblPlayersSearch": "CREATE VIRTUAL TABLE IF NOT EXISTS tblPlayersSearch USING fts5("
+                        "firstName, lastName, team, content='tblPlayers', content_rowid='id', "
+                        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "tblPlayersTrigram": "CREATE VIRTUAL TABLE IF NOT EXISTS tblPlayersTrigram USING fts5("
+                         "firstName, lastName, team, content='tblPlayers', content_rowid='id', tokenize='trigram')",
+}
+
+# Triggers keeping derived tables in step with tblPlayers.
+triggers = {}
+for table in textTables:
+    triggers[f"tr{table}Insert"] = (
+        f"CREATE TRIGGER IF NOT EXISTS tr{table}Insert AFTER INSERT ON tblPlayers BEGIN "
+        f"INSERT INTO {table}(rowid, firstName, lastName, team) VALUES (new.id, new.firstName, new.lastName, new.team); "
+        f"END")
+    triggers[f"tr{table}Delete"] = (
+        f"CREATE TRIGGER IF NOT EXISTS tr{table}Delete AFTER DELETE ON tblPlayers BEGIN "
+        f"INSERT INTO {table}({table}, rowid, firstName, lastName, team) "
+        f"VALUES ('delete', old.id, old.firstName, old.lastName, old.team); "
+        f"END")
+    triggers[f"tr{table}Update"] = (
+        f"CREATE TRIGGER IF NOT EXISTS tr{table}Update AFTER UPDATE OF id, firstName, lastName, team ON tblPlayers BEGIN "
+        f"INSERT INTO {table}({table}, rowid, firstName, lastName, team) "
+        f"VALUES ('delete', old.id, old.firstName, old.lastName, old.team); "
+        f"INSERT INTO {table}(rowid, firstName, lastName, team) VALUES (new.id, new.firstName, new.lastName, new.team); "
+        f"END")
+
+# Statements recomputing every derived table from tblPlayers after its triggers were suspended.
+rebuilds = [f"INSERT INTO {table}({table}) VALUES ('rebuild')" for table in textTables]
+
+# Summary table behind the analytics API: the number of players per overall rating,
+# overall ("all") and per nation, club and position, kept in step by triggers. Counts,
+# averages, maxima and the histogram are read from it instead of grouping tblPlayers.
+# NULL values are counted under '' and players without an overall are left out.
+summaryDimensions = {"all": None, "nation": "nation", "club": "team", "position": "position"}
+summaryTable = ("CREATE TABLE IF NOT EXISTS tblPlayersSummary(dimension TEXT NOT NULL, value TEXT NOT NULL, "
+                "overall INTEGER NOT NULL, players INTEGER NOT NULL, PRIMARY KEY (dimension, value, overall)) "
+                "WITHOUT ROWID")
+
+def _summaryValue(column, row):
+    """
+    Return the SQL expression of a summary value for a trigger's old/new row or a plain column.
+    """
+    if column is None:
+        return "''"
+    return f"IFNULL({row + '.' if row else ''}{column}, '')"
+
+def _summaryAdd(dimension, column, where=""):
+    """
+    Return the trigger statement counting new.* into one dimension.
+    """
+    return (f"INSERT INTO tblPlayersSummary SELECT '{dimension}', {_summaryValue(column, 'new')}, new.overall, 1 "
+            f"WHERE new.overall IS NOT NULL{where} "
+            f"ON CONFLICT(dimension, value, overall) DO UPDATE SET players=players+1; ")
+
+def _summaryRemove(dimension, column, where=""):
+    """
+    Return the trigger statements uncounting old.* from one dimension, dropping emptied rows.
+    """
+    key = f"dimension='{dimension}' AND value={_summaryValue(column, 'old')} AND overall=old.overall{where}"
+    return (f"UPDATE tblPlayersSummary SET players=players-1 WHERE {key}; "
+            f"DELETE FROM tblPlayersSummary WHERE {key} AND players=0; ")
+
+def _summaryChanged(column):
+    """
+    Return the extra trigger condition limiting an update to rows that moved within a dimension.
+    """
+    changed = "old.overall IS NOT new.overall" + (f" OR old.{column} IS NOT new.{column}" if column else "")
+    return f" AND ({changed})"
+
+summaryTriggers = {
+    "trPlayersSummaryInsert": "CREATE TRIGGER IF NOT EXISTS trPlayersSummaryInsert AFTER INSERT ON tblPlayers BEGIN " +
+                              "".join(_summaryAdd(d, c) for d, c in summaryDimensions.items()) + "END",
+    "trPlayersSummaryDelete": "CREATE TRIGGER IF NOT EXISTS trPlayersSummaryDelete AFTER DELETE ON tblPlayers BEGIN " +
+                              "".join(_summaryRemove(d, c) for d, c in summaryDimensions.items()) + "END",
+    # Only the dimensions whose value or overall actually changed are touched
+    "trPlayersSummaryUpdate": "CREATE TRIGGER IF NOT EXISTS trPlayersSummaryUpdate "
+                              "AFTER UPDATE OF nation, team, position, overall ON tblPlayers BEGIN " +
+                              "".join(_summaryRemove(d, c, _summaryChanged(c)) + _summaryAdd(d, c, _summaryChanged(c))
+                                      for d, c in summaryDimensions.items()) + "END",
+}
+
+# The summary rows recomputed from tblPlayers, in the table's column order.
+summarySelect = " UNION ALL ".join(
+    f"SELECT '{dimension}', {_summaryValue(column, None)}, overall, COUNT(*) FROM tblPlayers "
+    f"WHERE overall IS NOT NULL GROUP BY 2, 3" for dimension, column in summaryDimensions.items())
+summaryRebuilds = ["DELETE FROM tblPlayersSummary", "INSERT INTO tblPlayersSummary " + summarySelect]
+
+# Ordered list of (version, description, statements). Never edit a released entry;
+# append a new version instead.
+migrations = [
+    (1, "Filter indexes for tblPlayers and removal of the stale backup table",
+     ["DROP TABLE IF EXISTS _tblPlayers_old_20230123"] + list(indexes.values())),
+    (2, "FTS5 prefix and trigram name search kept in sync by triggers",
+     list(textTables.values()) + list(triggers.values()) + rebuilds),
+    (3, "Per nation/club/position overall summary table kept in sync by triggers",
+     [summaryTable] + list(summaryTriggers.values()) + summaryRebuilds),
+]
+
+def schemaVersion(connection):
+    """
+    Return the schema version recorded in the database.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+
+    Returns
+    -------
+    int
+        Value of PRAGMA user_version (0 for an unmigrated database).
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(connection):
+    """
+    Apply every migration newer than the recorded schema version.
+
+    The caller owns the transaction, so a failing step leaves the schema untouched.
+    Indexes or sync triggers found missing, as left by a bulk load that died
+    between suspendDerived and restoreDerived, are restored and the derived
+    tables rebuilt.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Connection inside an open write transaction.
+
+    Returns
+    -------
+    int
+        The schema version after migrating.
+    """
+    current = schemaVersion(connection)
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        for statement in statements:
+            connection.execute(statement)
+        connection.execute(f"PRAGMA user_version={version}")  # Transactional, rolls back with the rest
+        current = version
+    if missingDerived(connection):
+        restoreDerived(connection)
+    return current
+
+def missingDerived(connection):
+    """
+    Return the filter indexes and sync triggers missing from the schema.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection to a fully migrated database.
+
+    Returns
+    -------
+    list of str
+        Names of the missing indexes and triggers; empty when nothing is suspended.
+    """
+    present = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+    return [name for name in list(indexes) + list(triggers) + list(summaryTriggers) if name not in present]
+
+def dropIndexes(connection):
+    """
+    Drop the filter indexes, e.g. before a bulk load.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+    """
+    for name in indexes:
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+
+def createIndexes(connection):
+    """
+    Create any missing filter index.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+    """
+    for statement in indexes.values():
+        connection.execute(statement)
+
+def suspendDerived(connection):
+    """
+    Drop the indexes and sync triggers before a bulk load.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+    """
+    dropIndexes(connection)
+    for name in list(triggers) + list(summaryTriggers):
+        connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def restoreDerived(connection):
+    """
+    Recreate the indexes and triggers and rebuild the derived tables after a bulk load.
+
+    Idempotent: migrate() calls it again when a load was killed before its own call.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+    """
+    createIndexes(connection)
+    for statement in list(triggers.values()) + list(summaryTriggers.values()):
+        connection.execute(statement)
+    for statement in rebuilds + summaryRebuilds:
+        connection.execute(statement)
+
+def checkSummaries(connection):
+    """
+    Compare the summary table with a recount from tblPlayers.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+
+    Returns
+    -------
+    list of tuple
+        (problem, dimension, value, overall, players) for every summary row that
+        is 'missing' or differs from the recount, and every stored row that is
+        'stale'; empty when the summary is consistent.
+    """
+    stored = "SELECT dimension, value, overall, players FROM tblPlayersSummary"
+    recount = f"SELECT * FROM ({summarySelect})"  # Parenthesized: compound operators associate left
+    return connection.execute(f"SELECT 'missing', * FROM ({recount} EXCEPT {stored}) "
+                              f"UNION ALL SELECT 'stale', * FROM ({stored} EXCEPT {recount})").fetchall()
+
+def rebuildSummaries(connection):
+    """
+    Recompute the summary table from tblPlayers.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Connection inside an open write transaction.
+    """
+    for statement in summaryRebuilds:
+        connection.execute(statement)
+
+def queryShapes():
+    """
+    Enumerate one representative spec per query shape the BLL emits.
+
+    Returns
+    -------
+    list of tuple
+        (label, filterspec, sorts) triples covering every combination of the
+        form fields, the club, last-name and exact first-name filters, and
+        every column sort of the result table;
+        `sorts` is True where ORDER BY may sort the (small) full-text hit list.
+    """
+    shapes = []
+    for name in ("", "Leo"):
+        for post in ("", "CM"):
+            for nation in ("Any", "Germany"):
+                fields = [label for label, value in (("name", name), ("position", post), ("nation", nation))
+                          if value not in ("", "Any")]
+                label = "overall+" + "+".join(fields) if fields else "overall"
+                spec = filterspec().overallRange(low=30)
+                if name:
+                    spec.nameMatch(name)
+                if post:
+                    spec.position(post)
+                if nation != "Any":
+                    spec.nation(nation)
+                shapes.append((label, spec, bool(name)))
+    shapes.append(("overall+fuzzy name", filterspec().overallRange(low=30).nameMatch("Ronaldo", fuzzy=True), True))
+    shapes.append(("overall+firstName", filterspec().overallRange(low=30).firstName("Leon"), False))
+    shapes.append(("overall+club", filterspec().overallRange(low=30).club("LEGEND"), False))
+    shapes.append(("overall+lastName", filterspec().overallRange(low=30).lastName("Messi"), False))
+    for column in filterspec.columns:
+        for descending in (False, True):
+            spec = filterspec().overallRange(low=30).sortBy(column, descending)
+            shapes.append((f"sort {column}{' desc' if descending else ''}", spec, False))
+    return shapes
+
+def checkQueryPlans(connection):
+    """
+    Run EXPLAIN QUERY PLAN for every BLL query shape and flag full scans.
+
+    Each shape is checked both as a full search and as a keyset page. A shape
+    fails when its plan scans 'tblPlayers' without an index (other than to
+    sort by id, the table's own order), or needs a temporary B-tree to
+    satisfy ORDER BY although it is not a full-text search (those sort only
+    their hits).
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Open database connection.
+
+    Returns
+    -------
+    list of tuple
+        (label, query, plan lines, ok) for each shape.
+    """
+    report = []
+    for label, spec, sorts in queryShapes():
+        after = tuple({"overall": 99, "id": 0}.get(column, "M") for column, _ in spec.order)
+        page = spec.selectQuery(limit=200) if spec.ranked() else spec.selectQuery(after=after, limit=200)
+        for suffix, (query, params) in (("", spec.selectQuery()), (" page", page)):
+            plan = [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + query, params)]
+            walks = spec.order[0][0] == "id"  # An id sort reads the table itself in rowid order
+            ok = not any((line == "SCAN tblPlayers" and not walks) or ("TEMP B-TREE" in line and not sorts)
+                         for line in plan)
+            report.append((label + suffix, query, plan, ok))
+    return report
+
+if __name__ == "__main__":
+    import sqlite3
+    import sys
+
+    # Usage: python FifaMigrations.py [database] -- migrates, then prints the plan and summary checks
+    with sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else "FIFA24.db") as connection:
+        print("schema version:", migrate(connection))
+        failures = 0
+        for label, query, plan, ok in checkQueryPlans(connection):
+            print(("ok   " if ok else "SCAN ") + label + ": " + " | ".join(plan))
+            failures += not ok
+        problems = checkSummaries(connection)
+        print(f"summary table: {len(problems)} inconsistent rows" if problems else "summary table: consistent")
+        failures += bool(problems)
+    sys.exit(1 if failures else 0)
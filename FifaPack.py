@@ -0,0 +1,216 @@
+import mmap  # Import mmap to map a pack instead of reading it
+import os  # Import os to replace the pack file atomically
+import struct  # Import struct for the fixed header and the column directory
+import sys  # Import sys to check the machine's byte order
+from array import array  # Import array for the column buffers written out
+from operator import itemgetter  # Import itemgetter to split row batches into columns
+
+from FifaFilter import filterspec  # Import the filter spec for the table's column order
+
+# A pack holds 'tblPlayers' column by column, ready to be memory-mapped:
+#
+#   preamble   magic, format version, column count, row count
+#   directory  one entry per column: name, data offset, dictionary size
+#              (-1 for an integer column), dictionary offset, code of NULL (-1 if none)
+#   data       per column, `rows` little-endian int32 values: the value itself
+#              for id and overall, a dictionary code for the text columns
+#   dictionary per text column, int64 byte offsets (size + 1 of them) followed
+#              by the UTF-8 strings, code order
+#
+# Every data and dictionary block starts on a 64-byte boundary.
+magic = b"FIFAPACK"
+version = 1
+preamble = struct.Struct("<8sIIQ")
+entry = struct.Struct("<16sqqqq")
+alignment = 64
+integers = ("id", "overall")
+
+def _aligned(offset):
+    """
+    Round an offset up to the next block boundary.
+    """
+    return -(-offset // alignment) * alignment
+
+def _littleEndian(values):
+    """
+    Return an array's bytes in little-endian order.
+    """
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def exportPack(dataAccess, path, batch=100000):
+    """
+    Write every player to a pack file, ordered by id.
+
+    The pack is written to a temporary file next to `path` and renamed over
+    it once complete, so an existing pack is never left half-written.
+
+    Parameters
+    ----------
+    dataAccess : accessdata
+        Database to export.
+    path : str
+        Pack file to create.
+    batch : int
+        Rows read per batch.
+
+    Returns
+    -------
+    int
+        Number of players exported.
+    """
+    columns = filterspec.columns
+    values = [array("i") for _ in columns]
+    dictionaries = [None if column in integers else {} for column in columns]  # value -> code, in code order
+    query = f"SELECT {', '.join(columns)} FROM tblPlayers ORDER BY id"
+    for rows in dataAccess.streamData(query, size=batch):
+        for position, (stored, codes) in enumerate(zip(values, dictionaries)):
+            column = map(itemgetter(position), rows)
+            if codes is None:
+                stored.extend(column)
+            else:
+                stored.extend(codes[value] if value in codes else codes.setdefault(value, len(codes)) for value in column)
+    rows = len(values[0])
+    blocks = []  # (offset, bytes) in file order
+    directory = []
+    offset = _aligned(preamble.size + entry.size * len(columns))
+    for column, stored, codes in zip(columns, values, dictionaries):
+        data = offset
+        blocks.append((data, _littleEndian(stored)))
+        offset = _aligned(offset + 4 * rows)
+        if codes is None:
+            directory.append(entry.pack(column.encode(), data, -1, 0, -1))
+            continue
+        strings = [b"" if word is None else str(word).encode("utf-8") for word in codes]
+        bounds = array("q", [0])
+        for string in strings:
+            bounds.append(bounds[-1] + len(string))
+        directory.append(entry.pack(column.encode(), data, len(strings), offset, codes.get(None, -1)))
+        blocks.append((offset, _littleEndian(bounds) + b"".join(strings)))
+        offset = _aligned(offset + 8 * len(bounds) + bounds[-1])
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as target:
+        target.write(preamble.pack(magic, version, len(columns), rows) + b"".join(directory))
+        for start, data in blocks:
+            target.write(b"\0" * (start - target.tell()))
+            target.write(data)
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary, path)
+    return rows
+
+class playerpack:
+    """
+    A pack file mapped into memory, readable without parsing any row.
+
+    The file is mapped copy-on-write: the column views share the page cache
+    with the file until something writes to them (a columnindex patched
+    after a write, say), and nothing is ever written back. Only the string
+    dictionaries are decoded, one Python string per distinct value.
+
+    Attributes
+    ----------
+    path : str
+        The pack file.
+    rows : int
+        Number of players.
+    names : list of str
+        Column names, in 'tblPlayers' order.
+    columns : list of memoryview
+        Per column, the int32 values or dictionary codes, mapped from the file.
+    words : list of list or None
+        Per column, code -> value for text columns (None for NULL), None for integer columns.
+
+    Methods
+    -------
+    close():
+        Unmaps the file.
+    """
+
+    def __init__(self, path):
+        """
+        Map a pack file.
+
+        Parameters
+        ----------
+        path : str
+            File written by exportPack; ValueError if it is not one.
+        """
+        self.path = path
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_COPY)  # The mapping outlives the file object
+        if len(self._map) < preamble.size or self._map[:len(magic)] != magic:
+            raise ValueError(f"not a player pack: {path}")
+        _, release, count, self.rows = preamble.unpack_from(self._map, 0)
+        if release != version:
+            raise ValueError(f"unsupported player pack version {release}: {path}")
+        self._view = memoryview(self._map)
+        self.names, self.columns, self.words = [], [], []
+        for position in range(count):
+            name, data, size, words, null = entry.unpack_from(self._map, preamble.size + entry.size * position)
+            self.names.append(name.rstrip(b"\0").decode())
+            self.columns.append(self._array("i", data, self.rows))
+            if size < 0:
+                self.words.append(None)
+                continue
+            bounds = self._array("q", words, size + 1)
+            start = words + 8 * (size + 1)
+            strings = self._map[start:start + bounds[size]]  # One copy of the whole dictionary
+            decoded = [strings[bounds[code]:bounds[code + 1]].decode("utf-8") for code in range(size)]
+            if null >= 0:
+                decoded[null] = None
+            self.words.append(decoded)
+        if tuple(self.names) != filterspec.columns:
+            raise ValueError(f"unexpected columns {self.names}: {path}")
+
+    def _array(self, typecode, offset, count):
+        """
+        Return `count` little-endian values at `offset` as a native memoryview.
+        """
+        size = array(typecode).itemsize
+        view = self._view[offset:offset + size * count]
+        if sys.byteorder == "big":
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return memoryview(values)
+        return view.cast(typecode)
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        return zip(*(column if words is None else map(words.__getitem__, column)
+                     for column, words in zip(self.columns, self.words)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the file, unless arrays built on the columns still use it: it is
+        then unmapped once they are freed.
+        """
+        try:
+            for column in self.columns:
+                column.release()
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            pass  # The columns are shared with a columnindex or similar
+
+if __name__ == "__main__":
+    import argparse
+    from FifaDataAccess import accessdata
+
+    parser = argparse.ArgumentParser(description="Export tblPlayers to a memory-mappable pack file.")
+    parser.add_argument("target", help="pack file to write, e.g. players.fpack")
+    parser.add_argument("--db", default="FIFA24.db", help="database to export")
+    arguments = parser.parse_args()
+    dataAccess = accessdata(arguments.db)
+    print(f"exported {exportPack(dataAccess, arguments.target)} players to {arguments.target}")
+    dataAccess.close()
@@ -0,0 +1,518 @@
+import argparse  # Import argparse for the launch flags
+import asyncio  # Import asyncio for the event loop and the socket streams
+import json  # Import json for the request and response bodies
+from concurrent.futures import ThreadPoolExecutor  # Import the executor the blocking reads run on
+from urllib.parse import parse_qs, urlsplit  # Import the helpers that split a request target
+
+from FifaBLL import players, writequeue  # Import the business layer and its serialized writer
+from FifaCache import resultcache  # Import the result cache shared by every client
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaFilter import filterspec  # Import the filter spec the query strings are translated into
+
+statuses = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class httperror(Exception):
+    """
+    A request that ends with an error status and a JSON {"error": message} body.
+
+    Attributes
+    ----------
+    status : int
+        HTTP status code.
+    message : str
+        Explanation sent to the client.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def specFor(query):
+    """
+    Translate a search's query string into a filter spec.
+
+    Parameters
+    ----------
+    query : dict
+        Parameter -> value: name (full-text words, with fuzzy=1 to tolerate
+        typos), firstName, lastName, nation, position, club, min and max
+        (overall bounds), sort (a column, with desc=1 for descending).
+
+    Returns
+    -------
+    filterspec
+        The spec; httperror 400 if a parameter is unknown or malformed.
+    """
+    unknown = set(query) - {"name", "fuzzy", "firstName", "lastName", "nation", "position", "club", "min", "max",
+                            "sort", "desc", "limit", "after"}
+    if unknown:
+        raise httperror(400, f"unknown parameters: {', '.join(sorted(unknown))}")
+    spec = filterspec()
+    try:
+        spec.overallRange(low=int(query["min"]) if "min" in query else None,
+                          high=int(query["max"]) if "max" in query else None)
+        for parameter in ("firstName", "lastName", "nation", "position"):
+            if parameter in query:
+                spec.equals(parameter, query[parameter])
+        if "club" in query:
+            spec.club(query["club"])
+        if query.get("name"):
+            spec.nameMatch(query["name"], fuzzy=query.get("fuzzy") in ("1", "true"))
+        if "sort" in query:
+            spec.sortBy("team" if query["sort"] == "club" else query["sort"], query.get("desc") in ("1", "true"))
+    except ValueError as err:
+        raise httperror(400, str(err))
+    return spec
+
+def limitFor(query, cap):
+    """
+    Parse a page's limit: 200 by default, at most `cap`.
+
+    Parameters
+    ----------
+    query : dict
+        Parameter -> value.
+    cap : int
+        Largest page served.
+
+    Returns
+    -------
+    int
+        The limit; httperror 400 unless it is a positive integer.
+    """
+    text = query.get("limit", "200")
+    try:
+        limit = int(text)
+    except ValueError:
+        raise httperror(400, f"limit must be an integer, not {text!r}")
+    if limit < 1:
+        raise httperror(400, f"limit must be at least 1, not {limit}")
+    return min(limit, cap)
+
+def rowObject(row):
+    """
+    Return a player tuple as a JSON object keyed by column.
+    """
+    return dict(zip(filterspec.columns, row))
+
+class playerservice:
+    """
+    Asyncio HTTP/JSON front end for players, for tools that need the roster without the Qt form.
+
+    Reads run on a bounded thread pool sized like the accessdata read pool,
+    so the event loop never blocks on SQLite and no read waits for a
+    connection inside a thread. Identical searches in flight at the same time
+    share one execution (coalescing), and results are reused through the
+    players result cache until the database changes. When more reads are
+    queued than `maxPending`, or more rows wait for the writer than
+    `maxWrites`, new requests are answered 503 with Retry-After instead of
+    queueing without bound.
+
+    Every write goes through a single writequeue, the one thread that writes,
+    which commits the writes of all clients arriving within `groupCommitMs`
+    together; a write is answered once its group has committed.
+
+    Large results are streamed as JSON lines with chunked transfer encoding,
+    one keyset page at a time: the next page is only read once the previous
+    one has drained to the client, so a slow reader holds back its own stream
+    without holding a database connection in between. A client that stops
+    reading for `drainSeconds` is disconnected.
+
+    Endpoints
+    ---------
+    GET /players?<filters>&limit=&after=
+        One page as {"rows": [...], "next": cursor}; pass `next` back as `after`.
+    GET /players/stream?<filters>
+        Every matching player, one JSON object per line.
+    GET /players/count?<filters>
+        {"count": n}.
+    GET /players/<id>
+        One player.
+    PUT /players
+        Upsert a player object or a list of them; {"written": n}.
+    DELETE /players/<id>
+        {"deleted": n}.
+    GET /stats
+        Request, coalescing and cache counters.
+
+    Attributes
+    ----------
+    players : players
+        Business object every request goes through.
+    writes : writequeue
+        The serialized writer.
+    maxPending, maxWrites : int
+        Admission limits for queued reads and queued written rows.
+    pageRows : int
+        Rows per streamed page, and the largest page /players returns.
+    maxBody : int
+        Largest accepted request body in bytes.
+    drainSeconds, idleSeconds : float
+        How long a client may stall a response, and stay idle between requests.
+
+    Methods
+    -------
+    start(host, port):
+        Starts listening and returns the asyncio server.
+    stats():
+        Returns the service counters.
+    close():
+        Commits the queued writes and stops the worker threads.
+    """
+
+    def __init__(self, business, readers=4, groupCommitMs=5, maxPending=256, maxWrites=20000, pageRows=2000,
+                 maxBody=8 * 1024 * 1024, drainSeconds=30.0, idleSeconds=60.0):
+        """
+        Initialize the service around a players object.
+
+        Parameters
+        ----------
+        business : players
+            Business object to serve; its accessdata should pool at least `readers` connections.
+        readers : int
+            Threads running reads.
+        groupCommitMs : int
+            Group commit window of the writer.
+        maxPending : int
+            Reads queued or running before new ones are refused.
+        maxWrites : int
+            Rows waiting for the writer before new writes are refused.
+        pageRows : int
+            Rows per streamed page.
+        maxBody : int
+            Request body limit in bytes.
+        drainSeconds : float
+            Time a client may take to accept a response chunk.
+        idleSeconds : float
+            Time a kept-alive connection may wait for its next request.
+        """
+        self.players = business
+        self.writes = writequeue(business, groupCommitMs / 1000)
+        self.maxPending = maxPending
+        self.maxWrites = maxWrites
+        self.pageRows = pageRows
+        self.maxBody = maxBody
+        self.drainSeconds = drainSeconds
+        self.idleSeconds = idleSeconds
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="service-read")
+        self._inflight = {}  # Read key -> future shared by every identical request
+        self._pendingReads = 0
+        self._pendingWrites = 0
+        self.requests = self.coalesced = self.rejected = self.streamedRows = 0
+
+    async def start(self, host="127.0.0.1", port=8024):
+        """
+        Start accepting connections.
+
+        Parameters
+        ----------
+        host : str
+            Interface to listen on.
+        port : int
+            TCP port, 0 for any free one.
+
+        Returns
+        -------
+        asyncio.Server
+            The listening server.
+        """
+        return await asyncio.start_server(self._connection, host, port)
+
+    def stats(self):
+        """
+        Return the service counters.
+
+        Returns
+        -------
+        dict
+            requests, coalesced, rejected, streamedRows, pendingReads,
+            pendingWrites and the result cache's stats (None without a cache).
+        """
+        cache = self.players.cache
+        return {"requests": self.requests, "coalesced": self.coalesced, "rejected": self.rejected,
+                "streamedRows": self.streamedRows, "pendingReads": self._pendingReads,
+                "pendingWrites": self._pendingWrites, "cache": cache.stats() if cache is not None else None}
+
+    def close(self):
+        """
+        Commit the queued writes and stop the reader threads.
+        """
+        self.writes.close()
+        self._readers.shutdown(wait=True)
+
+    async def _read(self, key, function, *args, admit=True):
+        """
+        Run a blocking read on the reader threads, sharing it with identical reads in flight.
+
+        Parameters
+        ----------
+        key : tuple
+            Identifies the read; equal keys give equal results.
+        function : callable
+            The read, called with `args` on a reader thread.
+        admit : bool
+            Apply the maxPending limit (not for the later pages of an admitted stream).
+
+        Returns
+        -------
+        Any
+            The read's result.
+        """
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)  # A client leaving must not cancel the others' read
+        if admit and self._pendingReads >= self.maxPending:
+            self.rejected += 1
+            raise httperror(503, "too many pending reads")
+        self._pendingReads += 1
+        shared = asyncio.get_running_loop().run_in_executor(self._readers, function, *args)
+        self._inflight[key] = shared
+
+        def finished(_):
+            self._pendingReads -= 1
+            del self._inflight[key]
+
+        shared.add_done_callback(finished)
+        return await asyncio.shield(shared)
+
+    async def _write(self, operations):
+        """
+        Queue writes on the serialized writer and wait for their group commit.
+
+        Parameters
+        ----------
+        operations : list of tuple
+            (operation, item) pairs, see players.writeMany.
+
+        Returns
+        -------
+        list of int
+            Rows affected by each write.
+        """
+        if self._pendingWrites + len(operations) > self.maxWrites:
+            self.rejected += 1
+            raise httperror(503, "too many pending writes")
+        try:
+            futures = self.writes.submitMany(operations)
+        except (KeyError, TypeError, ValueError) as err:
+            raise httperror(400, f"malformed player: {err}")
+        self._pendingWrites += len(operations)
+        try:
+            counts = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        finally:
+            self._pendingWrites -= len(operations)
+        if None in counts:
+            raise httperror(500, "write failed")
+        return counts
+
+    async def _connection(self, reader, writer):
+        """
+        Serve the requests of one kept-alive connection in order.
+        """
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idleSeconds)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break  # Closed, idle or an oversized header
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    break  # Not HTTP
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keepAlive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self.requests += 1
+                try:
+                    if "transfer-encoding" in headers:
+                        keepAlive = False  # The body's end is unknown
+                        raise httperror(411, "send a Content-Length")
+                    length = int(headers.get("content-length") or 0)
+                    if length > self.maxBody:
+                        keepAlive = False  # The body is not read
+                        raise httperror(413, f"body over {self.maxBody} bytes")
+                    body = await reader.readexactly(length) if length else b""
+                    await self._dispatch(method, target, body, writer, keepAlive)
+                except httperror as err:
+                    headers = ("Retry-After: 1",) if err.status == 503 else ()
+                    await self._respond(writer, err.status, {"error": err.message}, keepAlive, headers)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break  # The client went away or stopped reading mid-response
+                except Exception as err:
+                    print(err)  # Print any error, the client gets a 500
+                    await self._respond(writer, 500, {"error": "internal error"}, keepAlive)
+                if not keepAlive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError):
+            pass  # The error response itself could not be delivered
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keepAlive, headers=()):
+        """
+        Send one JSON response and wait until the client accepts it.
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        head = [f"HTTP/1.1 {status} {statuses[status]}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keepAlive else "close"), *headers]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await asyncio.wait_for(writer.drain(), self.drainSeconds)
+
+    async def _dispatch(self, method, target, body, writer, keepAlive):
+        """
+        Route one request to its endpoint.
+        """
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["stats"] and method == "GET":
+            return await self._respond(writer, 200, self.stats(), keepAlive)
+        if not parts or parts[0] != "players" or len(parts) > 2:
+            raise httperror(404, f"no such resource: {url.path}")
+        if len(parts) == 1:
+            if method == "GET":
+                return await self._page(query, writer, keepAlive)
+            if method in ("PUT", "POST"):
+                return await self._upsert(body, writer, keepAlive)
+        elif parts[1] == "stream" and method == "GET":
+            return await self._stream(specFor(query), writer, keepAlive)
+        elif parts[1] == "count" and method == "GET":
+            spec = specFor(query)
+            count = await self._read(("count", spec.key()), self.players.countData, spec)
+            if count is None:
+                raise httperror(500, "count failed")
+            return await self._respond(writer, 200, {"count": count}, keepAlive)
+        elif parts[1].isdigit() and method in ("GET", "DELETE"):
+            return await self._player(method, int(parts[1]), writer, keepAlive)
+        raise httperror(405, f"{method} is not supported on {url.path}")
+
+    async def _page(self, query, writer, keepAlive):
+        """
+        Answer GET /players with one keyset page.
+        """
+        spec = specFor(query)
+        limit = limitFor(query, self.pageRows)
+        try:
+            after = json.loads(query["after"]) if "after" in query else None
+            key = spec.keyOf(after) if after is not None else None
+        except (TypeError, ValueError, IndexError) as err:
+            raise httperror(400, f"bad cursor: {err}")
+        rows = await self._read(("page", spec.key(), key, limit), self.players.searchPage, spec, after, limit)
+        if rows is None:
+            raise httperror(500, "search failed")
+        more = len(rows) == limit and not spec.ranked()
+        await self._respond(writer, 200, {"rows": [rowObject(row) for row in rows],
+                                          "next": json.dumps(rows[-1]) if more else None}, keepAlive)
+
+    async def _stream(self, spec, writer, keepAlive):
+        """
+        Answer GET /players/stream with every matching player as JSON lines.
+
+        A failure before the first page is answered with an error response.
+        Once the headers are out, the connection is dropped without the
+        final chunk, so the client sees a truncated body rather than an
+        export that looks complete.
+        """
+        after, key, admit = None, None, True
+        head = ["HTTP/1.1 200 OK", "Content-Type: application/x-ndjson", "Transfer-Encoding: chunked",
+                "Connection: " + ("keep-alive" if keepAlive else "close")]
+        try:
+            while True:
+                # Uncached: a scan would flush the cache
+                rows = await self._read(("stream", spec.key(), key, self.pageRows), self.players.searchPage, spec,
+                                        after, self.pageRows, None, False, admit=admit)
+                if rows is None:
+                    raise httperror(500, "search failed")
+                if head:  # Sent with the first page, so a refused stream can still be answered 503
+                    writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+                    head, admit = None, False
+                if rows:
+                    chunk = "".join(json.dumps(rowObject(row), separators=(",", ":")) + "\n" for row in rows).encode()
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.streamedRows += len(rows)
+                await asyncio.wait_for(writer.drain(), self.drainSeconds)  # Backpressure: next page once this one left
+                if len(rows) < self.pageRows or spec.ranked():
+                    break
+                after = rows[-1]
+                key = spec.keyOf(after)
+            writer.write(b"0\r\n\r\n")
+            await asyncio.wait_for(writer.drain(), self.drainSeconds)
+        except Exception as err:
+            if head:
+                raise  # Nothing sent yet: answered like any other request
+            if not isinstance(err, (asyncio.TimeoutError, ConnectionError)):
+                print(err)  # Print any error, the client sees the connection drop
+            raise ConnectionAbortedError("stream aborted") from err  # Ends the connection without a second response
+
+    async def _upsert(self, body, writer, keepAlive):
+        """
+        Answer PUT /players: insert or replace one player or a list of them by id.
+        """
+        try:
+            document = json.loads(body or b"null")
+        except ValueError as err:
+            raise httperror(400, f"invalid JSON: {err}")
+        rows = document if isinstance(document, list) else [document]
+        if not rows or not all(isinstance(row, (dict, list)) for row in rows):
+            raise httperror(400, "send a player object or a list of players")
+        counts = await self._write([("upsert", row) for row in rows])
+        await self._respond(writer, 200, {"written": sum(counts)}, keepAlive)
+
+    async def _player(self, method, identifier, writer, keepAlive):
+        """
+        Answer GET and DELETE /players/<id>.
+        """
+        if method == "DELETE":
+            count = (await self._write([("delete", identifier)]))[0]
+            if not count:
+                raise httperror(404, f"no player {identifier}")
+            return await self._respond(writer, 200, {"deleted": count}, keepAlive)
+        spec = filterspec().equals("id", identifier)
+        rows = await self._read(("search", spec.key()), self.players.search, spec)
+        if rows is None:
+            raise httperror(500, "search failed")
+        if not rows:
+            raise httperror(404, f"no player {identifier}")
+        await self._respond(writer, 200, rowObject(rows[0]), keepAlive)
+
+async def serve(arguments):
+    """
+    Run the service until interrupted.
+
+    Parameters
+    ----------
+    arguments : argparse.Namespace
+        Parsed command line.
+    """
+    cache = resultcache(maxBytes=arguments.cache_mb * 1024 * 1024) if arguments.cache_mb > 0 else None
+    business = players(dataAccess=accessdata(arguments.db, readers=arguments.readers), cache=cache)
+    service = playerservice(business, arguments.readers, arguments.group_commit_ms, arguments.max_pending)
+    server = await service.start(arguments.host, arguments.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"listening on http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        business.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the players database as HTTP/JSON.")
+    parser.add_argument("--db", default="FIFA24.db", help="database to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8024, help="TCP port, 0 for any free one")
+    parser.add_argument("--readers", type=int, default=4, help="read threads and pooled read connections")
+    parser.add_argument("--group-commit-ms", type=int, default=5, help="how long the writer gathers writes")
+    parser.add_argument("--max-pending", type=int, default=256, help="queued reads before answering 503")
+    parser.add_argument("--cache-mb", type=int, default=32, help="memory for cached results; 0 disables the cache")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
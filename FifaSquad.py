@@ -0,0 +1,169 @@
+from FifaFilter import filterspec  # Import the filter spec the squad's candidates must match
+
+# Formation -> slots, goalkeeper first. A slot is named after the position it is for.
+formations = {
+    "4-3-3": ["GK", "LB", "CB", "CB", "RB", "CM", "CM", "CM", "LW", "ST", "RW"],
+    "4-4-2": ["GK", "LB", "CB", "CB", "RB", "LM", "CM", "CM", "RM", "ST", "ST"],
+    "4-2-3-1": ["GK", "LB", "CB", "CB", "RB", "CDM", "CDM", "LW", "CAM", "RW", "ST"],
+    "3-5-2": ["GK", "CB", "CB", "CB", "LM", "CDM", "CM", "CM", "RM", "ST", "CF"],
+}
+
+# Slot -> {position: overall points lost playing there}. A player fits only the slots
+# listing their position; in their own position they keep their full overall.
+fits = {
+    "GK": {"GK": 0},
+    "CB": {"CB": 0, "CDM": 4, "LB": 6, "RB": 6},
+    "LB": {"LB": 0, "RB": 4, "CB": 5, "LM": 6},
+    "RB": {"RB": 0, "LB": 4, "CB": 5, "RM": 6},
+    "CDM": {"CDM": 0, "CM": 2, "CB": 5},
+    "CM": {"CM": 0, "CDM": 2, "CAM": 2},
+    "CAM": {"CAM": 0, "CM": 3, "CF": 3},
+    "LM": {"LM": 0, "LW": 2, "RM": 4, "LB": 6},
+    "RM": {"RM": 0, "RW": 2, "LM": 4, "RB": 6},
+    "LW": {"LW": 0, "LM": 2, "RW": 3, "ST": 5},
+    "RW": {"RW": 0, "RM": 2, "LW": 3, "ST": 5},
+    "ST": {"ST": 0, "CF": 1, "LW": 5, "RW": 5, "CAM": 6},
+    "CF": {"CF": 0, "ST": 1, "CAM": 3},
+}
+
+def assign(cost):
+    """
+    Solve the rectangular assignment problem with the Hungarian algorithm.
+
+    Every row is matched to a distinct column so that the total cost is
+    minimal, in O(rows^2 * columns) time.
+
+    Parameters
+    ----------
+    cost : list of list of float
+        cost[row][column]; there must be at least as many columns as rows.
+
+    Returns
+    -------
+    list of int
+        The column assigned to each row.
+    """
+    rows, columns = len(cost), len(cost[0]) if cost else 0
+    if rows > columns:
+        raise ValueError("more rows than columns")
+    infinity = float("inf")
+    u, v = [0.0] * (rows + 1), [0.0] * (columns + 1)  # Row and column potentials
+    owner = [0] * (columns + 1)  # owner[column] = row (1-based) matched to it; column 0 is the root
+    way = [0] * (columns + 1)  # Previous column on the shortest augmenting path
+    for row in range(1, rows + 1):
+        owner[0] = row
+        current = 0
+        slack = [infinity] * (columns + 1)
+        used = [False] * (columns + 1)
+        while owner[current]:
+            used[current] = True
+            matched, delta, following = owner[current], infinity, 0
+            costs = cost[matched - 1]
+            for column in range(1, columns + 1):
+                if not used[column]:
+                    reduced = costs[column - 1] - u[matched] - v[column]
+                    if reduced < slack[column]:
+                        slack[column], way[column] = reduced, current
+                    if slack[column] < delta:
+                        delta, following = slack[column], column
+            for column in range(columns + 1):
+                if used[column]:
+                    u[owner[column]] += delta
+                    v[column] -= delta
+                else:
+                    slack[column] -= delta
+            current = following
+        while current:  # Flip the augmenting path
+            previous = way[current]
+            owner[current] = owner[previous]
+            current = previous
+    result = [0] * rows
+    for column in range(1, columns + 1):
+        if owner[column]:
+            result[owner[column] - 1] = column - 1
+    return result
+
+class squadbuilder:
+    """
+    Picks the best eleven for a formation.
+
+    Players are assigned to the formation's slots so that the sum of their
+    effective overall (overall minus the fit penalty of playing out of
+    position) is maximal. The candidates are each needed position's best
+    players, fetched in one top-k-per-group query; the assignment itself is
+    solved exactly by the Hungarian algorithm. Keeping only the top eleven
+    of each position loses nothing: a better unused player of the same
+    position could always replace a lower one.
+
+    Attributes
+    ----------
+    players : players
+        Business object the candidates are searched through.
+    fits : dict
+        Slot -> {position: penalty}, see the module's `fits`.
+
+    Methods
+    -------
+    build(spec, formation, exclude):
+        Returns the best squad.
+    """
+
+    def __init__(self, players, fits=fits):
+        """
+        Initialize the builder.
+
+        Parameters
+        ----------
+        players : players
+            Business object to search through.
+        fits : dict
+            Slot -> {position: penalty}.
+        """
+        self.players = players
+        self.fits = fits
+
+    def build(self, spec=None, formation="4-3-3", exclude=()):
+        """
+        Return the squad with the highest total effective overall.
+
+        Parameters
+        ----------
+        spec : filterspec or None
+            Constraints every player must meet (nation, club, overall range,
+            name...); None allows everyone.
+        formation : str or list of str
+            A key of `formations`, or the slots themselves.
+        exclude : iterable of int
+            Player ids that must not be picked.
+
+        Returns
+        -------
+        list of tuples
+            (slot, player tuple or None, effective overall) per slot, in formation
+            order; a slot no candidate fits stays empty. None if the search failed.
+        """
+        slots = formations[formation] if isinstance(formation, str) else list(formation)
+        unknown = [slot for slot in slots if slot not in self.fits]
+        if unknown:
+            raise ValueError(f"unknown slots: {unknown}")
+        exclude = set(exclude)
+        spec = (spec or filterspec()).copy()
+        needed = {post for slot in slots for post in self.fits[slot]}
+        needed &= set(spec.predicates.get(("position", "in"), needed))  # Keep the caller's own position list
+        spec.isin("position", sorted(needed))
+        best = self.players.topPerGroup(spec, "position", len(slots) + len(exclude))
+        if best is None:
+            return None
+        candidates = [row for rows in best.values() for row in rows if row[0] not in exclude]
+        candidates += [None] * max(0, len(slots) - len(candidates))  # Empty places keep the problem rectangular
+        missing = 1000  # Cost of an empty slot, worse than any real player
+        cost = [[missing if row is None or row[5] not in self.fits[slot] else self.fits[slot][row[5]] - row[6]
+                 for row in candidates] for slot in slots]
+        squad = []
+        for slot, column in zip(slots, assign(cost)):
+            row = candidates[column]
+            if row is None or row[5] not in self.fits[slot]:
+                squad.append((slot, None, 0))
+            else:
+                squad.append((slot, row, row[6] - self.fits[slot][row[5]]))
+        return squad
@@ -0,0 +1,249 @@
+import threading  # Import threading for the cancellation events
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal  # Import Qt's worker pool classes
+
+class tasksignals(QObject):
+    """
+    Signals a background task uses to post its outcome back to the GUI thread.
+
+    Attributes
+    ----------
+    finished : pyqtSignal(int, object)
+        Emitted with the task's ticket and its result.
+    failed : pyqtSignal(int, str)
+        Emitted with the task's ticket and the error message.
+    """
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+class task(QRunnable):
+    """
+    A QRunnable that calls a function on a pool thread and reports the result by signal.
+
+    Attributes
+    ----------
+    ticket : int
+        Number identifying this submission; the receiver compares it to drop stale results.
+    function : callable
+        Called as function(cancel) on the worker thread.
+    cancel : threading.Event
+        Set to abandon the task; the submitter discards a cancelled task's result.
+    signals : tasksignals
+        Signals connected by the submitter.
+    """
+
+    def __init__(self, ticket, function):
+        """
+        Initialize the task.
+
+        Parameters
+        ----------
+        ticket : int
+            Submission number.
+        function : callable
+            Work to run; receives the cancel event as its only argument.
+        """
+        super(task, self).__init__()
+        self.ticket = ticket
+        self.function = function
+        self.cancel = threading.Event()
+        self.signals = tasksignals()
+
+    def run(self):
+        """
+        Run the function and emit finished or failed.
+
+        A signal is emitted even for cancelled tasks so the submitter can release
+        them; the submitter drops their results.
+        """
+        try:
+            result = None if self.cancel.is_set() else self.function(self.cancel)  # Skip work cancelled while queued
+        except Exception as err:
+            self.signals.failed.emit(self.ticket, str(err))
+            return
+        self.signals.finished.emit(self.ticket, result)
+
+class taskrunner:
+    """
+    Dispatches searches and writes to background threads.
+
+    Searches run on a pool sized to the number of pooled read connections; a new
+    search cancels the one still in flight, and only the newest ticket's result
+    is delivered. Writes run one at a time, in submission order, on their own
+    single-thread pool so they never reorder.
+
+    Attributes
+    ----------
+    readPool : QThreadPool
+        Pool for searches.
+    writePool : QThreadPool
+        Single-thread pool for updates and deletes.
+    ticket : int
+        Number of the latest submission.
+
+    Methods
+    -------
+    search(function, onResult, onError):
+        Runs a search, cancelling the previous one.
+    page(function, onResult, onError):
+        Loads more rows of the current result; cancelled by the next search.
+    write(function, onResult, onError):
+        Queues a write.
+    cancelSearch():
+        Cancels the search in flight, if any.
+    shutdown():
+        Cancels pending work and waits for the pools to drain.
+    """
+
+    def __init__(self, readers=4):
+        """
+        Initialize the runner.
+
+        Parameters
+        ----------
+        readers : int
+            Maximum number of concurrent searches.
+        """
+        self.readPool = QThreadPool()
+        self.readPool.setMaxThreadCount(readers)
+        self.writePool = QThreadPool()
+        self.writePool.setMaxThreadCount(1)  # A single writer keeps writes in order
+        self.ticket = 0
+        self._search = None  # The search task currently in flight
+        self._pages = set()  # Page loads in flight, cancelled along with the search
+        self._tasks = set()  # Keep Python wrappers alive until their signals have fired
+
+    def _submit(self, pool, function, onResult, onError, current):
+        """
+        Wrap a function in a task, connect its signals and start it.
+
+        Parameters
+        ----------
+        pool : QThreadPool
+            Pool to run on.
+        function : callable
+            Work receiving the cancel event.
+        onResult : callable
+            Called on the GUI thread with the result.
+        onError : callable or None
+            Called on the GUI thread with the error message.
+        current : callable or None
+            Returns False when the result has become stale and must be dropped.
+
+        Returns
+        -------
+        task
+            The started task.
+        """
+        self.ticket += 1
+        work = task(self.ticket, function)
+        self._tasks.add(work)
+
+        def live(ticket):
+            return not work.cancel.is_set() and (current is None or current(ticket))
+
+        def finished(ticket, result):
+            self._tasks.discard(work)
+            self._pages.discard(work)
+            if live(ticket):
+                onResult(result)
+
+        def failed(ticket, message):
+            self._tasks.discard(work)
+            self._pages.discard(work)
+            if onError is not None and live(ticket):
+                onError(message)
+
+        work.signals.finished.connect(finished)
+        work.signals.failed.connect(failed)
+        work.setAutoDelete(False)  # Python owns the task through self._tasks
+        pool.start(work)
+        return work
+
+    def search(self, function, onResult, onError=None):
+        """
+        Run a search in the background, cancelling the previous search.
+
+        Parameters
+        ----------
+        function : callable
+            function(cancel) performing the query.
+        onResult : callable
+            Receives the result on the GUI thread, only if no newer search was started.
+        onError : callable or None
+            Receives an error message on the GUI thread.
+
+        Returns
+        -------
+        int
+            Ticket of the new search.
+        """
+        self.cancelSearch()
+        self._search = self._submit(self.readPool, function, onResult, onError,
+                                    lambda ticket: self._search is not None and ticket == self._search.ticket)
+        return self._search.ticket
+
+    def page(self, function, onResult, onError=None):
+        """
+        Load another page of the displayed result in the background.
+
+        Unlike search() it leaves the search in flight alone; the next search
+        or cancelSearch() cancels it, since that search replaces the result
+        the page belongs to.
+
+        Parameters
+        ----------
+        function : callable
+            function(cancel) fetching the page.
+        onResult : callable
+            Receives the page on the GUI thread, unless the load was cancelled.
+        onError : callable or None
+            Receives an error message on the GUI thread.
+
+        Returns
+        -------
+        int
+            Ticket of the page load.
+        """
+        work = self._submit(self.readPool, function, onResult, onError, None)
+        self._pages.add(work)
+        return work.ticket
+
+    def write(self, function, onResult=None, onError=None):
+        """
+        Queue a write in the background.
+
+        Parameters
+        ----------
+        function : callable
+            function(cancel) performing the write; writes are never cancelled.
+        onResult : callable or None
+            Receives the result on the GUI thread.
+        onError : callable or None
+            Receives an error message on the GUI thread.
+
+        Returns
+        -------
+        int
+            Ticket of the write.
+        """
+        return self._submit(self.writePool, function, onResult or (lambda result: None), onError, None).ticket
+
+    def cancelSearch(self):
+        """
+        Cancel the search and the page loads in flight; their results, if any, are discarded.
+        """
+        for work in self._pages:
+            work.cancel.set()
+        self._pages.clear()
+        if self._search is not None:
+            self._search.cancel.set()  # Interrupts the SQLite statement through the progress handler
+            self._search = None
+
+    def shutdown(self):
+        """
+        Cancel the running search and wait for queued work to finish.
+        """
+        self.cancelSearch()
+        self.readPool.waitForDone()
+        self.writePool.waitForDone()
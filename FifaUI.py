@@ -1,12 +1,17 @@
-import PyQt6
+import time  # Import time first so the startup report covers the other imports
+importStarted = time.perf_counter()
+import argparse  # Import argparse for the launch flags
 import sys
-from PyQt6.QtCore import Qt, QUrl
-from PyQt6.QtWidgets import QApplication, QWidget, QComboBox, QLineEdit, QLabel, QSlider, QPushButton, QGridLayout, QTableView
-from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
+from PyQt6.QtCore import Qt, QUrl, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication, QWidget, QComboBox, QLineEdit, QLabel, QSlider, QPushButton, QGridLayout, QTableView, QCheckBox
 from PyQt6.QtGui import QIcon
-from FifaBLL import players  # Import the players business logic class
+from FifaBLL import analytics, players, writequeue  # Import the business logic, its statistics and write-behind queue
+from FifaCache import resultcache  # Import the cache for filters the user toggles between
+from FifaDataAccess import accessdata  # Import the data access layer to choose the on-disk or in-memory mode
 from FifaDataModel import Datamodel  # Import custom table model for QTableView
-import sqlite3
+from FifaFilter import filterspec  # Import the filter spec to map table columns to sort keys
+from FifaTasks import taskrunner  # Import the background runner for database work
+importSeconds = time.perf_counter() - importStarted  # QtMultimedia is deliberately not imported here
 
 class form(QWidget):
     """
@@ -26,17 +31,70 @@ class form(QWidget):
         List of layouts for organizing widgets.
     table : QTableView
         Table view to display player data.
+    labelcount : QLabel
+        Label showing how many players the last search matched.
+    tasks : taskrunner
+        Runs searches and writes off the GUI thread.
+    pageSize : int
+        Rows fetched per page of search results.
+    live : QCheckBox
+        Enables live search while the filters are edited.
+    fuzzy : QCheckBox
+        Makes the name search tolerate typos.
+    debounce : QTimer
+        Coalesces rapid filter edits into one search.
+    resultSpec : filterspec or None
+        Spec of the rows currently in the table, used to narrow them in memory.
+    sortOrder : tuple
+        (column, descending) chosen with the table headers; applied to every search.
+    writes : writequeue or None
+        Groups UPDATE/DELETE clicks into timed group commits when enabled.
+    analytics : analytics
+        Summary statistics of the players.
+    histogram : list of tuples or None
+        (overall, players) counts behind the slider label, reloaded after every write.
+    painted : pyqtSignal()
+        Emitted once, after the form's first paint.
     """
 
-    def __init__(self):
+    painted = pyqtSignal()
+
+    def __init__(self, debounceMs=250, groupCommitMs=0, cacheMb=32, memory=False, snapshotSeconds=60):
         """
         Initialize the main form, create layouts, input widgets, buttons, and table view.
+
+        Parameters
+        ----------
+        debounceMs : int
+            Quiet period after the last filter edit before a live search runs.
+        groupCommitMs : int
+            Write-behind window for updates and deletes; 0 commits each one on its own.
+        cacheMb : int
+            Memory bound of the search result cache; 0 disables it.
+        memory : bool
+            Work on an in-memory copy of the database, saved back by snapshots.
+        snapshotSeconds : float
+            Interval of the snapshots in memory mode; 0 saves only on exit.
         """
         QWidget.__init__(self)  # Initialize base QWidget
         self.resize(500, 500)  # Set default window size
 
         # Initialize player data manager
-        self.players = players()
+        dataAccess = accessdata(memory=memory, snapshotSeconds=snapshotSeconds)
+        self.players = players(dataAccess=dataAccess,
+                               cache=resultcache(maxBytes=cacheMb * 1024 * 1024) if cacheMb > 0 else None)
+        self.tasks = taskrunner(self.players.dataAccess.readers)  # Database work never blocks the event loop
+        self.writes = writequeue(self.players, groupCommitMs / 1000) if groupCommitMs > 0 else None
+        self.analytics = analytics(self.players.dataAccess)
+        self.histogram = None  # Loaded in the background below
+        self.pageSize = 200
+        self.resultSpec = None  # Nothing searched yet
+        self.sortOrder = (filterspec.columns.index("overall"), True)  # Best players first
+        self.debounce = QTimer(self)  # Restarted on every edit, fires once the edits stop
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(debounceMs)
+        self.debounce.timeout.connect(self.liveSearch)
+        self.firstPaint = True  # painted has not been emitted yet
         self.flag = True  # Flag for CREATE button to insert data only once
         self.overall = 30  # Default minimum overall value
         self.labeloverall = QLabel(self)  # Label to display slider value
@@ -62,7 +120,7 @@ class form(QWidget):
         self.playername = QLineEdit()
         self.playername.setStyleSheet(
             'QLineEdit {border: 1px solid purple; border-radius:2; background-color: #F4E3FF; padding:4}')
-        self.playername.setPlaceholderText("Please Enter Player's First Name")
+        self.playername.setPlaceholderText("Please Enter Player's Name")
         self.layoutList[0].addWidget(self.playername, 0, 1, 1, 1)
 
         # Overall slider
@@ -109,6 +167,14 @@ class form(QWidget):
                 'QPushButton {background-color: purple; color: white; border-radius:6; padding:4; font-weight:bold}'
             )
             self.layoutList[1].addWidget(button, 0, i, 1, 1)
+        self.live = QCheckBox("LIVE")  # Search as the filters change
+        self.layoutList[1].addWidget(self.live, 0, len(buttons), 1, 1)
+        self.fuzzy = QCheckBox("FUZZY")  # Typo-tolerant name search
+        self.layoutList[1].addWidget(self.fuzzy, 0, len(buttons) + 1, 1, 1)
+        self.fuzzy.toggled.connect(self.schedule)
+        self.playername.textChanged.connect(self.schedule)
+        self.playerpost.textChanged.connect(self.schedule)
+        self.playerNation.currentTextChanged.connect(self.schedule)
 
         # --- Layout 3: Table View ---
         self.table = QTableView()
@@ -116,31 +182,125 @@ class form(QWidget):
             'QTableView {background-color: #F4E3FF; border:2px solid purple; border-radius:6}'
         )
         self.table.resize(500, 300)
+        self.table.horizontalHeader().setSortIndicator(self.sortOrder[0], Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)  # Header clicks call Datamodel.sort
         self.layoutList[2].addWidget(self.table)
+        self.labelcount = QLabel()  # Size of the full search result
+        self.layoutList[2].addWidget(self.labelcount)
+        self.refreshHistogram()
+
+    def paintEvent(self, event):
+        """Paint the form and announce the first frame once."""
+        QWidget.paintEvent(self, event)
+        if self.firstPaint:
+            self.firstPaint = False
+            QTimer.singleShot(0, self.painted.emit)  # Let the frame reach the screen first
 
     # --- Button Functions ---
     def Create(self):
         """Insert initial player data into the database if not done yet."""
         if self.flag:
-            self.players.createData()
+            self.resultSpec = None
+            self.tasks.write(lambda cancel: self.players.createData())
+            self.refreshHistogram()
             self.flag = False
 
+    def currentSpec(self):
+        """Build the filter spec for the current contents of the input widgets."""
+        spec = self.players.filterFor(self.playername.text(), self.overall, self.playerpost.text(),
+                                      self.playerNation.currentText(), self.fuzzy.isChecked())
+        column, descending = self.sortOrder
+        return spec.sortBy(filterspec.columns[column], descending)
+
     def select(self):
-        """Search players based on filters and display in the table."""
-        overall = self.overall
-        post = self.playerpost.text()
-        nation = self.playerNation.currentText()
-        playername = self.playername.text()
-        rows = self.players.searchData(playername, overall, post, nation)
-        if len(rows):
-            self.datamodel = Datamodel(rows)
-            self.table.setModel(self.datamodel)
+        """Search players based on filters in the background; a newer search cancels this one."""
+        spec = self.currentSpec()
+
+        def run(cancel):
+            total = self.players.countData(spec, cancel)  # Cheap count from the indexes, rows are paged in lazily
+            if total is None:
+                raise RuntimeError("the count failed")
+            rows = self.players.searchPage(spec, None, self.pageSize, cancel) if total else []
+            if rows is None:
+                raise RuntimeError("the search failed")
+            return total, rows
+
+        self.tasks.search(run, lambda result: self.showResults(spec, *result), self.searchFailed)
+
+    def searchFailed(self, message):
+        """Clear the table and show the error of a failed search instead of leaving the previous result up."""
+        self.datamodel = Datamodel([])
+        self.table.setModel(self.datamodel)
+        self.resultSpec = None
+        self.labelcount.setText(f"Search failed: {message}")
+
+    def showResults(self, spec, total, rows):
+        """Display the first page of a finished search; later pages load as the table scrolls."""
+        self.labelcount.setText(f"Players: {total}")
+        more = len(rows) == self.pageSize  # A short first page is the whole result
+        fetchPage = (lambda after, limit, cancel=None: self.players.searchPage(spec, after, limit, cancel)) if more else None
+        ordering = None if spec.ranked() else self.sortOrder  # Ranked rows come in relevance order
+        self.datamodel = Datamodel(rows, fetchPage=fetchPage, pageSize=self.pageSize, total=total,
+                                   sortPage=self.sorter(spec), ordering=ordering, spec=spec, tasks=self.tasks)
+        self.table.setModel(self.datamodel)
+        self.resultSpec = spec
+
+    def sorter(self, spec):
+        """Return the Datamodel sort hook for the rows of `spec`."""
+
+        def sortPage(column, descending):
+            ordered = spec.copy().sortBy(filterspec.columns[column], descending)
+            self.sortOrder = (column, descending)  # Later searches keep the chosen order
+            self.resultSpec = ordered  # The resident rows end up in this order
+            return ordered, lambda after, limit, cancel=None: self.players.searchPage(ordered, after, limit, cancel)
+
+        return sortPage
+
+    def schedule(self):
+        """Restart the debounce window after a filter edit when live search is on."""
+        if self.live.isChecked():
+            self.debounce.start()
+
+    def liveSearch(self):
+        """Run the debounced search, narrowing the rows in memory when the filter only got tighter."""
+        spec = self.currentSpec()
+        model = getattr(self, "datamodel", None)
+        if self.resultSpec is not None and model is not None and model.exhausted and spec.narrows(self.resultSpec):
+            self.tasks.cancelSearch()  # The in-memory answer supersedes any search in flight
+            rows = [row for row in model.rows if spec.matches(row)]
+            self.showResults(spec, len(rows), rows)
+        else:
+            self.select()
 
     def values(self):
         """Update the slider label and current overall filter value."""
-        self.labeloverall.setText("Value: " + str(self.sender().value()))
-        self.labeloverall.adjustSize()
         self.overall = self.sender().value()
+        self.showOverall()
+        self.schedule()
+
+    def showOverall(self):
+        """Show the slider value and how many players it keeps, summed from the histogram without a query."""
+        text = "Value: " + str(self.overall)
+        if self.histogram is not None:
+            atLeast = sum(players for overall, players in self.histogram if overall >= self.overall)
+            text += f" ({atLeast} players \u2265 {self.overall})"
+        self.labeloverall.setText(text)
+        self.labeloverall.adjustSize()
+
+    def refreshHistogram(self, pending=None):
+        """Reload the slider's histogram in the background once the queued writes (and `pending`) are done."""
+
+        def run(cancel):
+            if pending is not None:
+                pending.result()  # A write-behind change is only visible once its group has committed
+            return self.analytics.histogram()
+
+        def show(histogram):
+            if histogram is not None:
+                self.histogram = histogram
+                self.showOverall()
+
+        self.tasks.write(run, show)  # The write pool runs it after every write submitted before
 
     def updateForm(self):
         """Update a player's data in the database based on input fields."""
@@ -149,7 +309,34 @@ class form(QWidget):
         nation = self.playerNation.currentText()
         playername = self.playername.text()
         if playername != "" and nation != "Any" and overall and post != "":
-            self.players.updateData(playername, overall, post, nation)
+            self.resultSpec = None  # The resident rows may be stale after the write
+            if self.writes is not None:
+                self.refreshHistogram(self.writes.update((playername, overall, post, nation)))  # Committed with the next group
+            else:
+                self.writeAndPatch("updated", lambda: self.players.updateRows(playername, overall, post, nation))
+
+    def writeAndPatch(self, kind, write):
+        """Run a write reporting its rows in the background, then patch the table with those rows."""
+        model = getattr(self, "datamodel", None)
+        spec = model.spec if model is not None else None
+
+        def run(cancel):
+            rows = write()
+            total = self.players.countData(spec) if rows is not None and spec is not None else None  # Exact, from the indexes
+            return rows, total
+
+        def patch(result):
+            rows, total = result
+            if model is None or model is not self.datamodel or rows is None:
+                return  # A newer search replaced the table meanwhile, or the write failed
+            model.applyChanges(**{kind: rows})  # Only the changed rows are touched; scroll and selection stay
+            if total is not None:
+                model.total = total
+            self.labelcount.setText(f"Players: {model.total}")
+            self.resultSpec = model.spec  # The resident rows are current again
+
+        self.tasks.write(run, patch)
+        self.refreshHistogram()
 
     def deleteForm(self):
         """Delete a player's data from the database based on input fields."""
@@ -158,29 +345,114 @@ class form(QWidget):
         nation = self.playerNation.currentText()
         playername = self.playername.text()
         if playername != "" and nation != "Any" and overall and post != "":
-            self.players.deletesData(playername, overall, post, nation)
+            self.resultSpec = None
+            if self.writes is not None:
+                self.refreshHistogram(self.writes.delete((playername, overall, post, nation)))
+            else:
+                self.writeAndPatch("deleted", lambda: self.players.deleteRows(playername, overall, post, nation))
 
     def closeForm(self):
         """Delete all data from the database and close the form."""
+        if self.writes is not None:
+            self.writes.close()  # Commit the pending group first
+        self.tasks.shutdown()  # Let queued writes finish before clearing the table
         self.players.deleteData()
+        self.players.close()  # Release the pooled database connections
         self.close()
 
 
+# --- Background Music ---
+def playMusic(filename="music.mp3", volume=50):
+    """
+    Start the background music.
+
+    QtMultimedia is imported here rather than at module level: loading the
+    multimedia backend and decoding the file are the slowest part of start-up,
+    so main() calls this only after the first frame is on screen.
+
+    Parameters
+    ----------
+    filename : str
+        Audio file to loop over.
+    volume : int
+        Output volume.
+
+    Returns
+    -------
+    QMediaPlayer or None
+        The playing player (keep a reference to it), or None if audio is unavailable.
+    """
+    try:
+        from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
+    except ImportError as err:
+        print(err)  # No multimedia backend, the application works without music
+        return None
+    player = QMediaPlayer()
+    output = QAudioOutput(player)  # Parented to the player so both live as long as it
+    player.setAudioOutput(output)
+    player.setSource(QUrl.fromLocalFile(filename))  # Load audio file
+    output.setVolume(volume)
+    player.play()  # Play music
+    return player
+
 # --- Main Application ---
-app = QApplication(sys.argv)
-app.setApplicationName("Football Bartar")  # Set application name
-app.setWindowIcon(QIcon('icon.webp'))  # Set window icon
+def main(argv=None):
+    """
+    Launch the application.
 
-# --- Background Music ---
-filename = "music.mp3"
-player = QMediaPlayer()
-audio_output = QAudioOutput()
-player.setAudioOutput(audio_output)
-player.setSource(QUrl.fromLocalFile(filename))  # Load audio file
-audio_output.setVolume(50)
-player.play()  # Play music
-
-# --- Launch Form ---
-form = form()
-form.show()  # Show the GUI window
-sys.exit(app.exec())  # Start the Qt event loop
+    Parameters
+    ----------
+    argv : list of str or None
+        Command line; sys.argv when None. --no-music skips the background
+        music and --timings prints the start-up timings once the first frame is shown.
+
+    Returns
+    -------
+    int
+        Exit code of the Qt event loop.
+    """
+    argv = sys.argv if argv is None else argv
+    parser = argparse.ArgumentParser(description="Football Bartar player manager.")
+    parser.add_argument("--no-music", dest="music", action="store_false", help="do not play the background music")
+    parser.add_argument("--timings", action="store_true", help="print import, app-init and first-frame timings")
+    parser.add_argument("--group-commit-ms", type=int, default=0,
+                        help="group updates and deletes issued within this window into one commit")
+    parser.add_argument("--cache-mb", type=int, default=32, help="memory for cached search results; 0 disables the cache")
+    parser.add_argument("--memory", action="store_true", help="work on an in-memory copy of FIFA24.db")
+    parser.add_argument("--snapshot-seconds", type=float, default=60,
+                        help="how often --memory saves the copy back to FIFA24.db; 0 saves only on exit")
+    arguments, qtArguments = parser.parse_known_args(argv[1:])  # Leave Qt's own options (-style, ...) to Qt
+    timings = {"import": importSeconds}
+    started = time.perf_counter()
+    app = QApplication(argv[:1] + qtArguments)
+    app.setApplicationName("Football Bartar")  # Set application name
+    app.setWindowIcon(QIcon('icon.webp'))  # Set window icon
+    timings["app init"] = time.perf_counter() - started
+
+    # --- Launch Form ---
+    started = time.perf_counter()
+    window = form(groupCommitMs=arguments.group_commit_ms, cacheMb=arguments.cache_mb, memory=arguments.memory,
+                  snapshotSeconds=arguments.snapshot_seconds)
+    timings["form init"] = time.perf_counter() - started
+    music = []  # Holds the media player while the event loop runs
+
+    def firstFrame():
+        timings["first frame"] = time.perf_counter() - started
+        if arguments.music:
+            music.append(playMusic())
+        if arguments.timings:
+            timings["total"] = time.perf_counter() - importStarted
+            print(", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()))
+
+    window.painted.connect(firstFrame)
+    started = time.perf_counter()  # First frame is measured from show()
+    window.show()  # Show the GUI window
+    code = app.exec()  # Start the Qt event loop
+    if window.writes is not None:
+        window.writes.close()  # Commit the pending group
+    window.tasks.shutdown()
+    window.players.close()  # Saves the last snapshot in memory mode; harmless after closeForm
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+"""
+Benchmarks for Elite Player Suite.
+
+Run a benchmark as a module from the repository root, e.g.
+`python -m benchmarks.columnar --rows 10000 1000000`.
+
+`python -m benchmarks.suite --rows 10000 1000000 --out results.json` times the
+data access, business and model layers and writes p50/p95/p99 latencies and
+throughput as JSON; `--compare baseline.json` flags regressions against an
+earlier report. `python -m benchmarks.model` reports the table model's memory
+per row and data() calls per second; `python -m benchmarks.squad` times
+top-k per group and the squad builder; `python -m benchmarks.service`
+load-tests the HTTP service; `python -m benchmarks.memory` compares the
+on-disk and in-memory modes; `python -m benchmarks.pack` compares CSV and
+pack file loading.
+"""
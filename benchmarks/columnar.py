@@ -0,0 +1,78 @@
+import argparse  # Import argparse for the command line
+import os  # Import os for the scratch directory
+import statistics  # Import statistics for the median
+import tempfile  # Import tempfile for the benchmark databases
+import time  # Import time for the timers
+
+from FifaBLL import players  # Import the business layer under test
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaFilter import filterspec  # Import the filter spec to build the query shapes
+from benchmarks.synthetic import makeDatabase  # Import the synthetic data generator
+
+def shapes(club):
+    """
+    Return the (label, spec) query shapes the benchmark times.
+
+    Parameters
+    ----------
+    club : str
+        A club that exists in the generated table.
+    """
+    return [
+        ("overall>=85", filterspec().overallRange(low=85)),
+        ("nation", filterspec().overallRange(low=30).nation("Iran")),
+        ("nation+position", filterspec().overallRange(low=60).nation("Spain").position("ST")),
+        ("club+range", filterspec().overallRange(60, 80).club(club)),
+        ("nation IN", filterspec().overallRange(low=70).isin("nation", ["Italy", "France", "Brazil"])),
+        ("position+range", filterspec().overallRange(70, 72).isin("position", ["LW", "RW"])),
+    ]
+
+def timeit(function, repeat):
+    """
+    Call a function `repeat` times and return the median wall time in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def run(rows, repeat, directory):
+    """
+    Benchmark the SQL and columnar engines on one synthetic table size.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    repeat : int
+        Timed repetitions per measurement.
+    directory : str
+        Where to create the database.
+    """
+    path = makeDatabase(os.path.join(directory, f"players-{rows}.db"), rows)
+    dataAccess = accessdata(path)
+    sql = players(dataAccess=dataAccess)
+    columnar = players(dataAccess=dataAccess, engine="columnar")
+    start = time.perf_counter()
+    columnar.index.load()
+    print(f"\n{rows} rows: columnar load {time.perf_counter() - start:.2f} s")
+    print(f"{'shape':18} {'engine':9} {'count ms':>10} {'top-200 ms':>11}")
+    club = dataAccess.searchData("SELECT team FROM tblPlayers WHERE id=1")[0][0]
+    for label, spec in shapes(club):
+        for name, engine in (("sql", sql), ("columnar", columnar)):
+            count = timeit(lambda: engine.countData(spec), repeat)
+            page = timeit(lambda: engine.searchPage(spec, None, 200), repeat)
+            print(f"{label:18} {name:9} {count:10.3f} {page:11.3f}")
+    dataAccess.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the SQL and columnar search engines.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000, 10000000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        for size in arguments.rows:
+            run(size, arguments.repeat, directory)
@@ -0,0 +1,64 @@
+import argparse  # Import argparse for the command line
+import os  # Import os for the scratch directory
+import shutil  # Import shutil to give each mode its own copy of the database
+import tempfile  # Import tempfile for the benchmark databases
+import time  # Import time for the load and snapshot timers
+
+from FifaBLL import players  # Import the business layer under test
+from FifaDataAccess import accessdata  # Import the data access layer in both modes
+from benchmarks.suite import benchSearch, benchWrites, valuesFor  # Reuse the suite's search and write measurements
+from benchmarks.synthetic import makeDatabase  # Import the synthetic data generator
+
+def run(rows, repeat, directory, seed=24):
+    """
+    Compare the on-disk and in-memory modes of accessdata on one synthetic table size.
+
+    Both modes run the suite's search and write measurements on their own
+    copy of the same database; the memory mode also reports its start-up
+    load and the snapshot written after the writes.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    repeat : int
+        Timed calls per measurement.
+    directory : str
+        Where to create the databases.
+    seed : int
+        Generator seed.
+    """
+    start = time.perf_counter()
+    path = makeDatabase(os.path.join(directory, f"players-{rows}.db"), rows, seed)
+    players(dataAccess=accessdata(path)).close()  # Migrate once, outside the timings
+    print(f"\n{rows} rows generated in {time.perf_counter() - start:.1f} s, "
+          f"{os.path.getsize(path) / 1024 / 1024:.0f} MB")
+    results = {}
+    for mode in ("disk", "memory"):
+        copy = shutil.copy(path, os.path.join(directory, f"{mode}-{rows}.db"))
+        start = time.perf_counter()
+        dataAccess = accessdata(copy, memory=mode == "memory")
+        loaded = time.perf_counter() - start
+        business = players(dataAccess=dataAccess)
+        values = valuesFor(dataAccess)
+        results[mode] = benchSearch(business, rows, repeat, values) + benchWrites(business, dataAccess, rows, repeat,
+                                                                                  seed)
+        if mode == "memory":
+            start = time.perf_counter()
+            dataAccess.snapshot()
+            print(f"memory mode: load {loaded * 1000:.0f} ms, snapshot {(time.perf_counter() - start) * 1000:.0f} ms")
+        business.close()
+    print(f"{'operation':12} {'shape':34} {'disk p50 ms':>12} {'memory p50 ms':>14} {'ratio':>6}")
+    for disk, memory in zip(results["disk"], results["memory"]):
+        print(f"{disk['operation']:12} {disk['shape']:34} {disk['p50_ms']:12.3f} {memory['p50_ms']:14.3f} "
+              f"{disk['p50_ms'] / memory['p50_ms']:6.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare accessdata's on-disk and in-memory modes.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        for size in arguments.rows:
+            run(size, arguments.repeat, directory)
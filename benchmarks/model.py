@@ -0,0 +1,73 @@
+import argparse  # Import argparse for the command line
+import gc  # Import gc to settle memory before measuring
+import os  # Import os for the scratch directory and the offscreen Qt platform
+import tempfile  # Import tempfile for the benchmark database
+import time  # Import time for the timers
+import tracemalloc  # Import tracemalloc to measure the model's memory
+
+from FifaBLL import players  # Import the business layer to fetch the rows
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaFilter import filterspec  # Import the filter spec for the unfiltered search
+from benchmarks.synthetic import makeDatabase  # Import the synthetic data generator
+
+def run(rows, seconds, directory):
+    """
+    Measure the memory per row and the data() throughput of Datamodel.
+
+    Memory is what tracemalloc sees allocated while the model is built from
+    freshly fetched rows (the rows themselves included), divided by the
+    number of rows. Throughput times data() alone on every cell of a 40-row
+    viewport, display and alignment roles, at successive scroll offsets.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    seconds : float
+        How long to paint for.
+    directory : str
+        Where to create the database.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    from FifaDataModel import Datamodel
+
+    application = QApplication.instance() or QApplication([])
+    path = makeDatabase(os.path.join(directory, f"players-{rows}.db"), rows)
+    business = players(dataAccess=accessdata(path))
+    spec = filterspec()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = Datamodel(business.search(spec), total=rows, spec=spec)
+    built = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    roles = (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.TextAlignmentRole)
+    columns = model.columnCount()
+    data = model.data
+    calls, first, elapsed, deadline = 0, 0, 0.0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        cells = [(model.index(row, column), role) for row in range(first, first + 40)
+                 for column in range(columns) for role in roles]  # Created outside the timing, as the view does
+        start = time.perf_counter()
+        for index, role in cells:
+            data(index, role)
+        elapsed += time.perf_counter() - start
+        calls += len(cells)
+        first = (first + 997) % (rows - 40)
+    print(f"{rows:>9} rows: {size / rows:7.1f} bytes/row, built in {built:.2f} s, "
+          f"{calls / elapsed:,.0f} data() calls/s")
+    business.close()
+    del application
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure Datamodel memory per row and data() throughput.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        for size in arguments.rows:
+            run(size, arguments.seconds, directory)
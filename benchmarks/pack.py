@@ -0,0 +1,137 @@
+import argparse  # Import argparse for the command line
+import csv  # Import csv to write the CSV baseline
+import os  # Import os for file paths and sizes
+import sys  # Import sys for the exit status
+import sqlite3  # Import sqlite3 to create the import targets
+import tempfile  # Import tempfile for the scratch files
+import time  # Import time for the timers
+
+from FifaColumnar import columnindex  # Import the in-memory filter engine fed from both formats
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaFilter import filterspec  # Import filter specs for the equality checks
+from FifaImport import importFile, readRows  # Import the CSV and pack readers
+from FifaMigrations import migrate  # Import the migrations to prepare the import targets
+from FifaPack import exportPack, playerpack  # Import the pack format under test
+from benchmarks.synthetic import makeDatabase, schema  # Import the synthetic data generator and table schema
+
+def timed(function, *args):
+    """
+    Call a function once and return (result, seconds).
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def exportCsv(dataAccess, path):
+    """
+    Write every player to a CSV file with a header row, ordered by id.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow(filterspec.columns)
+        for rows in dataAccess.streamData(f"SELECT {', '.join(filterspec.columns)} FROM tblPlayers ORDER BY id"):
+            writer.writerows(rows)
+
+def csvIndex(path):
+    """
+    Fill a columnindex from a CSV file, one parsed row at a time.
+    """
+    index = columnindex()
+    chunk = index._arrays(list(readRows(path, "csv")))
+    index.arrays.update(chunk)
+    index.alive = chunk["id"] >= 0
+    return index
+
+def packIndex(path):
+    """
+    Fill a columnindex from a pack file; the pack stays mapped under the index.
+    """
+    index = columnindex()
+    index.loadPack(playerpack(path))
+    return index
+
+def importInto(directory, name, source):
+    """
+    Import a file into a new migrated database and return the import time and the resulting table.
+    """
+    path = os.path.join(directory, name)
+    with sqlite3.connect(path) as connection:
+        connection.executescript(schema)
+    dataAccess = accessdata(path)
+    with dataAccess.transaction() as connection:
+        migrate(connection)
+    stats = importFile(source, dataAccess, report=None)
+    rows = dataAccess.searchData("SELECT * FROM tblPlayers ORDER BY id")
+    dataAccess.close()
+    return stats["seconds"], rows
+
+def run(rows, directory, seed=24):
+    """
+    Compare loading one synthetic table from CSV and from a pack file, and check both round-trip exactly.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    directory : str
+        Where to create the scratch files.
+    seed : int
+        Generator seed.
+
+    Returns
+    -------
+    list of str
+        What did not round-trip; empty when everything matched.
+    """
+    from FifaDataModel import columnstore  # Imported here: FifaDataModel loads Qt
+
+    path = makeDatabase(os.path.join(directory, f"players-{rows}.db"), rows, seed)
+    dataAccess = accessdata(path)
+    original = dataAccess.searchData("SELECT * FROM tblPlayers ORDER BY id")
+    csvPath, packPath = os.path.join(directory, f"players-{rows}.csv"), os.path.join(directory, f"players-{rows}.fpack")
+    _, csvExport = timed(exportCsv, dataAccess, csvPath)
+    _, packExport = timed(exportPack, dataAccess, packPath)
+    print(f"\n{rows} rows: csv {os.path.getsize(csvPath) / 1024 / 1024:.1f} MB written in {csvExport:.2f} s, "
+          f"pack {os.path.getsize(packPath) / 1024 / 1024:.1f} MB written in {packExport:.2f} s")
+
+    csvStore, csvStoreTime = timed(lambda: columnstore(readRows(csvPath, "csv")))
+    packStore, packStoreTime = timed(lambda: columnstore.fromPack(playerpack(packPath)))
+    csvColumns, csvIndexTime = timed(csvIndex, csvPath)
+    packColumns, packIndexTime = timed(packIndex, packPath)
+    sqlColumns, sqlIndexTime = timed(lambda: (lambda index: (index.load(), index)[1])(columnindex(dataAccess)))
+    csvImport, csvRows = importInto(directory, f"csv-{rows}.db", csvPath)
+    packImport, packRows = importInto(directory, f"pack-{rows}.db", packPath)
+    print(f"{'load':34} {'csv ms':>10} {'pack ms':>10} {'speed-up':>9}")
+    for name, slow, fast in (("columnstore (Datamodel rows)", csvStoreTime, packStoreTime),
+                             ("columnindex (in-memory filters)", csvIndexTime, packIndexTime),
+                             ("import into SQLite", csvImport, packImport)):
+        print(f"{name:34} {slow * 1000:10.0f} {fast * 1000:10.0f} {slow / fast:8.1f}x")
+    print(f"{'columnindex from SQLite':34} {sqlIndexTime * 1000:10.0f}")
+
+    problems = []
+    if list(playerpack(packPath)) != original:
+        problems.append("pack rows")
+    if packStore != original or csvStore != original:
+        problems.append("columnstore")
+    if csvRows != original or packRows != original:
+        problems.append("import")
+    specs = [filterspec(), filterspec().nation("Brazil").overallRange(70),
+             filterspec().isin("position", ["ST", "GK"]).sortBy("lastName"), filterspec().sortBy("team", True)]
+    for spec in specs:
+        expected = sqlColumns.search(spec)
+        if packColumns.search(spec) != expected or csvColumns.search(spec) != expected:
+            problems.append(f"columnindex {spec.key()}")
+    print("round trip: " + ("ok" if not problems else "MISMATCH in " + ", ".join(problems)))
+    dataAccess.close()
+    return problems
+
+if __name__ == "__main__":
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    parser = argparse.ArgumentParser(description="Compare loading the player table from CSV and from a pack file.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--dir", default=None, help="directory for the scratch files")
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        failed = [size for size in arguments.rows if run(size, directory)]
+    if failed:
+        sys.exit(f"round trip failed for {', '.join(map(str, failed))} rows")
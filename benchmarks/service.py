@@ -0,0 +1,155 @@
+import argparse  # Import argparse for the command line
+import asyncio  # Import asyncio to drive many client connections
+import json  # Import json for the request bodies and the server stats
+import os  # Import os to find the service script
+import random  # Import random for the seeded request mix
+import subprocess  # Import subprocess to run the service in its own process
+import sys  # Import sys for the interpreter path
+import tempfile  # Import tempfile for the benchmark database
+import time  # Import time for the timers
+from urllib.parse import urlencode, urlsplit  # Import helpers to build and split URLs
+
+from benchmarks.suite import summarize  # Reuse the percentile summary
+from benchmarks.synthetic import makeDatabase, nations, positions  # Import the generator and its value sets
+
+async def request(reader, writer, method, path, body=None):
+    """
+    Send one HTTP/1.1 request on a kept-alive connection and read the whole response.
+
+    Returns
+    -------
+    tuple
+        (status, body bytes).
+    """
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in head[1:])}
+    if headers.get("transfer-encoding") == "chunked":
+        content = bytearray()
+        while True:
+            size = int(await reader.readline(), 16)
+            chunk = await reader.readexactly(size + 2)  # Each chunk ends with CRLF
+            if not size:
+                break
+            content += chunk[:-2]
+    else:
+        content = await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(head[0].split(" ")[1]), bytes(content)
+
+def workload(rows, writeRatio, seed):
+    """
+    Return a function drawing the next (kind, method, path, body) request.
+
+    Half of the searches repeat a few hot queries, as dashboards polling the
+    same filters would; the rest draw random filters.
+    """
+    rnd = random.Random(seed)
+    hot = [{"nation": nation, "min": 75, "limit": 50} for nation in nations[:4]]
+    hot += [{"position": position, "sort": "lastName", "limit": 50} for position in ("ST", "GK", "CB", "CM")]
+
+    def draw():
+        roll = rnd.random()
+        if roll < writeRatio:
+            identifier = rnd.randint(1, rows)
+            player = {"id": identifier, "firstName": "Load", "lastName": f"Test{identifier}", "nation": rnd.choice(nations),
+                      "team": None, "position": rnd.choice(list(positions)), "overall": rnd.randint(40, 90)}
+            return "upsert", "PUT", "/players", player
+        roll = rnd.random()
+        if roll < 0.4:
+            return "search (hot)", "GET", "/players?" + urlencode(rnd.choice(hot)), None
+        if roll < 0.7:
+            query = {"nation": rnd.choice(nations), "position": rnd.choice(list(positions)),
+                     "min": rnd.randint(50, 85), "limit": 50}
+            return "search", "GET", "/players?" + urlencode(query), None
+        if roll < 0.85:
+            return "count", "GET", "/players/count?" + urlencode({"nation": rnd.choice(nations)}), None
+        return "get", "GET", f"/players/{rnd.randint(1, rows)}", None
+
+    return draw
+
+async def client(host, port, draw, deadline, samples):
+    """
+    Send requests back to back on one connection until the deadline.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind, method, path, body = draw()
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body)
+            samples.setdefault(kind, []).append((time.perf_counter() - start, status))
+    finally:
+        writer.close()
+
+async def load(host, port, rows, connections, seconds, writeRatio, seed):
+    """
+    Run the request mix from many connections and print throughput and latency per request kind.
+    """
+    samples = {}
+    draw = workload(rows, writeRatio, seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, draw, start + seconds, samples) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    total = sum(len(values) for values in samples.values())
+    print(f"{connections} connections, {elapsed:.1f} s: {total / elapsed:,.0f} requests/s")
+    print(f"{'request':14} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind in sorted(samples):
+        summary = summarize(kind, None, rows, [latency for latency, _ in samples[kind]])
+        errors = sum(status != 200 and not (kind == "get" and status == 404) for _, status in samples[kind])
+        print(f"{kind:14} {summary['samples']:7} {errors:7} {summary['p50_ms']:8.2f} {summary['p95_ms']:8.2f} "
+              f"{summary['p99_ms']:8.2f}")
+    reader, writer = await asyncio.open_connection(host, port)
+    start = time.perf_counter()
+    _, body = await request(reader, writer, "GET", "/players/stream?" + urlencode({"min": 60}))
+    elapsed = time.perf_counter() - start
+    streamed = body.count(b"\n")
+    print(f"stream min=60: {streamed:,} rows in {elapsed:.2f} s ({streamed / elapsed:,.0f} rows/s)")
+    _, body = await request(reader, writer, "GET", "/stats")
+    writer.close()
+    stats = json.loads(body)
+    cache = stats["cache"] or {}
+    print(f"server: {stats['coalesced']} coalesced, {stats['rejected']} rejected, "
+          f"cache hit rate {cache.get('hitRate', 0.0):.0%}")
+
+def launch(path, readers):
+    """
+    Start FifaService.py on a free port in a child process.
+
+    Returns
+    -------
+    tuple
+        (process, host, port).
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, "FifaService.py", "--db", path, "--port", "0",
+                                "--readers", str(readers)], cwd=root, stdout=subprocess.PIPE, text=True)
+    url = urlsplit(process.stdout.readline().split()[-1])  # "listening on http://host:port"
+    return process, url.hostname, url.port
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the HTTP service.")
+    parser.add_argument("--url", default=None, help="running service to test, e.g. http://127.0.0.1:8024; "
+                                                    "by default one is started on a synthetic database")
+    parser.add_argument("--rows", type=int, default=200000, help="synthetic table size, or the ids to draw from")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="share of requests that upsert a player")
+    parser.add_argument("--readers", type=int, default=4, help="read threads of the started service")
+    parser.add_argument("--seed", type=int, default=24)
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    arguments = parser.parse_args()
+    if arguments.url:
+        url = urlsplit(arguments.url)
+        asyncio.run(load(url.hostname, url.port, arguments.rows, arguments.connections, arguments.seconds,
+                         arguments.write_ratio, arguments.seed))
+    else:
+        with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+            path = makeDatabase(os.path.join(directory, f"players-{arguments.rows}.db"), arguments.rows)
+            process, host, port = launch(path, arguments.readers)
+            try:
+                asyncio.run(load(host, port, arguments.rows, arguments.connections, arguments.seconds,
+                                 arguments.write_ratio, arguments.seed))
+            finally:
+                process.terminate()
+                process.wait()
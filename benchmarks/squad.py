@@ -0,0 +1,77 @@
+import argparse  # Import argparse for the command line
+import os  # Import os for the scratch directory
+import tempfile  # Import tempfile for the benchmark databases
+import time  # Import time for the generation timer
+
+from FifaBLL import players  # Import the business layer under test
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaFilter import filterspec  # Import the filter spec to build the constraints
+from FifaSquad import formations, squadbuilder  # Import the squad builder under test
+from benchmarks.columnar import timeit  # Reuse the median timer
+from benchmarks.synthetic import makeDatabase  # Import the synthetic data generator
+
+def windowQuery(spec, column, k):
+    """
+    Build the ROW_NUMBER() formulation of a top-k-per-group query, for comparison.
+    """
+    clause, params = spec.where()
+    return (f"SELECT id, firstName, lastName, nation, team, position, overall FROM "
+            f"(SELECT *, ROW_NUMBER() OVER (PARTITION BY {column} ORDER BY overall DESC, id) AS rank "
+            f"FROM tblPlayers{clause}) WHERE rank<=? ORDER BY {column}, rank", params + (k,))
+
+def run(rows, repeat, directory, k=5):
+    """
+    Time top-k per group and the squad builder on one synthetic table size.
+
+    Top-k per group is compared with the two ways to get it without it: one
+    search per group (what the form would do) and a window function.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    repeat : int
+        Timed repetitions per measurement.
+    directory : str
+        Where to create the database.
+    k : int
+        Players per group.
+    """
+    start = time.perf_counter()
+    path = makeDatabase(os.path.join(directory, f"players-{rows}.db"), rows)
+    print(f"\n{rows} rows generated in {time.perf_counter() - start:.1f} s")
+    dataAccess = accessdata(path)
+    business = players(dataAccess=dataAccess)
+    constraints = [("all", filterspec()), ("nation+overall", filterspec().overallRange(low=60).nation("Spain"))]
+    print(f"{'top-' + str(k) + ' per':12} {'filter':15} {'topPerGroup ms':>15} {'window ms':>10} {'per-group ms':>13}")
+    for dimension, column in (("position", "position"), ("nation", "nation"), ("club", "team")):
+        groups = [row[0] for row in dataAccess.searchData(f"SELECT DISTINCT {column} FROM tblPlayers")]
+        for label, spec in constraints:
+            top = timeit(lambda: business.topPerGroup(spec, dimension, k), repeat)
+            window = timeit(lambda: dataAccess.searchData(*windowQuery(spec, column, k)), max(1, repeat // 3))
+
+            def perGroup():
+                for value in groups:
+                    business.search(spec.copy().equals(column, value))
+
+            loop = timeit(perGroup, 1) if dimension != "club" else float("nan")  # Hundreds of full searches
+            print(f"{dimension:12} {label:15} {top:15.2f} {window:10.1f} {loop:13.1f}")
+    builder = squadbuilder(business)
+    print(f"{'formation':12} {'filter':15} {'build ms':>15} {'total overall':>14}")
+    for formation in formations:
+        for label, spec in constraints:
+            squad = builder.build(spec, formation)
+            seconds = timeit(lambda: builder.build(spec, formation), repeat)
+            print(f"{formation:12} {label:15} {seconds:15.2f} {sum(rating for _, _, rating in squad):14}")
+    dataAccess.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time top-k per group and the squad builder.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1200000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--k", type=int, default=5, help="players per group")
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        for size in arguments.rows:
+            run(size, arguments.repeat, directory, arguments.k)
@@ -0,0 +1,297 @@
+import argparse  # Import argparse for the command line
+import json  # Import json for the machine-readable report
+import os  # Import os for the scratch directory and the offscreen Qt platform
+import platform  # Import platform to record the interpreter version
+import random  # Import random to pick seeded write targets
+import sqlite3  # Import sqlite3 to record the library version
+import statistics  # Import statistics for the percentiles
+import subprocess  # Import subprocess to record the current commit
+import sys  # Import sys to write the report to stdout
+import tempfile  # Import tempfile for the benchmark databases
+import time  # Import time for the timers
+
+from FifaBLL import players  # Import the business layer under test
+from FifaDataAccess import accessdata  # Import the data access layer under test
+from benchmarks.synthetic import makeDatabase, players as syntheticPlayers  # Import the seeded generator
+
+# The form's search fields in every combination players.searchData accepts:
+# (label, name?, position?, nation?). The overall bound is shared by all of them.
+searchShapes = [
+    ("overall", False, False, False),
+    ("overall+nation", False, False, True),
+    ("overall+position", False, True, False),
+    ("overall+position+nation", False, True, True),
+    ("overall+name", True, False, False),
+    ("overall+name+nation", True, False, True),
+    ("overall+name+position", True, True, False),
+    ("overall+name+position+nation", True, True, True),
+]
+application = None  # The QApplication created for the model timings
+
+def summarize(operation, shape, rows, samples, units=1):
+    """
+    Reduce latency samples to one result record.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the timed call.
+    shape : str or None
+        Query shape or variant.
+    rows : int
+        Table size the samples were taken on.
+    samples : list of float
+        Wall time of each call, in seconds.
+    units : int
+        Work items per call (rows inserted, data() calls, ...) used for the throughput.
+
+    Returns
+    -------
+    dict
+        operation, shape, rows, samples, p50/p95/p99/mean in milliseconds and
+        throughput in work items per second.
+    """
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    total = sum(ordered)
+    return {"operation": operation, "shape": shape, "rows": rows, "samples": len(ordered),
+            "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000, "mean_ms": total / len(ordered) * 1000,
+            "throughput": len(ordered) * units / total if total else 0.0}
+
+def sample(function, repeat):
+    """
+    Call function(step) for step in range(repeat) and return each call's wall time in seconds.
+    """
+    samples = []
+    for step in range(repeat):
+        start = time.perf_counter()
+        function(step)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def benchInsert(dataAccess, rows, repeat, batch, seed):
+    """
+    Time accessdata.insertQuery on batches of new players appended after the existing ids.
+
+    Every insert goes through the filter indexes and the full-text triggers,
+    as an insert from the application would.
+    """
+    generator = syntheticPlayers(repeat * batch, seed + 1)
+    query = "INSERT INTO tblPlayers VALUES(?,?,?,?,?,?,?)"
+
+    def insert(step):
+        chunk = [(rows + step * batch + offset + 1,) + row[1:] for offset, row in zip(range(batch), generator)]
+        dataAccess.insertQuery(query, chunk)
+
+    return [summarize("insertQuery", f"batch={batch}", rows, sample(insert, repeat), batch)]
+
+def benchSearch(business, rows, repeat, values):
+    """
+    Time players.searchData for every form shape, plus the first page and the count the form issues.
+
+    searchData fetches the whole result, so its latency grows with the
+    selectivity of the shape; searchPage and countData are what the form runs.
+    """
+    results = []
+    for label, name, post, nation in searchShapes:
+        arguments = (values["name"] if name else "", values["overall"], values["position"] if post else "",
+                     values["nation"] if nation else "Any")
+        spec = business.filterFor(*arguments)
+        results.append(summarize("searchData", label, rows, sample(lambda step: business.searchData(*arguments),
+                                                                   repeat)))
+        results.append(summarize("searchPage", label, rows, sample(lambda step: business.searchPage(spec), repeat)))
+        results.append(summarize("countData", label, rows, sample(lambda step: business.countData(spec), repeat)))
+    return results
+
+def benchWrites(business, dataAccess, rows, repeat, seed):
+    """
+    Time players.updateData and players.deletesData against seeded existing players.
+
+    Updates rewrite every player sharing a first name, as the form does;
+    deletes target one existing player by its name, position, nation and overall.
+    """
+    rnd = random.Random(seed)
+    picks = [rnd.randint(1, rows) for _ in range(repeat * 2)]
+    targets = {}
+    for identifier in picks:
+        found = dataAccess.searchData("SELECT firstName, overall, position, nation FROM tblPlayers WHERE id=?",
+                                      (identifier,))
+        if found:
+            targets[identifier] = found[0]
+    targets = list(targets.values())
+    updates = targets[:repeat]
+    deletes = targets[repeat:] or targets
+
+    def update(step):
+        name, overall, post, nation = updates[step % len(updates)]
+        business.updateData(name, min(99, overall + 1), post, nation)
+
+    def delete(step):
+        name, overall, post, nation = deletes[step % len(deletes)]
+        business.deletesData(name, overall, post, nation)
+
+    removed = summarize("deletesData", "firstName+position+nation+overall", rows, sample(delete, repeat))
+    return [summarize("updateData", "firstName", rows, sample(update, repeat)), removed]  # Deletes first: updates move overalls
+
+def benchModel(business, rows, repeat, viewport=40):
+    """
+    Time Datamodel.data() and rowCount() under the offscreen Qt platform.
+
+    Each data() sample paints one viewport (`viewport` rows by every column,
+    display and alignment roles) at a seeded scroll offset of a model holding
+    the first pages of the unfiltered search; each rowCount() sample is one
+    thousand calls, the order of what a view issues while scrolling.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    from FifaDataModel import Datamodel
+
+    global application
+    application = QApplication.instance() or QApplication([])  # Kept alive across table sizes, like the UI's
+    spec = business.filterFor("", 0, "", "Any")
+    loaded = business.searchPage(spec, limit=min(rows, 100000))
+    model = Datamodel(loaded)
+    offsets = random.Random(rows).choices(range(max(1, len(loaded) - viewport)), k=repeat)
+    roles = (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.TextAlignmentRole)
+    columns = model.columnCount()
+    visible = min(viewport, len(loaded))
+
+    def paint(step):
+        first = offsets[step]
+        for row in range(first, first + visible):
+            for column in range(columns):
+                index = model.index(row, column)
+                for role in roles:
+                    model.data(index, role)
+
+    def count(step):
+        for _ in range(1000):
+            model.rowCount()
+
+    results = [summarize("Datamodel.data", f"viewport={visible}x{columns}", len(loaded), sample(paint, repeat),
+                         visible * columns * len(roles)),
+               summarize("Datamodel.rowCount", "x1000", len(loaded), sample(count, repeat), 1000)]
+    return results
+
+def valuesFor(dataAccess):
+    """
+    Pick filter values that exist in a generated table: the first player's name, a common position and nation.
+    """
+    name = dataAccess.searchData("SELECT firstName FROM tblPlayers WHERE id=1")[0][0]
+    return {"name": name, "overall": 80, "position": "ST", "nation": "Spain"}
+
+def run(rows, repeat, directory, seed=24, batch=1000, model=True):
+    """
+    Run the whole suite on one synthetic table size.
+
+    Reads run before writes so every read sees the generated table unchanged.
+
+    Parameters
+    ----------
+    rows : int
+        Table size.
+    repeat : int
+        Timed calls per measurement.
+    directory : str
+        Where to create the database.
+    seed : int
+        Generator seed.
+    batch : int
+        Rows per insertQuery call.
+    model : bool
+        Also time the Qt table model.
+
+    Returns
+    -------
+    list of dict
+        One summary per measurement.
+    """
+    start = time.perf_counter()
+    path = makeDatabase(os.path.join(directory, f"players-{rows}-{seed}.db"), rows, seed)
+    print(f"{rows} rows generated in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    dataAccess = accessdata(path)
+    business = players(dataAccess=dataAccess)
+    results = benchSearch(business, rows, repeat, valuesFor(dataAccess))
+    if model:
+        results += benchModel(business, rows, repeat)
+    results += benchWrites(business, dataAccess, rows, repeat, seed)
+    results += benchInsert(dataAccess, rows, repeat, batch, seed)
+    business.close()
+    return results
+
+def environment(seed, repeat):
+    """
+    Describe the machine and code the results were measured on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(), "system": platform.system(), "seed": seed, "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+def compare(baseline, results, tolerance):
+    """
+    Print the p50 ratio of every measurement against a baseline report.
+
+    Parameters
+    ----------
+    baseline : dict
+        A report previously written by this suite.
+    results : list of dict
+        The current results.
+    tolerance : float
+        Ratio above which a measurement is flagged as a regression.
+
+    Returns
+    -------
+    int
+        Number of regressions.
+    """
+    previous = {(item["operation"], item["shape"], item["rows"]): item for item in baseline["results"]}
+    regressions = 0
+    for item in results:
+        before = previous.get((item["operation"], item["shape"], item["rows"]))
+        if before is None or not before["p50_ms"]:
+            continue
+        ratio = item["p50_ms"] / before["p50_ms"]
+        slower = ratio > tolerance
+        regressions += slower
+        print(f"{'SLOWER' if slower else 'ok    '} {item['operation']:18} {item['shape']:32} {item['rows']:>9} "
+              f"p50 {before['p50_ms']:.3f} -> {item['p50_ms']:.3f} ms ({ratio:.2f}x)", file=sys.stderr)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the data access, business and model layers on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="table sizes, e.g. 10000 1000000 10000000")
+    parser.add_argument("--repeat", type=int, default=50, help="timed calls per measurement")
+    parser.add_argument("--seed", type=int, default=24)
+    parser.add_argument("--batch", type=int, default=1000, help="rows per insertQuery call")
+    parser.add_argument("--no-model", dest="model", action="store_false", help="skip the Qt model timings")
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    parser.add_argument("--out", default=None, help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", default=None, help="baseline JSON report to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="p50 ratio counted as a regression")
+    arguments = parser.parse_args()
+    results = []
+    with tempfile.TemporaryDirectory(dir=arguments.dir) as directory:
+        for size in arguments.rows:
+            results += run(size, arguments.repeat, directory, arguments.seed, arguments.batch, arguments.model)
+    report = {"environment": environment(arguments.seed, arguments.repeat), "results": results}
+    if arguments.out:
+        with open(arguments.out, "w") as target:
+            json.dump(report, target, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if arguments.compare:
+        with open(arguments.compare) as source:
+            sys.exit(1 if compare(json.load(source), results, arguments.tolerance) else 0)
@@ -0,0 +1,106 @@
+import os  # Import os to replace stale benchmark databases
+import random  # Import random for the seeded generator
+import sqlite3  # Import sqlite3 to write the synthetic table
+
+# Same definition as tblPlayers in FIFA24.db
+schema = """CREATE TABLE "tblPlayers" (
+  "id" INTEGER NOT NULL,
+  "firstName" TEXT NOT NULL,
+  "lastName" TEXT NOT NULL,
+  "nation" TEXT NOT NULL,
+  "team" TEXT,
+  "position" TEXT NOT NULL,
+  "overall" integer NOT NULL,
+  PRIMARY KEY ("id")
+)"""
+
+nations = ["England", "Germany", "Spain", "France", "Italy", "Argentine", "Brazil", "Portugal", "Netherlands",
+           "Belgium", "Iran", "Croatia", "Austria", "Norway", "Japan", "USA", "Mexico", "Nigeria", "Senegal", "Korea"]
+positions = {"ST": 12, "CB": 16, "CM": 14, "GK": 9, "RB": 7, "LB": 7, "CDM": 8, "CAM": 7, "LW": 5, "RW": 5,
+             "LM": 4, "RM": 4, "CF": 2}
+syllables = ["an", "ba", "co", "da", "el", "fa", "gi", "ho", "is", "ja", "ka", "lo", "ma", "ne", "or", "pa", "ri",
+             "sa", "to", "ul", "va", "yo", "ze"]
+
+def players(rows, seed=24, clubs=700):
+    """
+    Yield synthetic 'tblPlayers' rows with realistic skew.
+
+    Nations follow a Zipf-like distribution, positions use squad-like weights
+    and overall is a clipped normal around 66, so the filters hit the same
+    mix of selective and unselective shapes as the real FIFA data.
+
+    Parameters
+    ----------
+    rows : int
+        Number of rows to generate.
+    seed : int
+        Random seed; the same seed always yields the same rows.
+    clubs : int
+        Number of distinct clubs.
+
+    Yields
+    ------
+    tuple
+        (id, firstName, lastName, nation, team, position, overall).
+    """
+    rnd = random.Random(seed)
+    nationWeights = [1.0 / (rank + 1) for rank in range(len(nations))]
+    postNames, postWeights = list(positions), list(positions.values())
+    firstNames = ["".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 3))).title() for _ in range(2000)]
+    lastNames = ["".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 4))).title() for _ in range(20000)]
+    teams = [f"{rnd.choice(syllables).title()}{rnd.choice(syllables)} FC {number}" for number in range(clubs)]
+    batch = 10000  # Draw categorical values in batches; random.choices is much faster per value
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        nationDraw = rnd.choices(nations, nationWeights, k=count)
+        postDraw = rnd.choices(postNames, postWeights, k=count)
+        for offset in range(count):
+            overall = min(99, max(30, int(rnd.gauss(66, 8))))
+            yield (start + offset + 1, rnd.choice(firstNames), rnd.choice(lastNames), nationDraw[offset],
+                   rnd.choice(teams), postDraw[offset], overall)
+
+def makeDatabase(path, rows, seed=24, batch=100000):
+    """
+    Create (or replace) a SQLite database holding a synthetic 'tblPlayers'.
+
+    The table is filled first and indexed afterwards by the normal migrations,
+    which is much faster than inserting into an indexed table.
+
+    Parameters
+    ----------
+    path : str
+        Database file to create.
+    rows : int
+        Number of players.
+    seed : int
+        Random seed.
+    batch : int
+        Rows per executemany call.
+
+    Returns
+    -------
+    str
+        The database path.
+    """
+    from FifaMigrations import migrate  # Imported here so the generator works without the repo on sys.path
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")  # Throwaway data: skip the journal while loading
+    connection.execute("PRAGMA synchronous=OFF")
+    connection.execute(schema)
+    generator = players(rows, seed)
+    with connection:
+        while True:
+            chunk = [row for _, row in zip(range(batch), generator)]
+            if not chunk:
+                break
+            connection.executemany("INSERT INTO tblPlayers VALUES(?,?,?,?,?,?,?)", chunk)
+    connection.execute("BEGIN")
+    migrate(connection)
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
+    return path
@@ -0,0 +1,7 @@
+"""
+Tests for Elite Player Suite.
+
+Run them from the repository root with `python -m pytest tests` or
+`python -m unittest discover tests`. They build small synthetic databases in
+temporary directories and never touch FIFA24.db.
+"""
@@ -0,0 +1,108 @@
+import os  # Import os for the scratch file paths
+import sqlite3  # Import sqlite3 to prepare the test tables
+import tempfile  # Import tempfile for the scratch files
+import unittest  # Import unittest for the test cases
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # FifaDataModel loads Qt
+
+from FifaColumnar import np  # Import NumPy as the columnar engine sees it (None when missing)
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaDataModel import columnstore  # Import the table model's row store
+from FifaFilter import filterspec  # Import filter specs to compare columnar searches
+from FifaImport import importFile  # Import the bulk importer
+from FifaMigrations import migrate  # Import the migrations to prepare the import target
+from FifaPack import exportPack, playerpack  # Import the pack format under test
+from benchmarks.synthetic import makeDatabase, schema  # Import the synthetic data generator and table schema
+
+query = "SELECT id, firstName, lastName, nation, team, position, overall FROM tblPlayers ORDER BY id"
+
+class packRoundTripTest(unittest.TestCase):
+    """
+    Export to a pack and read it back through every loader, comparing with tblPlayers.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def database(self, name, rows):
+        """
+        Return a migrated database with `rows` synthetic players, some without a club
+        and some with non-ASCII names.
+        """
+        path = os.path.join(self.directory.name, name)
+        if rows:
+            makeDatabase(path, rows)
+        else:
+            with sqlite3.connect(path) as connection:
+                connection.executescript(schema)
+        with sqlite3.connect(path) as connection:
+            connection.execute("UPDATE tblPlayers SET team = NULL WHERE id % 7 = 0")
+            connection.execute("UPDATE tblPlayers SET firstName = 'Zoë', lastName = 'Núñez Çelik' WHERE id % 11 = 0")
+            connection.execute("UPDATE tblPlayers SET nation = '日本' WHERE id % 13 = 0")
+        dataAccess = accessdata(path)
+        with dataAccess.transaction() as connection:
+            migrate(connection)
+        self.addCleanup(dataAccess.close)
+        return dataAccess
+
+    def export(self, dataAccess):
+        """
+        Export a database and return (pack path, tblPlayers rows).
+        """
+        path = os.path.join(self.directory.name, "players.fpack")
+        exported = exportPack(dataAccess, path)
+        rows = dataAccess.searchData(query)
+        self.assertEqual(exported, len(rows))
+        return path, rows
+
+    def roundTrip(self, rows):
+        dataAccess = self.database("source.db", rows)
+        path, original = self.export(dataAccess)
+        with playerpack(path) as pack:
+            self.assertEqual(len(pack), len(original))
+            self.assertEqual(list(pack), original)
+            self.assertEqual(list(columnstore.fromPack(pack)), original)
+        target = self.database("target.db", 0)
+        importFile(path, target, report=None)
+        self.assertEqual(target.searchData(query), original)
+        return dataAccess, path, original
+
+    def testRoundTrip(self):
+        _, _, original = self.roundTrip(300)
+        self.assertTrue(any(row[4] is None for row in original))
+        self.assertTrue(any(row[1] == "Zoë" for row in original))
+
+    def testEmptyTable(self):
+        _, path, original = self.roundTrip(0)
+        self.assertEqual(original, [])
+        self.assertEqual(list(playerpack(path)), [])
+
+    @unittest.skipIf(np is None, "the columnar engine requires NumPy")
+    def testColumnIndex(self):
+        from FifaColumnar import columnindex  # Imported here: it raises without NumPy
+        dataAccess = self.database("source.db", 300)
+        path, _ = self.export(dataAccess)
+        loaded = columnindex(dataAccess)
+        loaded.load()
+        mapped = columnindex()
+        mapped.loadPack(playerpack(path))
+        specs = [filterspec(), filterspec().equals("team", None), filterspec().firstName("Zoë"),
+                 filterspec().nation("日本").sortBy("lastName"), filterspec().sortBy("team", True)]
+        for spec in specs:
+            with self.subTest(spec=spec.key()):
+                self.assertEqual(mapped.search(spec), loaded.search(spec))
+        empty = columnindex()
+        empty.loadPack(playerpack(self.export(self.database("empty.db", 0))[0]))
+        self.assertEqual(empty.search(filterspec()), [])
+
+    def testRejectsOtherFiles(self):
+        for name, content in (("short.fpack", b"FIFA"), ("other.fpack", b"x" * 100)):
+            path = os.path.join(self.directory.name, name)
+            with open(path, "wb") as target:
+                target.write(content)
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                playerpack(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio  # Import asyncio to run the service and a client in one loop
+import json  # Import json to read the response bodies
+import os  # Import os for the scratch database path
+import tempfile  # Import tempfile for the scratch database
+import unittest  # Import unittest for the test cases
+
+from FifaBLL import players  # Import the business layer behind the service
+from FifaDataAccess import accessdata  # Import the data access layer
+from FifaService import httperror, limitFor, playerservice  # Import the service under test
+from benchmarks.service import request  # Reuse the load test's HTTP/1.1 client
+from benchmarks.synthetic import makeDatabase  # Import the synthetic data generator
+
+class limitForTest(unittest.TestCase):
+    """
+    Page limit parsing of GET /players.
+    """
+
+    def testDefault(self):
+        self.assertEqual(limitFor({}, 2000), 200)
+
+    def testCappedAtPageRows(self):
+        self.assertEqual(limitFor({"limit": "5000"}, 100), 100)
+        self.assertEqual(limitFor({"limit": "7"}, 100), 7)
+
+    def testRefusesNonPositiveAndNonInteger(self):
+        for limit in ("-1", "0", "abc", "1.5"):
+            with self.subTest(limit=limit), self.assertRaises(httperror) as raised:
+                limitFor({"limit": limit}, 100)
+            self.assertEqual(raised.exception.status, 400)
+
+class pageLimitTest(unittest.TestCase):
+    """
+    GET /players against a running service on a small synthetic table.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = makeDatabase(os.path.join(cls.directory.name, "players.db"), 500)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def responses(self, paths):
+        """
+        Start the service with pageRows=100, GET each path on one connection and return (status, body) pairs.
+        """
+
+        async def run():
+            service = playerservice(players(dataAccess=accessdata(self.path)), pageRows=100)
+            server = await service.start("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+            try:
+                return [await request(reader, writer, "GET", path) for path in paths]
+            finally:
+                writer.close()
+                await writer.wait_closed()
+                await asyncio.sleep(0.05)  # Let the server see the connection end
+                server.close()
+                await server.wait_closed()
+                service.close()
+
+        return asyncio.run(run())
+
+    def testInvalidLimitsAnswer400(self):
+        paths = ["/players?limit=-1", "/players?limit=0", "/players?limit=abc"]
+        for path, (status, body) in zip(paths, self.responses(paths)):
+            with self.subTest(path=path):
+                self.assertEqual(status, 400)
+                self.assertIn("limit", json.loads(body)["error"])
+
+    def testValidLimits(self):
+        (status, body), (capped, cappedBody) = self.responses(["/players?limit=5", "/players?limit=5000"])
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)["rows"]), 5)
+        self.assertEqual(capped, 200)
+        self.assertEqual(len(json.loads(cappedBody)["rows"]), 100)
+
+if __name__ == "__main__":
+    unittest.main()